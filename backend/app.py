@@ -1,4 +1,6 @@
 import os
+import threading
+import click
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
@@ -24,6 +26,15 @@ def create_app():
     # Create upload directory if it doesn't exist
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
     
+    # Vector DB warm-up: 'true' loads the embedding model before serving, 'background' loads it on a thread
+    app.config['VECTOR_DB_WARMUP'] = os.environ.get('VECTOR_DB_WARMUP', 'false').lower()
+    
+    # Background indexing workers and their bounded queue
+    app.config['INDEXING_WORKERS'] = int(os.environ.get('INDEXING_WORKERS', 2))
+    app.config['INDEXING_QUEUE_SIZE'] = int(os.environ.get('INDEXING_QUEUE_SIZE', 100))
+    # Start the workers with the app, which also re-runs jobs a previous process left unfinished
+    app.config['INDEXING_AUTOSTART'] = os.environ.get('INDEXING_AUTOSTART', 'true').lower()
+    
     db.init_app(app)
     migrate.init_app(app, db)
     CORS(app)
@@ -32,17 +43,77 @@ def create_app():
     from models import (
         Role, User, JobPost, Resume, Application, Interview,
         Training, Course, Enrollment, Report, EODReport, ExpenseReport,
-        PerformanceReview, Notification, AuditLog
+        PerformanceReview, PerformanceReviewSummary, Notification, AuditLog, IndexingJob,
+        JobResumeMatch, ResumeJobMatch, MatchSource
     )
     
     # Import and register blueprints
     from routes.user_routes import user_bp
     from routes.role_routes import role_bp
     from routes.expense_routes import expense_bp
+    from routes.job_routes import job_bp
+    from routes.training_routes import training_bp
+    from routes.interview_routes import interview_bp
+    from routes.resume_routes import resume_bp
+    from routes.indexing_routes import indexing_bp
     
     app.register_blueprint(user_bp, url_prefix='/api/users')
     app.register_blueprint(role_bp, url_prefix='/api/roles')
     app.register_blueprint(expense_bp, url_prefix='/api/expenses')
+    app.register_blueprint(job_bp, url_prefix='/api/jobs')
+    app.register_blueprint(training_bp, url_prefix='/api/trainings')
+    app.register_blueprint(interview_bp, url_prefix='/api/interviews')
+    app.register_blueprint(resume_bp, url_prefix='/api/resumes')
+    app.register_blueprint(indexing_bp, url_prefix='/api/indexing')
+    
+    if app.config['VECTOR_DB_WARMUP'] in ('true', 'background'):
+        warm_up_vector_db(background=app.config['VECTOR_DB_WARMUP'] == 'background')
+    
+    if app.config['INDEXING_AUTOSTART'] == 'true':
+        from services.indexing_worker import indexing_worker_pool
+        indexing_worker_pool.start(app)
+    
+    @app.cli.command('warm-vector-db')
+    def warm_vector_db_command():
+        """Load the vector DB client and embedding model"""
+        print(warm_up_vector_db())
+    
+    @app.cli.command('sync-vector-db')
+    def sync_vector_db_command():
+        """Re-index changed job posts and resumes, drop deleted ones"""
+        from services.vector_sync_service import vector_sync_service
+        print(vector_sync_service.sync_all())
+    
+    @app.cli.command('migrate-resume-collections')
+    def migrate_resume_collections_command():
+        """Fold per-resume vector collections into the shared resume collection"""
+        from database.vector_db import chroma_db_service
+        print(chroma_db_service.migrate_resume_collections())
+    
+    @app.cli.command('run-indexing-jobs')
+    def run_indexing_jobs_command():
+        """Run the indexing jobs a stopped server left queued or running, then exit"""
+        from services.indexing_worker import indexing_worker_pool
+        indexing_worker_pool.start(app)
+        # recover() enqueues at most a queue's worth of jobs per call
+        while True:
+            indexing_worker_pool.wait_idle()
+            if not indexing_worker_pool.recover():
+                break
+        print(indexing_worker_pool.stats())
+    
+    @app.cli.command('backfill-interview-ends')
+    def backfill_interview_ends_command():
+        """Set ends_at on interviews stored before the column existed"""
+        from services.interview_service import interview_service
+        print(interview_service.backfill_end_times())
+    
+    @app.cli.command('refresh-match-matrix')
+    @click.option('--full', is_flag=True, help='Recompute every row instead of only changed ones')
+    def refresh_match_matrix_command(full):
+        """Recompute the stored top-k job x resume matches (run nightly after sync-vector-db)"""
+        from services.match_matrix_service import match_matrix_service
+        print(match_matrix_service.refresh(full=full))
     
     # Root routes
     @app.route('/')
@@ -54,7 +125,12 @@ def create_app():
                 'health': '/health',
                 'users': '/api/users',
                 'roles': '/api/roles',
-                'expenses': '/api/expenses'
+                'expenses': '/api/expenses',
+                'jobs': '/api/jobs',
+                'trainings': '/api/trainings',
+                'interviews': '/api/interviews',
+                'resumes': '/api/resumes',
+                'indexing': '/api/indexing'
             }
         }
     
@@ -68,6 +144,14 @@ def create_app():
     
     return app
 
+def warm_up_vector_db(background=False):
+    from database.vector_db import chroma_db_service
+    
+    if background:
+        threading.Thread(target=chroma_db_service.warm_up, daemon=True).start()
+        return None
+    return chroma_db_service.warm_up()
+
 if __name__ == '__main__':
     app = create_app()
     with app.app_context():
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Compare embedding inference backends on CPU: batched throughput in
+sentences/sec and single-sentence p50 / p95 latency (the upload and search
+path).
+
+Usage (from backend/):
+    python -m benchmarks.bench_embedding_inference --backends torch quantized onnx --threads 4
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.bench_vector_indexing import make_texts
+from database.vector_db.chroma_vector_db import ChromaVectorDBService
+
+
+def bench_backend(backend, texts, batch_size, threads, single_runs):
+    service = ChromaVectorDBService(use_cache=False, inference_backend=backend, num_threads=threads,
+                                    encode_batch_size=batch_size)
+
+    t0 = time.perf_counter()
+    service.model.encode(texts[:batch_size])
+    load_seconds = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    vectors = service.get_embeddings(texts, as_numpy=True)
+    batch_seconds = time.perf_counter() - t0
+
+    latencies = []
+    for text in texts[:single_runs]:
+        t0 = time.perf_counter()
+        service.get_embedding(text)
+        latencies.append(time.perf_counter() - t0)
+
+    return {
+        "load_seconds": load_seconds,
+        "sentences_per_sec": len(texts) / batch_seconds,
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p95_ms": float(np.percentile(latencies, 95) * 1000),
+        "vectors": vectors
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["torch", "quantized", "onnx"],
+                        choices=ChromaVectorDBService.INFERENCE_BACKENDS)
+    parser.add_argument("--sentences", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--single-runs", type=int, default=200)
+    args = parser.parse_args()
+
+    texts = make_texts(args.sentences, words_per_doc=40)
+    results = {}
+    for backend in args.backends:
+        try:
+            results[backend] = bench_backend(backend, texts, args.batch_size, args.threads, args.single_runs)
+        except Exception as e:
+            print(f"{backend}: skipped ({e})")
+
+    baseline = results.get("torch")
+    print(f"sentences: {args.sentences}  batch size: {args.batch_size}  threads: {args.threads or 'default'}")
+    print(f"{'backend':<10} {'load s':>7} {'sent/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'cos vs torch':>13}")
+    for backend, result in results.items():
+        similarity = ""
+        if baseline is not None:
+            a, b = result["vectors"], baseline["vectors"]
+            cosine = (a * b).sum(axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+            similarity = f"{cosine.mean():13.4f}"
+        print(f"{backend:<10} {result['load_seconds']:7.2f} {result['sentences_per_sec']:9.1f} "
+              f"{result['p50_ms']:8.2f} {result['p95_ms']:8.2f} {similarity}")
+
+
+if __name__ == "__main__":
+    main()
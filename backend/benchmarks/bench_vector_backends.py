@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Compare the Chroma (HNSW) and NumPy (exact; float32, float16 and int8
+search copies) vector store backends on the same synthetic embeddings:
+build time, single-query latency, batched query throughput and recall@k
+against exact brute-force neighbours.
+
+Usage (from backend/):
+    python -m benchmarks.bench_vector_backends --docs 20000 --queries 200 --k 10
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from database.vector_db.numpy_vector_store import NumpyVectorStore
+from database.vector_db.vector_store import ChromaVectorStore
+
+
+def make_vectors(n, dim, clusters=50, seed=42):
+    # clustered unit vectors, closer to sentence embeddings than uniform noise
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    vectors = centers[rng.integers(0, clusters, size=n)] + 0.5 * rng.normal(size=(n, dim))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
+
+
+def exact_neighbours(vectors, queries, k):
+    distances = (vectors ** 2).sum(axis=1)[None, :] - 2.0 * queries @ vectors.T
+    return np.argsort(distances, axis=1)[:, :k]
+
+
+def bench_store(store, vectors, queries, k):
+    collection = store.get_or_create_collection("bench")
+    ids = [str(i) for i in range(len(vectors))]
+    batch_size = min(store.get_max_batch_size(), 5000)
+
+    started = time.perf_counter()
+    for start in range(0, len(ids), batch_size):
+        collection.add(ids=ids[start:start + batch_size], embeddings=vectors[start:start + batch_size],
+                       metadatas=[{"n": i} for i in range(start, min(start + batch_size, len(ids)))])
+    build_seconds = time.perf_counter() - started
+
+    latencies = []
+    found = []
+    for query in queries:
+        t0 = time.perf_counter()
+        result = collection.query(query_embeddings=[query], n_results=k, include=["distances"])
+        latencies.append(time.perf_counter() - t0)
+        found.append([int(doc_id) for doc_id in result["ids"][0]])
+
+    t0 = time.perf_counter()
+    collection.query(query_embeddings=queries, n_results=k, include=["distances"])
+    batch_seconds = time.perf_counter() - t0
+
+    return {
+        "build_seconds": build_seconds,
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p95_ms": float(np.percentile(latencies, 95) * 1000),
+        "batch_qps": len(queries) / batch_seconds if batch_seconds > 0 else 0.0,
+        "found": found
+    }
+
+
+def recall(found, expected):
+    hits = sum(len(set(row) & set(truth)) for row, truth in zip(found, expected.tolist()))
+    return hits / expected.size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    vectors = make_vectors(args.docs, args.dim)
+    queries = make_vectors(args.queries, args.dim, seed=7)
+    expected = exact_neighbours(vectors, queries, args.k)
+
+    workdir = tempfile.mkdtemp(prefix="bench-vector-backends-")
+    try:
+        results = {
+            "chroma": bench_store(ChromaVectorStore(f"{workdir}/chroma"), vectors, queries, args.k),
+            "numpy": bench_store(NumpyVectorStore(f"{workdir}/numpy"), vectors, queries, args.k),
+            "numpy16": bench_store(NumpyVectorStore(f"{workdir}/numpy16", storage_dtype="float16"),
+                                   vectors, queries, args.k),
+            "numpy8": bench_store(NumpyVectorStore(f"{workdir}/numpy8", storage_dtype="int8"),
+                                  vectors, queries, args.k),
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"documents: {args.docs}  queries: {args.queries}  dim: {args.dim}  k: {args.k}")
+    print(f"{'backend':<8} {'build s':>9} {'p50 ms':>8} {'p95 ms':>8} {'batch q/s':>10} {'recall@k':>9}")
+    for name, result in results.items():
+        print(f"{name:<8} {result['build_seconds']:9.2f} {result['p50_ms']:8.2f} {result['p95_ms']:8.2f} "
+              f"{result['batch_qps']:10.1f} {recall(result['found'], expected):9.3f}")
+
+
+if __name__ == "__main__":
+    main()
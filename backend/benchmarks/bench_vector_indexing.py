@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Compare indexing throughput of the single-document path (load_data per text)
+against the batched add_many path.
+
+Usage (from backend/):
+    python -m benchmarks.bench_vector_indexing --docs 2000 --encode-batch-size 64
+"""
+
+import argparse
+import random
+import shutil
+import tempfile
+import time
+
+from database.vector_db.chroma_vector_db import ChromaVectorDBService
+
+WORDS = (
+    "python java kubernetes docker aws azure sql spark kafka react node finance audit "
+    "compliance payroll recruiting onboarding marketing sales analytics leadership agile"
+).split()
+
+
+def make_texts(n, words_per_doc=120, seed=42):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(words_per_doc)) for _ in range(n)]
+
+
+def bench_single(service, collection_name, texts):
+    started = time.perf_counter()
+    for i, text in enumerate(texts):
+        service.load_data(doc_id=f"doc-{i}", meta_data={"source": "bench"}, collection_name=collection_name, text=text)
+    return time.perf_counter() - started
+
+
+def bench_batched(service, collection_name, texts, encode_batch_size, write_batch_size):
+    result = service.add_many(
+        collection_name,
+        ids=[f"doc-{i}" for i in range(len(texts))],
+        texts=texts,
+        metadatas=[{"source": "bench"}] * len(texts),
+        encode_batch_size=encode_batch_size,
+        write_batch_size=write_batch_size
+    )
+    return result["total_seconds"], result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--encode-batch-size", type=int, default=64)
+    parser.add_argument("--write-batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    # no embedding cache: the batched path would otherwise reuse the vectors the single path just cached
+    persist_dir = tempfile.mkdtemp(prefix="bench-vector-indexing-")
+    service = ChromaVectorDBService(persist_dir=persist_dir, use_cache=False)
+    texts = make_texts(args.docs)
+
+    # Warm the model so neither path pays for lazy initialization
+    service.get_embeddings(texts[:8])
+
+    try:
+        single_seconds = bench_single(service, "bench-single", texts)
+        batched_seconds, result = bench_batched(
+            service, "bench-batched", texts, args.encode_batch_size, args.write_batch_size
+        )
+    finally:
+        shutil.rmtree(persist_dir, ignore_errors=True)
+
+    print(f"documents:        {args.docs}")
+    print(f"single path:      {single_seconds:8.2f}s  {args.docs / single_seconds:10.1f} docs/sec")
+    print(f"batched path:     {batched_seconds:8.2f}s  {args.docs / batched_seconds:10.1f} docs/sec")
+    print(f"  encode:         {result['encode_seconds']:8.2f}s")
+    print(f"  write:          {result['write_seconds']:8.2f}s")
+    print(f"speedup:          {single_seconds / batched_seconds:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
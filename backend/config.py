@@ -1,9 +1,11 @@
+import os
 from dotenv import dotenv_values
 
 
 _properties = dotenv_values('.env')
 
+# keys missing from .env fall back to the environment, None when set nowhere
 class Config:
-    GEMINI_API_KEY=_properties['GEMINI_API_KEY']
-    LANGCHAIN_API_KEY=_properties['LANGCHAIN_API_KEY']
-    OPENAI_API_KEY=_properties['OPENAI_API_KEY']
\ No newline at end of file
+    GEMINI_API_KEY=_properties.get('GEMINI_API_KEY') or os.environ.get('GEMINI_API_KEY')
+    LANGCHAIN_API_KEY=_properties.get('LANGCHAIN_API_KEY') or os.environ.get('LANGCHAIN_API_KEY')
+    OPENAI_API_KEY=_properties.get('OPENAI_API_KEY') or os.environ.get('OPENAI_API_KEY')
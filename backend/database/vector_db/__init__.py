@@ -1 +1,5 @@
-from .chroma_vector_db import chroma_db_service
\ No newline at end of file
+from .vector_store import VectorStore, VectorCollection, ChromaVectorStore
+from .numpy_vector_store import NumpyVectorStore
+from .bm25_index import BM25Index, reciprocal_rank_fusion
+from .embedding_dispatcher import EmbeddingDispatcher
+from .chroma_vector_db import ChromaVectorDBService, chroma_db_service
@@ -0,0 +1,117 @@
+import math
+import re
+import threading
+from collections import Counter
+from typing import List, Dict, Any, Optional, Tuple
+
+from .numpy_vector_store import match_where, match_document
+
+# keeps tokens like c++, c#, .net and node.js together
+TOKEN_PATTERN = re.compile(r"[a-z0-9.+#]*[a-z0-9+#]")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+
+class BM25Index:
+    """
+    In-memory inverted index with Okapi BM25 scoring. Only the postings of
+    the query terms are visited, so a search costs in proportion to how
+    many documents share a term with the query, not to the corpus size.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings = {}
+        self._doc_terms = {}
+        self._doc_lengths = {}
+        self._documents = {}
+        self._metadatas = {}
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._doc_lengths)
+
+    def _remove(self, doc_id: str):
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(doc_id)
+        self._documents.pop(doc_id, None)
+        self._metadatas.pop(doc_id, None)
+
+    def upsert(self, ids: List[str], texts: List[str], metadatas: Optional[List[Dict[str, Any]]] = None):
+        with self._lock:
+            for i, (doc_id, text) in enumerate(zip(ids, texts)):
+                self._remove(doc_id)
+                tokens = tokenize(text)
+                counts = Counter(tokens)
+                for term, tf in counts.items():
+                    self._postings.setdefault(term, {})[doc_id] = tf
+                self._doc_terms[doc_id] = list(counts)
+                self._doc_lengths[doc_id] = len(tokens)
+                self._documents[doc_id] = text
+                self._metadatas[doc_id] = (metadatas[i] if metadatas is not None else None) or {}
+                self._total_length += len(tokens)
+
+    def update_metadata(self, ids: List[str], metadatas: List[Dict[str, Any]]):
+        with self._lock:
+            for doc_id, metadata in zip(ids, metadatas):
+                if doc_id in self._metadatas:
+                    self._metadatas[doc_id] = metadata or {}
+
+    def delete(self, ids: List[str]):
+        with self._lock:
+            for doc_id in ids:
+                self._remove(doc_id)
+
+    def search(self, query: str, k: int = 10, where: Optional[Dict[str, Any]] = None,
+               where_document: Optional[Dict[str, Any]] = None) -> List[Tuple[str, float]]:
+        """
+        Top-k (doc_id, score) for the query, highest score first
+        """
+        with self._lock:
+            n_docs = len(self._doc_lengths)
+            if not n_docs:
+                return []
+            avg_length = self._total_length / n_docs
+
+            scores = {}
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[doc_id] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+            if where or where_document:
+                scores = {
+                    doc_id: score for doc_id, score in scores.items()
+                    if match_where(self._metadatas[doc_id], where)
+                    and match_document(self._documents[doc_id], where_document)
+                }
+
+            return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    def get(self, doc_id: str):
+        with self._lock:
+            return self._documents.get(doc_id), self._metadatas.get(doc_id)
+
+
+## Reciprocal rank fusion of several ranked id lists, highest fused score first
+def reciprocal_rank_fusion(rankings: List[List[str]], rrf_k: int = 60) -> List[Tuple[str, float]]:
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
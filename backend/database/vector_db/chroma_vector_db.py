@@ -1,110 +1,808 @@
-import chromadb
-from chromadb.config import Settings
-from typing import List, Dict, Any
-from sentence_transformers import SentenceTransformer
+import hashlib
+import os
+import re
+import threading
+import time
+import numpy as np
+from typing import List, Dict, Any, Optional, Callable
+from .embedding_cache import EmbeddingCache
+from .bm25_index import BM25Index, reciprocal_rank_fusion
+from .embedding_dispatcher import EmbeddingDispatcher
 
 
 class ChromaVectorDBService:
-    def __init__(self, persist_dir: str = './chroma-db' , model_name: str = 'all-MiniLM-L6-v2',):
-        self.client = chromadb.PersistentClient(path="chroma_db")
-        # self.collection = self.chroma_client.get_or_create_collection(name=collection_name)
-        self.model = SentenceTransformer(model_name)
+    """
+    Embeds documents and runs vector, hybrid (vector + BM25) and chunked
+    searches over a pluggable vector store. The store and the model are
+    created on first use, so importing this module is cheap; call
+    warm_up() to load them ahead of the first request.
+
+    Every document stores a fingerprint of its text in its metadata, so
+    upserts and syncs only re-embed documents whose text changed.
+    """
+
+    FINGERPRINT_KEY = "fingerprint"
+    CHUNK_SUFFIX = "_chunks"
+    INFERENCE_BACKENDS = ("torch", "quantized", "onnx")
+
+    def __init__(self, persist_dir: Optional[str] = None, model_name: str = 'all-MiniLM-L6-v2',
+                 encode_batch_size: Optional[int] = None, write_batch_size: int = 1000,
+                 use_cache: bool = True, cache_size: int = 10000, cache_path: Optional[str] = None,
+                 chunk_size: int = 800, chunk_overlap: int = 100,
+                 backend: Optional[str] = None, read_only: Optional[bool] = None,
+                 storage_dtype: Optional[str] = None, inference_backend: Optional[str] = None,
+                 num_threads: Optional[int] = None, use_dispatcher: Optional[bool] = None,
+                 dispatch_max_batch: Optional[int] = None, dispatch_max_wait_ms: Optional[float] = None):
+        self.persist_dir = persist_dir or os.environ.get('CHROMA_PERSIST_DIR', './chroma_db')
+        self.backend = backend or os.environ.get('VECTOR_DB_BACKEND', 'chroma')
+        self.read_only = read_only if read_only is not None else \
+            os.environ.get('VECTOR_DB_READ_ONLY', 'false').lower() == 'true'
+        self.storage_dtype = storage_dtype or os.environ.get('VECTOR_DB_STORAGE_DTYPE', 'float32')
+        if self.backend not in ('chroma', 'numpy'):
+            raise ValueError(f"Unknown vector DB backend: {self.backend}")
+        if self.backend == 'chroma' and self.storage_dtype != 'float32':
+            raise ValueError("Reduced precision storage needs the numpy backend")
+        self.model_name = model_name
+        self.encode_batch_size = encode_batch_size or int(os.environ.get('EMBEDDING_BATCH_SIZE', 64))
+        self.inference_backend = inference_backend or os.environ.get('EMBEDDING_BACKEND', 'torch')
+        if self.inference_backend not in self.INFERENCE_BACKENDS:
+            raise ValueError(f"inference_backend must be one of {self.INFERENCE_BACKENDS}")
+        self.num_threads = num_threads or (int(os.environ['EMBEDDING_NUM_THREADS'])
+                                           if os.environ.get('EMBEDDING_NUM_THREADS') else None)
+        self.use_dispatcher = use_dispatcher if use_dispatcher is not None else \
+            os.environ.get('EMBEDDING_DISPATCHER', 'false').lower() == 'true'
+        self.dispatch_max_batch = dispatch_max_batch or int(os.environ.get('EMBEDDING_DISPATCH_MAX_BATCH', 64))
+        self.dispatch_max_wait_ms = dispatch_max_wait_ms if dispatch_max_wait_ms is not None else \
+            float(os.environ.get('EMBEDDING_DISPATCH_MAX_WAIT_MS', 5))
+        self.write_batch_size = write_batch_size
+        self.use_cache = use_cache
+        self.cache_size = cache_size
+        self._cache_path = cache_path
+        # characters; all-MiniLM truncates at 256 word pieces, roughly 1000 characters
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+
+        self._client = None
+        self._model = None
+        self._embedding_cache = None
+        self._dispatcher = None
+        self._init_lock = threading.Lock()
+        self._lexical_indexes = {}
+
+    ## Vector store, opened on first use. backend "chroma" or "numpy": exact in-process search that worker
+    ## processes share through memory-mapped segments, storage_dtype "float16" / "int8" quantizes its search copy
+    @property
+    def client(self):
+        if self._client is None:
+            with self._init_lock:
+                if self._client is None:
+                    if self.backend == 'numpy':
+                        from .numpy_vector_store import NumpyVectorStore
+                        self._client = NumpyVectorStore(os.path.join(self.persist_dir, 'numpy'), read_only=self.read_only,
+                                                        storage_dtype=self.storage_dtype)
+                    else:
+                        from .vector_store import ChromaVectorStore
+                        self._client = ChromaVectorStore(self.persist_dir)
+        return self._client
+
+    ## Embedding model, loaded on first use
+    @property
+    def model(self):
+        if self._model is None:
+            with self._init_lock:
+                if self._model is None:
+                    self._model = self._load_model()
+        return self._model
+
+    ## int8 weights change the vectors slightly, so they get their own cache and fingerprint space
+    @property
+    def embedding_space(self) -> str:
+        return f"{self.model_name}:int8" if self.inference_backend == "quantized" else self.model_name
+
+    ## Replace the Linear layers of a torch model with dynamically quantized int8 ones
+    @staticmethod
+    def quantize_model(model):
+        import torch
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    ## inference_backend "torch", "quantized" (int8 Linear layers) or "onnx" (needs optimum[onnxruntime]),
+    ## num_threads sets the intra-op thread count
+    def _load_model(self):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        if self.num_threads:
+            # process wide setting, shared by every torch model in this worker
+            torch.set_num_threads(self.num_threads)
+
+        if self.inference_backend == "onnx":
+            model_kwargs = {"provider": "CPUExecutionProvider"}
+            if self.num_threads:
+                import onnxruntime
+                session_options = onnxruntime.SessionOptions()
+                session_options.intra_op_num_threads = self.num_threads
+                model_kwargs["session_options"] = session_options
+            return SentenceTransformer(self.model_name, backend="onnx", model_kwargs=model_kwargs)
+
+        model = SentenceTransformer(self.model_name, device="cpu" if self.inference_backend == "quantized" else None)
+        if self.inference_backend == "quantized":
+            model = self.quantize_model(model)
+        return model
+
+    ## Cache file, next to the vector store unless given explicitly
+    @property
+    def cache_path(self) -> str:
+        return self._cache_path or os.path.join(self.persist_dir, 'embedding_cache.sqlite3')
+
+    ## embeddings keyed by (model name, text hash), memory LRU + sqlite on disk
+    @property
+    def embedding_cache(self):
+        if self._embedding_cache is None and self.use_cache:
+            with self._init_lock:
+                if self._embedding_cache is None:
+                    self._embedding_cache = EmbeddingCache(memory_items=self.cache_size, disk_path=self.cache_path)
+        return self._embedding_cache
+
+    ## Micro-batching dispatcher shared by concurrent callers, None when disabled. Requests of up to
+    ## dispatch_max_batch texts wait at most dispatch_max_wait_ms to be merged into one model call
+    @property
+    def dispatcher(self) -> Optional[EmbeddingDispatcher]:
+        if self._dispatcher is None and self.use_dispatcher:
+            with self._init_lock:
+                if self._dispatcher is None:
+                    self._dispatcher = EmbeddingDispatcher(
+                        lambda texts: self.model.encode(texts, batch_size=self.encode_batch_size),
+                        max_batch_size=self.dispatch_max_batch,
+                        max_wait_ms=self.dispatch_max_wait_ms
+                    )
+        return self._dispatcher
+
+    ## Run the model, small requests go through the dispatcher when it is enabled
+    def _encode(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+        if self.dispatcher is not None and len(texts) <= self.dispatch_max_batch:
+            return self.dispatcher.encode(texts)
+        return np.asarray(self.model.encode(texts, batch_size=batch_size or self.encode_batch_size), dtype=np.float32)
+
+    ## Load client and model ahead of the first request
+    def warm_up(self, collection_names: Optional[List[str]] = None) -> Dict[str, float]:
+        timings = {}
+
+        t0 = time.perf_counter()
+        self.client
+        timings["client_seconds"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        # one encode also initializes tokenizer and inference kernels
+        self.model.encode(["warm up"])
+        timings["model_seconds"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        self.embedding_cache
+        for collection_name in collection_names or []:
+            self.get_collection(collection_name)
+        timings["collections_seconds"] = time.perf_counter() - t0
+
+        return timings
+
+    ## True once client and model are loaded
+    def is_warm(self) -> bool:
+        return self._client is not None and self._model is not None
 
     ## Get Embeddings
     def get_embedding(self,text:str) -> List[float]:
-        return self.model.encode(text).tolist()
+        return self.get_embeddings([text])[0]
+
+    ## Get Embeddings for many texts, cached ones are reused and the rest encoded in one pass per batch.
+    ## as_numpy returns one float32 matrix instead of python lists
+    def get_embeddings(self, texts: List[str], batch_size: Optional[int] = None, as_numpy: bool = False):
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32) if as_numpy else []
+
+        if self.embedding_cache is None:
+            encoded = self._encode(texts, batch_size)
+            return encoded if as_numpy else encoded.tolist()
+
+        vectors = self.embedding_cache.get_many(self.embedding_space, texts)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+        if missing:
+            encoded = self._encode(missing, batch_size)
+            self.embedding_cache.put_many(self.embedding_space, missing, encoded)
+            computed = dict(zip(missing, encoded))
+            vectors = [computed[text] if vector is None else vector for text, vector in zip(texts, vectors)]
+
+        vectors = np.vstack(vectors).astype(np.float32, copy=False)
+        return vectors if as_numpy else vectors.tolist()
+
+    ## Embedding cache hit rates and memory / disk usage
+    def cache_stats(self) -> Dict[str, Any]:
+        if self.embedding_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, "model_name": self.embedding_space, **self.embedding_cache.stats()}
+
+    ## Content fingerprint stored with each document, changes with the text or the model
+    def fingerprint(self, text: str) -> str:
+        return hashlib.sha256(f"{self.embedding_space}\0{text}".encode("utf-8")).hexdigest()
+
+    def _with_fingerprint(self, metadata: Optional[Dict[str, Any]], text: str) -> Dict[str, Any]:
+        return {**(metadata or {}), self.FINGERPRINT_KEY: self.fingerprint(text)}
+
+    ## Split documents into (text changed, metadata-only changed) index lists given the stored metadata
+    def _diff(self, existing: Dict[str, Dict[str, Any]], ids: List[str], metadatas: List[Dict[str, Any]]):
+        changed, metadata_only = [], []
+        for i, (doc_id, metadata) in enumerate(zip(ids, metadatas)):
+            stored = existing.get(doc_id)
+            if stored is None or stored.get(self.FINGERPRINT_KEY) != metadata[self.FINGERPRINT_KEY]:
+                changed.append(i)
+            elif stored != metadata:
+                metadata_only.append(i)
+        return changed, metadata_only
+
+    ## Stored metadata by id, for the given ids or (paged) the whole collection
+    def _get_metadatas(self, collection, ids: Optional[List[str]] = None, page_size: int = 1000):
+        if ids is not None:
+            result = collection.get(ids=ids, include=["metadatas"])
+            return dict(zip(result["ids"], [meta or {} for meta in result["metadatas"]]))
+
+        existing = {}
+        offset = 0
+        while True:
+            result = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+            existing.update(zip(result["ids"], [meta or {} for meta in result["metadatas"]]))
+            if len(result["ids"]) < page_size:
+                return existing
+            offset += page_size
+
+    ## BM25 index over a collection's documents for hybrid search, built on first use and kept current
+    ## by this service's writes
+    def lexical_index(self, collection_name: str, page_size: int = 1000) -> BM25Index:
+        index = self._lexical_indexes.get(collection_name)
+        if index is None:
+            index = BM25Index()
+            collection = self.get_collection(collection_name)
+            offset = 0
+            while True:
+                result = collection.get(include=["documents", "metadatas"], limit=page_size, offset=offset)
+                index.upsert(result["ids"], result["documents"], result["metadatas"])
+                if len(result["ids"]) < page_size:
+                    break
+                offset += page_size
+            self._lexical_indexes[collection_name] = index
+        return index
+
+    ## Rebuild the BM25 index from the collection, e.g. after another process wrote to it
+    def refresh_lexical_index(self, collection_name: str) -> BM25Index:
+        self._lexical_indexes.pop(collection_name, None)
+        return self.lexical_index(collection_name)
+
+    ## Keep an already built BM25 index in step with a write
+    def _lexical_write(self, collection_name: str, ids: List[str], texts: Optional[List[str]] = None,
+                       metadatas: Optional[List[Dict[str, Any]]] = None, delete: bool = False):
+        index = self._lexical_indexes.get(collection_name)
+        if index is None:
+            return
+        if delete:
+            index.delete(ids)
+        elif texts is None:
+            index.update_metadata(ids, metadatas)
+        else:
+            index.upsert(ids, texts, metadatas)
 
     ## get_collections
     def get_collection(self,collection_name: str):
         return self.client.get_or_create_collection(name=collection_name)
 
-    ## Load Data into vector store
-    def load_data(self, doc_id, meta_data, collection_name: str, text: str):
+    ## Load Data into vector store, replacing the document if doc_id exists; the embedding is only
+    ## echoed back when return_embeddings is set
+    def load_data(self, doc_id, meta_data, collection_name: str, text: str, return_embeddings: bool = False):
         collection = self.get_collection(collection_name)
-        embeddings = self.get_embedding(text)
-        collection.add(documents=[text], embeddings=[embeddings], metadatas=[meta_data], ids=[doc_id])
+        embeddings = self.get_embeddings([text], as_numpy=True)
+        metadata = self._with_fingerprint(meta_data, text)
+        collection.upsert(documents=[text], embeddings=embeddings, metadatas=[metadata], ids=[doc_id])
+        self._lexical_write(collection_name, [doc_id], [text], [metadata])
 
-        return {
+        result = {
             "id": doc_id,
             "text": text,
             "meta_data": meta_data,
-            "embeddings": embeddings,
             "collection_name": collection_name,
             "status":"success"
         }
+        if return_embeddings:
+            result["embeddings"] = embeddings[0].tolist()
+        return result
+
+    ## Bulk add / upsert: encode in batches, write to chroma in chunks
+    def _write_many(self, method: str, collection_name: str, ids: List[str], texts: List[str],
+                    metadatas: Optional[List[Dict[str, Any]]] = None,
+                    encode_batch_size: Optional[int] = None, write_batch_size: Optional[int] = None,
+                    skip_unchanged: bool = False):
+        if len(ids) != len(texts) or (metadatas is not None and len(metadatas) != len(ids)):
+            raise ValueError("ids, texts and metadatas must have the same length")
+
+        collection = self.get_collection(collection_name)
+        write = getattr(collection, method)
+        # chroma rejects writes above its max batch size
+        write_batch_size = min(write_batch_size or self.write_batch_size, self.client.get_max_batch_size())
+        metadatas = [self._with_fingerprint(meta, text) for meta, text in zip(metadatas or [None] * len(ids), texts)]
+
+        embedded = 0
+        metadata_updated = 0
+        encode_seconds = 0.0
+        write_seconds = 0.0
+        started = time.perf_counter()
+
+        for start in range(0, len(ids), write_batch_size):
+            end = start + write_batch_size
+            chunk_ids, chunk_texts, chunk_metadatas = ids[start:end], texts[start:end], metadatas[start:end]
+
+            if skip_unchanged:
+                changed, metadata_only = self._diff(self._get_metadatas(collection, chunk_ids), chunk_ids, chunk_metadatas)
+                if metadata_only:
+                    collection.update(ids=[chunk_ids[i] for i in metadata_only],
+                                      metadatas=[chunk_metadatas[i] for i in metadata_only])
+                    self._lexical_write(collection_name, [chunk_ids[i] for i in metadata_only],
+                                        metadatas=[chunk_metadatas[i] for i in metadata_only])
+                    metadata_updated += len(metadata_only)
+                chunk_ids = [chunk_ids[i] for i in changed]
+                chunk_texts = [chunk_texts[i] for i in changed]
+                chunk_metadatas = [chunk_metadatas[i] for i in changed]
+                if not chunk_ids:
+                    continue
+
+            t0 = time.perf_counter()
+            embeddings = self.get_embeddings(chunk_texts, batch_size=encode_batch_size, as_numpy=True)
+            t1 = time.perf_counter()
+
+            write(ids=chunk_ids, documents=chunk_texts, embeddings=embeddings, metadatas=chunk_metadatas)
+            self._lexical_write(collection_name, chunk_ids, chunk_texts, chunk_metadatas)
+
+            embedded += len(chunk_ids)
+            encode_seconds += t1 - t0
+            write_seconds += time.perf_counter() - t1
+
+        total_seconds = time.perf_counter() - started
+
+        return {
+            "collection_name": collection_name,
+            "count": len(ids),
+            "embedded": embedded,
+            "metadata_updated": metadata_updated,
+            "skipped": len(ids) - embedded - metadata_updated,
+            "encode_seconds": encode_seconds,
+            "write_seconds": write_seconds,
+            "total_seconds": total_seconds,
+            "docs_per_sec": len(ids) / total_seconds if total_seconds > 0 else 0.0,
+            "status": "success"
+        }
 
-    ## clear collection
-    def clear_collection(self,collection_name: str):
+    def add_many(self, collection_name: str, ids: List[str], texts: List[str],
+                 metadatas: Optional[List[Dict[str, Any]]] = None,
+                 encode_batch_size: Optional[int] = None, write_batch_size: Optional[int] = None):
+        return self._write_many("add", collection_name, ids, texts, metadatas, encode_batch_size, write_batch_size)
+
+    ## Upsert, documents whose fingerprint matches are not re-embedded unless skip_unchanged is False
+    def upsert_many(self, collection_name: str, ids: List[str], texts: List[str],
+                    metadatas: Optional[List[Dict[str, Any]]] = None,
+                    encode_batch_size: Optional[int] = None, write_batch_size: Optional[int] = None,
+                    skip_unchanged: bool = True):
+        return self._write_many("upsert", collection_name, ids, texts, metadatas, encode_batch_size,
+                                write_batch_size, skip_unchanged=skip_unchanged)
+
+    ## Reconcile a collection with the source of truth: {doc_id: (text, metadata)}.
+    ## delete_filter narrows the ids missing from documents down to the ones that may be deleted
+    def sync_collection(self, collection_name: str, documents: Dict[str, Any], delete_missing: bool = True,
+                        delete_filter: Optional[Callable[[List[str]], List[str]]] = None):
+        started = time.perf_counter()
         collection = self.get_collection(collection_name)
-        existing_ids=collection.get()["ids"]
-        if existing_ids:
-            collection.delete(ids=existing_ids)
+        existing = self._get_metadatas(collection)
+
+        ids = list(documents)
+        texts = [documents[doc_id][0] for doc_id in ids]
+        metadatas = [self._with_fingerprint(documents[doc_id][1], documents[doc_id][0]) for doc_id in ids]
+        changed, metadata_only = self._diff(existing, ids, metadatas)
+
+        if changed:
+            self._write_many("upsert", collection_name, [ids[i] for i in changed], [texts[i] for i in changed],
+                             [documents[ids[i]][1] for i in changed])
 
-    ## add resume
-    def add_resume(self, resume_id: str, text: str, metadata):
+        write_batch_size = min(self.write_batch_size, self.client.get_max_batch_size())
+        for start in range(0, len(metadata_only), write_batch_size):
+            chunk = metadata_only[start:start + write_batch_size]
+            collection.update(ids=[ids[i] for i in chunk], metadatas=[metadatas[i] for i in chunk])
+            self._lexical_write(collection_name, [ids[i] for i in chunk], metadatas=[metadatas[i] for i in chunk])
+
+        stale_ids = [doc_id for doc_id in existing if doc_id not in documents] if delete_missing else []
+        if stale_ids and delete_filter is not None:
+            stale_ids = delete_filter(stale_ids)
+        for start in range(0, len(stale_ids), write_batch_size):
+            collection.delete(ids=stale_ids[start:start + write_batch_size])
+        self._lexical_write(collection_name, stale_ids, delete=True)
+
+        return {
+            "collection_name": collection_name,
+            "source_count": len(ids),
+            "indexed_count": len(existing),
+            "embedded": len(changed),
+            "metadata_updated": len(metadata_only),
+            "unchanged": len(ids) - len(changed) - len(metadata_only),
+            "deleted": len(stale_ids),
+            "total_seconds": time.perf_counter() - started
+        }
+
+    ## clear collection by dropping and recreating it, so no ids are loaded whatever its size.
+    ## The chunk collection, if any, is cleared with it.
+    def clear_collection(self,collection_name: str, include_chunks: bool = True):
+        existing = set(self.client.list_collections())
+        names = [collection_name]
+        if include_chunks and self.chunk_collection_name(collection_name) in existing:
+            names.append(self.chunk_collection_name(collection_name))
+
+        for name in names:
+            if name in existing:
+                self.client.delete_collection(name)
+            self._lexical_indexes.pop(name, None)
+        self.get_collection(collection_name)
+
+    ## Bulk delete by metadata, e.g. delete_where("job_post", {"status": "closed"}).
+    ## The store deletes matching records itself; returns the number removed per collection.
+    def delete_where(self, collection_name: str, filters: Optional[Dict[str, Any]] = None,
+                     where: Optional[Dict[str, Any]] = None, where_document: Optional[Dict[str, Any]] = None,
+                     include_chunks: bool = True) -> Dict[str, int]:
+        if filters:
+            where = self.build_where(filters) if where is None else {"$and": [where, self.build_where(filters)]}
+        if not where and not where_document:
+            raise ValueError("delete_where needs a filter, use clear_collection to remove everything")
+
+        names = [collection_name]
+        # chunks carry their parent's metadata, so the same filter selects them
+        if include_chunks and where and self.chunk_collection_name(collection_name) in self.client.list_collections():
+            names.append(self.chunk_collection_name(collection_name))
+
+        deleted = {}
+        for name in names:
+            collection = self.get_collection(name)
+            before = collection.count()
+            collection.delete(where=where, where_document=where_document)
+            deleted[name] = before - collection.count()
+            if deleted[name]:
+                # ids are not known here, rebuild the BM25 index on next use
+                self._lexical_indexes.pop(name, None)
+        return deleted
+
+    ## Fold legacy per-resume collections ("resume<resume_id>") into the shared "resume" collection.
+    ## Stored embeddings are copied as they are, nothing is re-encoded.
+    def migrate_resume_collections(self, target: str = "resume", prefix: str = "resume",
+                                   drop_source: bool = True, dry_run: bool = False):
+        started = time.perf_counter()
+        # legacy names are the prefix followed by a uuid resume id
+        sources = [name for name in self.client.list_collections()
+                   if name.startswith(prefix) and re.fullmatch(r"[0-9a-fA-F-]{32,36}", name[len(prefix):])]
+
+        migrated = 0
+        target_collection = None if dry_run else self.get_collection(target)
+        for name in sources:
+            source = self.client.get_collection(name)
+            result = source.get(include=["documents", "metadatas", "embeddings"])
+            if dry_run:
+                migrated += len(result["ids"])
+                continue
+
+            if result["ids"]:
+                migrated += self._migrate_resume_documents(target, target_collection, name[len(prefix):], result)
+
+            if drop_source:
+                self.client.delete_collection(name)
+
+        return {
+            "collections": len(sources),
+            "documents": migrated,
+            "dropped": len(sources) if drop_source and not dry_run else 0,
+            "dry_run": dry_run,
+            "total_seconds": time.perf_counter() - started
+        }
+
+    ## Re-key one legacy collection to the resume id: a single document becomes '<resume_id>',
+    ## several become chunks '<resume_id>#<n>' of that resume in the chunk collection
+    def _migrate_resume_documents(self, target: str, target_collection, resume_id: str, result) -> int:
+        count = len(result["ids"])
+        metadatas = []
+        for i, (text, metadata) in enumerate(zip(result["documents"], result["metadatas"])):
+            metadata = self._filterable_metadata(metadata, resume_id=resume_id)
+            metadata.setdefault("status", "active")
+            if count > 1:
+                metadata.update({"parent_id": resume_id, "chunk_index": i, "chunk_count": count})
+            metadatas.append(self._with_fingerprint(metadata, text))
+
+        if count == 1:
+            name, collection, ids = target, target_collection, [resume_id]
+        else:
+            name = self.chunk_collection_name(target)
+            collection = self.get_collection(name)
+            ids = [f"{resume_id}#{i}" for i in range(count)]
+
+        collection.upsert(ids=ids, documents=result["documents"], embeddings=result["embeddings"], metadatas=metadatas)
+        self._lexical_write(name, ids, result["documents"], metadatas)
+        return count
+
+    ## Metadata with the filterable fields set, None values dropped since chroma rejects them
+    @staticmethod
+    def _filterable_metadata(metadata: Optional[Dict[str, Any]], **fields) -> Dict[str, Any]:
+        merged = dict(metadata or {})
+        merged.update({key: value for key, value in fields.items() if value is not None})
+        return {key: value for key, value in merged.items() if value is not None}
+
+    ## Chroma where clause from {field: value}, a list value matches any of its items
+    @staticmethod
+    def build_where(filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if not filters:
+            return None
+
+        clauses = []
+        for key, value in filters.items():
+            if value is None:
+                continue
+            if key.startswith("$") or isinstance(value, dict):
+                # already a chroma operator expression
+                clauses.append({key: value})
+            elif isinstance(value, (list, tuple, set)):
+                clauses.append({key: {"$in": list(value)}})
+            else:
+                clauses.append({key: value})
+
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+    ## add resume, metadata always carries resume_id and the status / location filters
+    def add_resume(self, resume_id: str, text: str, metadata=None, location: Optional[str] = None,
+                   status: Optional[str] = None):
+        metadata = self._filterable_metadata(metadata, resume_id=resume_id, location=location, status=status)
+        metadata.setdefault("status", "active")
         return self.load_data(collection_name="resume", doc_id=resume_id, meta_data=metadata, text=text)
 
-    ## add JobPost
-    def add_job_post(self, job_post_id: str, text: str, metadata):
+    ## add JobPost, metadata always carries job_post_id and the status / location filters
+    def add_job_post(self, job_post_id: str, text: str, metadata=None, location: Optional[str] = None,
+                     status: Optional[str] = None):
+        metadata = self._filterable_metadata(metadata, job_post_id=job_post_id, location=location, status=status)
+        metadata.setdefault("status", "active")
         return self.load_data(collection_name="job_post", doc_id=job_post_id, meta_data=metadata, text=text)
 
-    ## search jobs using resume embeddings
-    def search_jobs_for_resume(self,resume_text: str, k=5):
-        embeddings=self.get_embedding(resume_text)
-        jobs = self.get_collection("job_post").query(
-            query_embeddings=[embeddings],
-            n_results=k
-        )
-
-        output=[]
-
-        for doc, meta, dist, id_  in zip(jobs['documents'], jobs['metadatas'], jobs['distances'], jobs['ids']):
-            output.append({
-                "id": id_,
-                "text": doc,
-                "meta_data": meta,
-                "distance": dist,
-                "collection_name": "job_post",
-            })
-        return output
+    ## Top-k hits for many query texts: one encode pass, one chroma query per chunk of queries
+    ## filters / where / where_document are applied by chroma inside the query, not on the returned hits
+    def query_many(self, collection_name: str, texts: List[str], k: int = 5,
+                   filters: Optional[Dict[str, Any]] = None, where: Optional[Dict[str, Any]] = None,
+                   where_document: Optional[Dict[str, Any]] = None,
+                   encode_batch_size: Optional[int] = None, query_batch_size: Optional[int] = None) -> List[List[Dict[str, Any]]]:
+        if not texts:
+            return []
 
-    ## search resumes for jobs
-    def search_resumes_for_job(self,job_text: str, k=5):
-        embeddings=self.get_embedding(job_text)
-        resumes = self.get_collection("resume").query(
-            query_embeddings=[embeddings],
-            n_results=k
-        )
-
-        output=[]
-
-        for doc,meta,dist, id_ in zip(resumes.get('documents'), resumes.get('metadatas'), resumes.get('distances'), resumes.get('ids')):
-
-            output.append({
-                "id": id_,
-                "text": doc,
-                "meta_data": meta,
-                "distance": dist,
-                "collection_name": "resume"
-            })
-        return output
+        if filters:
+            where = self.build_where(filters) if where is None else {"$and": [where, self.build_where(filters)]}
 
+        embeddings = self.get_embeddings(texts, batch_size=encode_batch_size, as_numpy=True)
+        return self._query_embeddings(collection_name, embeddings, k, where, where_document, query_batch_size)
 
-    ### update the docs
-    def update_docs(self,collection_name: str, doc_id: str, text: str, metadata):
+    ## Top-k hits for already encoded queries
+    def _query_embeddings(self, collection_name: str, embeddings, k: int, where: Optional[Dict[str, Any]] = None,
+                          where_document: Optional[Dict[str, Any]] = None, query_batch_size: Optional[int] = None):
         collection = self.get_collection(collection_name)
-        collection.delete(ids=[doc_id])
-        embeddings = self.get_embedding(text)
-        collection.add(documents=[text], embeddings=[embeddings], metadatas=[metadata], ids=[doc_id])
+        query_batch_size = min(query_batch_size or self.write_batch_size, self.client.get_max_batch_size())
 
-        return {
+        output = []
+        for start in range(0, len(embeddings), query_batch_size):
+            result = collection.query(
+                query_embeddings=embeddings[start:start + query_batch_size],
+                n_results=k,
+                where=where,
+                where_document=where_document,
+                include=["documents", "metadatas", "distances"]
+            )
+            # chroma returns one inner list per query embedding
+            for ids, docs, metas, dists in zip(result["ids"], result["documents"],
+                                               result["metadatas"], result["distances"]):
+                output.append([
+                    {
+                        "id": id_,
+                        "text": doc,
+                        "meta_data": meta,
+                        "distance": dist,
+                        "collection_name": collection_name
+                    }
+                    for id_, doc, meta, dist in zip(ids, docs, metas, dists)
+                ])
+        return output
+
+    ## Hybrid retrieval: vector and BM25 candidates merged with reciprocal rank fusion.
+    ## Returns {"results": one hit list per query, "timings": seconds per stage}
+    def hybrid_search(self, collection_name: str, texts: List[str], k: int = 5,
+                      filters: Optional[Dict[str, Any]] = None, where_document: Optional[Dict[str, Any]] = None,
+                      vector_k: Optional[int] = None, lexical_k: Optional[int] = None, rrf_k: int = 60):
+        vector_k = vector_k or k * 4
+        lexical_k = lexical_k or k * 4
+        where = self.build_where(filters)
+        timings = {}
+        started = time.perf_counter()
+
+        t0 = time.perf_counter()
+        embeddings = self.get_embeddings(texts, as_numpy=True)
+        timings["encode_seconds"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        vector_hits = self._query_embeddings(collection_name, embeddings, vector_k, where, where_document) if texts else []
+        timings["vector_seconds"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        index = self.lexical_index(collection_name)
+        timings["lexical_index_seconds"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        lexical_hits = [index.search(text, lexical_k, where, where_document) for text in texts]
+        timings["lexical_seconds"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        results = []
+        for hits, lexical in zip(vector_hits, lexical_hits):
+            by_id = {hit["id"]: hit for hit in hits}
+            vector_ranks = {hit["id"]: rank for rank, hit in enumerate(hits, start=1)}
+            lexical_ranks = {doc_id: rank for rank, (doc_id, _) in enumerate(lexical, start=1)}
+            lexical_scores = dict(lexical)
+
+            fused = reciprocal_rank_fusion([[hit["id"] for hit in hits], [doc_id for doc_id, _ in lexical]], rrf_k)
+            output = []
+            for doc_id, score in fused[:k]:
+                hit = by_id.get(doc_id)
+                if hit is None:
+                    text, metadata = index.get(doc_id)
+                    hit = {"id": doc_id, "text": text, "meta_data": metadata, "distance": None,
+                           "collection_name": collection_name}
+                output.append({
+                    **hit,
+                    "score": score,
+                    "vector_rank": vector_ranks.get(doc_id),
+                    "lexical_rank": lexical_ranks.get(doc_id),
+                    "bm25": lexical_scores.get(doc_id)
+                })
+            results.append(output)
+        timings["fusion_seconds"] = time.perf_counter() - t0
+        timings["total_seconds"] = time.perf_counter() - started
+
+        return {"results": results, "timings": timings}
+
+    ## Dispatch on retrieval mode: "vector", "hybrid" or "chunked"
+    def _search(self, collection_name: str, texts: List[str], k: int, filters, where_document, mode: str):
+        if mode == "chunked":
+            return self.search_chunked(collection_name, texts, k=k, filters=filters, where_document=where_document)
+        if mode == "hybrid":
+            return self.hybrid_search(collection_name, texts, k=k, filters=filters, where_document=where_document)["results"]
+        if mode == "vector":
+            return self.query_many(collection_name, texts, k=k, filters=filters, where_document=where_document)
+        raise ValueError("mode must be 'vector', 'hybrid' or 'chunked'")
+
+    ## search jobs for many resumes, results in the order of resume_texts
+    def search_jobs_for_resumes(self, resume_texts: List[str], k=5, filters: Optional[Dict[str, Any]] = None,
+                                where_document: Optional[Dict[str, Any]] = None, chunked: bool = False,
+                                mode: str = "vector"):
+        return self._search("job_post", resume_texts, k, filters, where_document, "chunked" if chunked else mode)
+
+    ## search resumes for many jobs, results in the order of job_texts
+    def search_resumes_for_jobs(self, job_texts: List[str], k=5, filters: Optional[Dict[str, Any]] = None,
+                                where_document: Optional[Dict[str, Any]] = None, chunked: bool = False,
+                                mode: str = "vector"):
+        return self._search("resume", job_texts, k, filters, where_document, "chunked" if chunked else mode)
+
+    ## search jobs using resume embeddings, e.g. filters={"status": "active"}
+    def search_jobs_for_resume(self,resume_text: str, k=5, filters: Optional[Dict[str, Any]] = None,
+                               where_document: Optional[Dict[str, Any]] = None, chunked: bool = False,
+                               mode: str = "vector"):
+        return self.search_jobs_for_resumes([resume_text], k=k, filters=filters, where_document=where_document,
+                                            chunked=chunked, mode=mode)[0]
+
+    ## search resumes for jobs, e.g. filters={"location": "Pune", "status": "active"}
+    def search_resumes_for_job(self,job_text: str, k=5, filters: Optional[Dict[str, Any]] = None,
+                               where_document: Optional[Dict[str, Any]] = None, chunked: bool = False,
+                               mode: str = "vector"):
+        return self.search_resumes_for_jobs([job_text], k=k, filters=filters, where_document=where_document,
+                                            chunked=chunked, mode=mode)[0]
+
+    ## Chunk collection for a document collection
+    def chunk_collection_name(self, collection_name: str) -> str:
+        return f"{collection_name}{self.CHUNK_SUFFIX}"
+
+    ## Split {doc_id: (text, metadata)} into {chunk_id: (chunk_text, metadata)} linked by parent_id
+    def chunk_documents(self, documents: Dict[str, Any], chunk_size: Optional[int] = None,
+                        chunk_overlap: Optional[int] = None) -> Dict[str, Any]:
+        from utils.text_utility import TextUtility
+
+        chunks = {}
+        for doc_id, (text, metadata) in documents.items():
+            pieces = TextUtility.split_text(text, chunk_size or self.chunk_size, chunk_overlap or self.chunk_overlap) or [text]
+            for i, piece in enumerate(pieces):
+                chunks[f"{doc_id}#{i}"] = (piece, {
+                    **(metadata or {}),
+                    "parent_id": doc_id,
+                    "chunk_index": i,
+                    "chunk_count": len(pieces)
+                })
+        return chunks
+
+    ## Index documents as chunks, all chunks encoded in batches; stale chunks of these parents are removed
+    def index_chunks(self, collection_name: str, ids: List[str], texts: List[str],
+                     metadatas: Optional[List[Dict[str, Any]]] = None):
+        if len(ids) != len(texts) or (metadatas is not None and len(metadatas) != len(ids)):
+            raise ValueError("ids, texts and metadatas must have the same length")
+
+        chunk_collection = self.chunk_collection_name(collection_name)
+        chunks = self.chunk_documents(dict(zip(ids, zip(texts, metadatas or [None] * len(ids)))))
+        chunk_ids = list(chunks)
+        result = self.upsert_many(chunk_collection, chunk_ids,
+                                  [chunks[chunk_id][0] for chunk_id in chunk_ids],
+                                  [chunks[chunk_id][1] for chunk_id in chunk_ids])
+
+        collection = self.get_collection(chunk_collection)
+        stale_ids = []
+        for start in range(0, len(ids), self.write_batch_size):
+            existing = collection.get(where={"parent_id": {"$in": ids[start:start + self.write_batch_size]}}, include=[])
+            stale_ids.extend(chunk_id for chunk_id in existing["ids"] if chunk_id not in chunks)
+        if stale_ids:
+            collection.delete(ids=stale_ids)
+            self._lexical_write(chunk_collection, stale_ids, delete=True)
+
+        return {**result, "documents": len(ids), "chunks": len(chunk_ids), "deleted": len(stale_ids)}
+
+    ## Top-k parent documents per query, scored from their best matching chunks.
+    ## aggregate "max" uses the closest chunk, "mean_top_n" the mean of the top_n closest chunks.
+    def search_chunked(self, collection_name: str, texts: List[str], k: int = 5, aggregate: str = "max",
+                       top_n: int = 3, fetch_k: Optional[int] = None, filters: Optional[Dict[str, Any]] = None,
+                       where_document: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        if aggregate not in ("max", "mean_top_n"):
+            raise ValueError("aggregate must be 'max' or 'mean_top_n'")
+
+        # several chunks per parent come back, so fetch enough chunks to fill k parents
+        fetch_k = fetch_k or max(k * top_n * 4, 20)
+        chunk_hits = self.query_many(self.chunk_collection_name(collection_name), texts, k=fetch_k,
+                                     filters=filters, where_document=where_document)
+
+        output = []
+        for hits in chunk_hits:
+            parents = {}
+            for hit in hits:
+                parents.setdefault(hit["meta_data"]["parent_id"], []).append(hit)
+
+            ranked = []
+            for parent_id, parent_hits in parents.items():
+                # hits arrive sorted by distance, closest first
+                distances = [hit["distance"] for hit in parent_hits]
+                distance = distances[0] if aggregate == "max" else float(np.mean(distances[:top_n]))
+                ranked.append({
+                    "id": parent_id,
+                    "distance": distance,
+                    "matched_chunks": [{"id": hit["id"], "text": hit["text"], "distance": hit["distance"]}
+                                       for hit in parent_hits[:top_n]],
+                    "meta_data": {key: value for key, value in parent_hits[0]["meta_data"].items()
+                                  if key not in ("chunk_index", self.FINGERPRINT_KEY)},
+                    "collection_name": collection_name
+                })
+
+            ranked.sort(key=lambda item: item["distance"])
+            output.append(ranked[:k])
+        return output
+
+    ### update the docs, re-embedding only when the text changed
+    def update_docs(self,collection_name: str, doc_id: str, text: str, metadata, return_embeddings: bool = False):
+        result = self.upsert_many(collection_name, [doc_id], [text], [metadata])
+        reembedded = result["embedded"] == 1
+
+        output = {
             "id": doc_id,
             "text": text,
             "meta_data": metadata,
-            "embeddings": embeddings,
+            "reembedded": reembedded,
             "collection_name": collection_name,
-            "status":"success"
+            "status": "success" if reembedded or result["metadata_updated"] else "unchanged"
         }
+        if return_embeddings:
+            output["embeddings"] = self.get_embedding(text)
+        return output
 
 
 chroma_db_service = ChromaVectorDBService()
\ No newline at end of file
@@ -0,0 +1,132 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache keyed by (model name, text hash).
+    An in-memory LRU sits in front of a SQLite table, so embeddings
+    survive restarts and are shared by processes using the same file.
+    """
+
+    def __init__(self, memory_items: int = 10000, disk_path: Optional[str] = None):
+        self.memory_items = memory_items
+        self.disk_path = disk_path
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        self._conn = None
+
+        if disk_path:
+            os.makedirs(os.path.dirname(os.path.abspath(disk_path)), exist_ok=True)
+            self._conn = sqlite3.connect(disk_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, model_name TEXT NOT NULL, dim INTEGER NOT NULL, vector BLOB NOT NULL)"
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(model_name: str, text: str) -> str:
+        return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def _remember(self, key, vector):
+        if self.memory_items <= 0:
+            return
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        self._memory[key] = vector
+        self._memory_bytes += vector.nbytes
+        while len(self._memory) > self.memory_items:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.nbytes
+
+    def get_many(self, model_name: str, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Cached vectors in the order of texts, None for misses
+        """
+        keys = [self.make_key(model_name, text) for text in texts]
+        results = [None] * len(texts)
+        pending = {}
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    results[i] = vector
+                else:
+                    pending.setdefault(key, []).append(i)
+
+            if pending and self._conn is not None:
+                found = {}
+                pending_keys = list(pending)
+                # Stay below SQLite's bound parameter limit
+                for start in range(0, len(pending_keys), 500):
+                    chunk = pending_keys[start:start + 500]
+                    rows = self._conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                    ).fetchall()
+                    found.update(rows)
+                for key, blob in found.items():
+                    vector = np.frombuffer(blob, dtype=np.float32)
+                    self._remember(key, vector)
+                    for i in pending.pop(key):
+                        results[i] = vector
+                        self._stats["disk_hits"] += 1
+
+            self._stats["misses"] += sum(len(indexes) for indexes in pending.values())
+
+        return results
+
+    def put_many(self, model_name: str, texts: List[str], vectors) -> None:
+        rows = []
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                vector = np.asarray(vector, dtype=np.float32)
+                key = self.make_key(model_name, text)
+                self._remember(key, vector)
+                rows.append((key, model_name, vector.shape[0], vector.tobytes()))
+
+            if rows and self._conn is not None:
+                self._conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)", rows)
+                self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = sum(self._stats.values())
+            hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+            disk_entries, disk_bytes = 0, 0
+            if self._conn is not None:
+                disk_entries, disk_bytes = self._conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+                ).fetchone()
+
+            return {
+                **self._stats,
+                "lookups": lookups,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_entries": disk_entries,
+                "disk_bytes": disk_bytes,
+                "disk_file_bytes": os.path.getsize(self.disk_path) if self.disk_path and os.path.exists(self.disk_path) else 0
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM embeddings")
+                self._conn.commit()
@@ -0,0 +1,121 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional
+
+import numpy as np
+
+
+class EmbeddingDispatcher:
+    """
+    Micro-batches encode requests from concurrent callers. A single worker
+    thread takes the first pending request, keeps collecting requests for
+    up to max_wait_ms or until max_batch_size texts are queued, encodes them
+    in one model call and hands every caller its own rows back. A request
+    that does not fit is split at max_batch_size; its remaining texts open
+    the next batch.
+    """
+
+    def __init__(self, encode_fn: Callable[[List[str]], np.ndarray], max_batch_size: int = 64,
+                 max_wait_ms: float = 5.0):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+
+        self._queue = queue.Queue()
+        # (request, start) of a request split at the end of the previous batch
+        self._carry = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "texts": 0, "batches": 0, "encoded": 0}
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="embedding-dispatcher", daemon=True)
+                self._thread.start()
+
+    def submit(self, texts: List[str]) -> Future:
+        """
+        Queue texts for encoding, the future resolves to a float32 matrix
+        """
+        future = Future()
+        if not texts:
+            future.set_result(np.zeros((0, 0), dtype=np.float32))
+            return future
+
+        self._start()
+        # texts, future, rows encoded so far
+        self._queue.put((list(texts), future, []))
+        return future
+
+    def encode(self, texts: List[str], timeout: Optional[float] = None) -> np.ndarray:
+        return self.submit(texts).result(timeout=timeout)
+
+    ## (request, start, end) slices with at most max_batch_size texts in total
+    def _collect(self):
+        if self._carry is not None:
+            (request, start), self._carry = self._carry, None
+        else:
+            request, start = self._queue.get(), 0
+        batch, size = [], 0
+        deadline = time.monotonic() + self.max_wait_ms / 1000.0
+
+        while True:
+            end = min(len(request[0]), start + self.max_batch_size - size)
+            batch.append((request, start, end))
+            size += end - start
+            if end < len(request[0]):
+                self._carry = (request, end)
+                break
+            remaining = deadline - time.monotonic()
+            if size >= self.max_batch_size or remaining <= 0:
+                break
+            try:
+                request, start = self._queue.get(timeout=remaining), 0
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            # the same text asked for by several callers is encoded once
+            unique = list(dict.fromkeys(text for (texts, _, _), start, end in batch for text in texts[start:end]))
+
+            try:
+                vectors = np.asarray(self.encode_fn(unique), dtype=np.float32)
+            except Exception as e:
+                for (_, future, _), _, _ in batch:
+                    future.set_exception(e)
+                # the rest of a failed request is not encoded
+                self._carry = None
+                continue
+
+            rows = {text: i for i, text in enumerate(unique)}
+            finished = []
+            for (texts, future, parts), start, end in batch:
+                parts.append(vectors[[rows[text] for text in texts[start:end]]])
+                if end == len(texts):
+                    finished.append((future, parts))
+
+            with self._lock:
+                self._stats["requests"] += len(finished)
+                self._stats["texts"] += sum(end - start for _, start, end in batch)
+                self._stats["batches"] += 1
+                self._stats["encoded"] += len(unique)
+
+            for future, parts in finished:
+                future.set_result(parts[0] if len(parts) == 1 else np.vstack(parts))
+
+    def stats(self) -> dict:
+        with self._lock:
+            batches = self._stats["batches"]
+            return {
+                **self._stats,
+                "pending": self._queue.qsize(),
+                "mean_batch_size": self._stats["encoded"] / batches if batches else 0.0,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait_ms
+            }
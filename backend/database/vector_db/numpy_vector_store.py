@@ -0,0 +1,695 @@
+import glob
+import json
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    # no flock on Windows, writes are then only serialized within one process
+    fcntl = None
+
+from .vector_store import VectorStore, VectorCollection
+
+
+## Chroma style metadata filter, e.g. {"$and": [{"status": "active"}, {"years": {"$gte": 3}}]}
+def match_where(metadata: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+    if not where:
+        return True
+
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(match_where(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(match_where(metadata, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            for op, operand in condition.items():
+                if op == "$eq" and value != operand:
+                    return False
+                if op == "$ne" and value == operand:
+                    return False
+                if op == "$in" and value not in operand:
+                    return False
+                if op == "$nin" and value in operand:
+                    return False
+                if op in ("$gt", "$gte", "$lt", "$lte"):
+                    if value is None or isinstance(value, str) != isinstance(operand, str):
+                        return False
+                    if op == "$gt" and not value > operand:
+                        return False
+                    if op == "$gte" and not value >= operand:
+                        return False
+                    if op == "$lt" and not value < operand:
+                        return False
+                    if op == "$lte" and not value <= operand:
+                        return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+## Chroma style document filter, e.g. {"$contains": "python"}
+def match_document(document: Optional[str], where_document: Optional[Dict[str, Any]]) -> bool:
+    if not where_document:
+        return True
+
+    document = document or ""
+    for op, operand in where_document.items():
+        if op == "$and" and not all(match_document(document, clause) for clause in operand):
+            return False
+        if op == "$or" and not any(match_document(document, clause) for clause in operand):
+            return False
+        if op == "$contains" and operand not in document:
+            return False
+        if op == "$not_contains" and operand in document:
+            return False
+        if op == "$regex" and not re.search(operand, document):
+            return False
+        if op == "$not_regex" and re.search(operand, document):
+            return False
+    return True
+
+
+STORAGE_DTYPES = ("float32", "float16", "int8")
+
+
+## Search copy of float32 vectors: float16, or int8 codes with a per-row min / step
+def quantize(vectors: np.ndarray, storage_dtype: str):
+    if storage_dtype == "float32":
+        return vectors, None
+    if storage_dtype == "float16":
+        return vectors.astype(np.float16), None
+
+    # per row, so the codes of a row do not depend on the rows written with it
+    low = vectors.min(axis=1, keepdims=True)
+    step = (vectors.max(axis=1, keepdims=True) - low) / 255.0
+    step[step == 0] = 1.0
+    codes = np.clip(np.rint((vectors - low) / step) - 128, -128, 127).astype(np.int8)
+    return codes, np.hstack([low, step]).astype(np.float32)
+
+
+def dequantize(codes: np.ndarray, scales: Optional[np.ndarray]) -> np.ndarray:
+    if codes.dtype == np.int8:
+        return scales[:, :1] + scales[:, 1:] * (codes.astype(np.float32) + 128.0)
+    return np.asarray(codes, dtype=np.float32)
+
+
+class NumpySegment:
+    """
+    Immutable block of rows written together: float32 vectors, the search
+    copy scanned for queries (the vectors themselves for float32), the
+    (min, step) of each row for int8 codes and the squared norms of the
+    search copy.
+    """
+
+    def __init__(self, name: str, storage_dtype: str, vectors: np.ndarray, codes: np.ndarray,
+                 scales: Optional[np.ndarray], block_rows: int):
+        self.name = name
+        self.storage_dtype = storage_dtype
+        self.vectors = vectors
+        self.codes = codes
+        self.scales = scales
+        self.rows = len(vectors)
+
+        self.norms = np.empty(self.rows, dtype=np.float32)
+        for start in range(0, self.rows, block_rows):
+            block = dequantize(codes[start:start + block_rows],
+                               scales[start:start + block_rows] if scales is not None else None)
+            self.norms[start:start + len(block)] = np.einsum("ij,ij->i", block, block)
+
+
+class NumpyVectorCollection(VectorCollection):
+    """
+    Nearest neighbour search over an embedding matrix with one matrix
+    product per block of rows for a whole batch of queries. Distances are
+    squared L2, like chroma's default space, so results from both backends
+    are comparable.
+
+    Full float32 vectors are always kept on disk. With storage_dtype
+    float16 or int8 the scan runs over a 2x / 4x smaller quantized copy
+    (int8 codes carry a min and step per row) and the top
+    k * rerank_factor candidates are re-ranked with exact float32
+    distances, so only the quantized copy needs to stay in RAM.
+
+    Storage is append-only: a write saves only the vectors it adds or
+    replaces, as a new segment-<name>.*.npy segment, and the ids,
+    documents, metadata and segment row of each record in
+    docstore.sqlite3. Replaced and deleted rows stay in their segment
+    until a compaction copies the live rows into a new segment. After a
+    write, more than MAX_SEGMENTS segments merges all but the largest one,
+    and more dead rows than live ones compacts everything, like compact().
+
+    Writers hold an exclusive lock on the .lock file of the directory, so
+    any process can write. Segments never change after they are written;
+    readers memory-map them read-only, so processes on the same directory
+    share one copy in the page cache, and only load the records changed
+    since their last read.
+    """
+
+    # rows dequantized at a time during a scan, bounds the temporary float32 copy
+    SCAN_BLOCK_ROWS = 16384
+    MAX_SEGMENTS = 32
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS state (
+            id INTEGER PRIMARY KEY CHECK (id = 0), generation INTEGER NOT NULL, epoch TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS segments (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE, rows INTEGER NOT NULL,
+            storage_dtype TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS records (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT NOT NULL UNIQUE, segment TEXT NOT NULL,
+            offset INTEGER NOT NULL, document TEXT, metadata TEXT, generation INTEGER NOT NULL);
+        CREATE INDEX IF NOT EXISTS records_generation ON records (generation);
+        CREATE TABLE IF NOT EXISTS tombstones (id TEXT NOT NULL, generation INTEGER NOT NULL);
+        CREATE INDEX IF NOT EXISTS tombstones_generation ON tombstones (generation);
+    """
+
+    def __init__(self, name: str, path: str, read_only: bool = False,
+                 storage_dtype: str = "float32", rerank_factor: int = 4):
+        if storage_dtype not in STORAGE_DTYPES:
+            raise ValueError(f"storage_dtype must be one of {STORAGE_DTYPES}")
+
+        self.name = name
+        self.path = path
+        self.read_only = read_only
+        self.storage_dtype = storage_dtype
+        self.rerank_factor = rerank_factor
+        self._lock = threading.RLock()
+        self._conn = None
+        self._inode = None
+
+        self._reset()
+        os.makedirs(path, exist_ok=True)
+        self._reload()
+
+    @property
+    def _docstore_path(self):
+        return os.path.join(self.path, "docstore.sqlite3")
+
+    @property
+    def _lock_path(self):
+        return os.path.join(self.path, ".lock")
+
+    def _segment_path(self, name, kind):
+        return os.path.join(self.path, f"segment-{name}.{kind}.npy")
+
+    def _reset(self):
+        self._generation = None
+        self._epoch = None
+        # id -> (segment, offset, document, metadata), in insertion order
+        self._records = {}
+        self._segments = {}
+        self._ids, self._documents, self._metadatas, self._index = [], [], [], {}
+        self._slots = np.zeros(0, dtype=np.int64)
+        self._starts = []
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    ## Connect to the docstore, again when another process dropped and recreated it
+    def _open(self, create: bool) -> bool:
+        try:
+            inode = os.stat(self._docstore_path).st_ino
+        except FileNotFoundError:
+            inode = None
+            if not create:
+                # never created, or dropped by another process
+                self.close()
+                self._reset()
+                return False
+
+        if self._conn is None or inode != self._inode:
+            self.close()
+            self._reset()
+            os.makedirs(self.path, exist_ok=True)
+            conn = sqlite3.connect(self._docstore_path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self.SCHEMA)
+            conn.execute("INSERT OR IGNORE INTO state VALUES (0, 0, ?)", (uuid.uuid4().hex,))
+            self._conn = conn
+            self._inode = os.stat(self._docstore_path).st_ino
+        return True
+
+    def _load_segment(self, name, storage_dtype):
+        vectors = np.load(self._segment_path(name, "vectors"), mmap_mode="r")
+        codes, scales = vectors, None
+        if storage_dtype != "float32":
+            codes = np.load(self._segment_path(name, "codes"), mmap_mode="r")
+        if storage_dtype == "int8":
+            scales = np.load(self._segment_path(name, "scales"), mmap_mode="r")
+        return NumpySegment(name, storage_dtype, vectors, codes, scales, self.SCAN_BLOCK_ROWS)
+
+    ## Pick up writes made by other processes, reading only records changed since the last reload
+    def _reload(self, force: bool = False):
+        if not self._open(create=False):
+            return
+
+        conn = self._conn
+        # one read transaction, so state, segments and records come from the same snapshot
+        conn.execute("BEGIN")
+        try:
+            generation, epoch = conn.execute("SELECT generation, epoch FROM state").fetchone()
+            if not force and (generation, epoch) == (self._generation, self._epoch):
+                return
+            # compaction starts a new epoch and rewrites every record
+            since = self._generation if not force and epoch == self._epoch else None
+
+            segments = {}
+            for name, storage_dtype in conn.execute("SELECT name, storage_dtype FROM segments ORDER BY seq"):
+                segments[name] = self._segments.get(name) or self._load_segment(name, storage_dtype)
+            # a merge removed segments, which moves the slots of every later segment
+            merged = any(name not in segments for name in self._segments)
+
+            dropped = []
+            if since is not None:
+                dropped = [row[0] for row in conn.execute("SELECT id FROM tombstones WHERE generation > ?", (since,))]
+            changed = [(doc_id, (segment, offset, document, json.loads(metadata) if metadata is not None else None))
+                       for doc_id, segment, offset, document, metadata in conn.execute(
+                           "SELECT id, segment, offset, document, metadata FROM records "
+                           "WHERE generation > ? ORDER BY seq", (since if since is not None else -1,))]
+        except FileNotFoundError:
+            # a compaction removed a segment of this snapshot, read the new one
+            conn.execute("ROLLBACK")
+            return self._reload(force=True)
+        else:
+            conn.execute("COMMIT")
+        finally:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+
+        starts, start = {}, 0
+        for name, segment in segments.items():
+            starts[name] = start
+            start += segment.rows
+        self._segments = segments
+        self._starts = list(starts.values())
+
+        if since is not None and not dropped and not merged:
+            # only updates and appends: patch the row arrays instead of rebuilding them
+            new_slots = []
+            for doc_id, record in changed:
+                row = self._index.get(doc_id)
+                if row is None:
+                    self._index[doc_id] = len(self._ids)
+                    self._ids.append(doc_id)
+                    self._documents.append(record[2])
+                    self._metadatas.append(record[3])
+                    new_slots.append(starts[record[0]] + record[1])
+                else:
+                    self._documents[row] = record[2]
+                    self._metadatas[row] = record[3]
+                    self._slots[row] = starts[record[0]] + record[1]
+                self._records[doc_id] = record
+            if new_slots:
+                self._slots = np.concatenate([self._slots, np.asarray(new_slots, dtype=np.int64)])
+        else:
+            records = self._records if since is not None else {}
+            for doc_id in dropped:
+                records.pop(doc_id, None)
+            # existing ids keep their position, new ids have a larger seq than every known record
+            records.update(changed)
+            self._records = records
+            self._ids = list(records)
+            self._index = {doc_id: i for i, doc_id in enumerate(self._ids)}
+            self._documents = [record[2] for record in records.values()]
+            self._metadatas = [record[3] for record in records.values()]
+            self._slots = np.fromiter((starts[record[0]] + record[1] for record in records.values()),
+                                      dtype=np.int64, count=len(records))
+        self._generation, self._epoch = generation, epoch
+
+    def _check_writable(self):
+        if self.read_only:
+            raise PermissionError(f"Collection {self.name} is opened read-only")
+
+    ## Exclusive across threads and processes, with the in-memory state reloaded to the latest write
+    @contextmanager
+    def _write_lock(self):
+        self._check_writable()
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            with open(self._lock_path, "a+b") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                self._open(create=True)
+                self._reload()
+                yield self._conn
+
+    ## Quantized search copy of a segment whose float32 vectors are already saved
+    def _save_search_copy(self, name, vectors):
+        if self.storage_dtype == "float32":
+            return
+        codes, scales = quantize(np.asarray(vectors, dtype=np.float32), self.storage_dtype)
+        np.save(self._segment_path(name, "codes"), codes)
+        if scales is not None:
+            np.save(self._segment_path(name, "scales"), scales)
+
+    def _remove_segment_files(self, keep=()):
+        for path in glob.glob(os.path.join(self.path, "segment-*.npy")):
+            if os.path.basename(path).split(".", 1)[0][len("segment-"):] not in keep:
+                # open memory maps in other processes keep the old file alive
+                os.remove(path)
+
+    ## Run statements in one write transaction and bump the generation readers poll
+    def _commit(self, conn, statements, epoch: Optional[str] = None):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            generation = conn.execute("SELECT generation FROM state").fetchone()[0] + 1
+            for sql, params in statements(generation):
+                conn.executemany(sql, params)
+            if epoch is not None:
+                conn.execute("DELETE FROM tombstones")
+                conn.execute("UPDATE state SET generation = ?, epoch = ?", (generation, epoch))
+            else:
+                conn.execute("UPDATE state SET generation = ?", (generation,))
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _write(self, ids, embeddings, metadatas, documents, mode):
+        self._check_writable()
+        embeddings = np.asarray(embeddings, dtype=np.float32) if embeddings is not None else None
+        if embeddings is not None and embeddings.ndim == 1:
+            embeddings = embeddings.reshape(1, -1)
+
+        with self._write_lock() as conn:
+            if embeddings is None and mode != "update" and any(doc_id not in self._records for doc_id in ids):
+                raise ValueError("embeddings are required for new records")
+
+            segment = uuid.uuid4().hex
+            changed, new_rows = {}, []
+            for i, doc_id in enumerate(ids):
+                record = changed.get(doc_id) or self._records.get(doc_id)
+                if record is None:
+                    if mode == "update":
+                        continue
+                    record = (None, None, None, None)
+                elif mode == "add":
+                    # chroma ignores ids that already exist
+                    continue
+
+                segment_name, offset, document, metadata = record
+                if embeddings is not None:
+                    segment_name, offset = segment, len(new_rows)
+                    new_rows.append(embeddings[i])
+                if documents is not None:
+                    document = documents[i]
+                if metadatas is not None:
+                    metadata = metadatas[i]
+                changed[doc_id] = (segment_name, offset, document, metadata)
+
+            if not changed:
+                return
+            if new_rows:
+                vectors = np.vstack(new_rows)
+                np.save(self._segment_path(segment, "vectors"), vectors)
+                self._save_search_copy(segment, vectors)
+
+            def statements(generation):
+                if new_rows:
+                    yield ("INSERT INTO segments (name, rows, storage_dtype) VALUES (?, ?, ?)",
+                           [(segment, len(new_rows), self.storage_dtype)])
+                yield ("INSERT INTO records (id, segment, offset, document, metadata, generation) "
+                       "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (id) DO UPDATE SET segment = excluded.segment, "
+                       "offset = excluded.offset, document = excluded.document, metadata = excluded.metadata, "
+                       "generation = excluded.generation",
+                       [(doc_id, segment_name, offset, document,
+                         json.dumps(metadata) if metadata is not None else None, generation)
+                        for doc_id, (segment_name, offset, document, metadata) in changed.items()])
+
+            try:
+                self._commit(conn, statements)
+            except BaseException:
+                self._remove_segment_files(keep=self._segments)
+                raise
+            self._reload()
+            self._compact_if_needed(conn)
+
+    def add(self, ids, embeddings=None, metadatas=None, documents=None):
+        self._write(ids, embeddings, metadatas, documents, "add")
+
+    def upsert(self, ids, embeddings=None, metadatas=None, documents=None):
+        self._write(ids, embeddings, metadatas, documents, "upsert")
+
+    def update(self, ids, embeddings=None, metadatas=None, documents=None):
+        self._write(ids, embeddings, metadatas, documents, "update")
+
+    def _compact_if_needed(self, conn):
+        total = sum(segment.rows for segment in self._segments.values())
+        if total - len(self._ids) > len(self._ids):
+            self._compact(conn)
+        elif len(self._segments) > self.MAX_SEGMENTS:
+            # merge every segment but the largest, so a merge costs about the rows written since the last one
+            largest = max(self._segments.values(), key=lambda segment: segment.rows).name
+            self._compact(conn, [name for name in self._segments if name != largest])
+
+    ## Copy the live rows of the given segments (all by default) into one new segment
+    def _compact(self, conn, names: Optional[List[str]] = None):
+        full = names is None
+        names = set(self._segments if full else names)
+        positions = [positions for segment, positions, _ in self._by_segment(self._slots) if segment.name in names]
+        positions = np.sort(np.concatenate(positions)) if positions else np.zeros(0, dtype=np.int64)
+
+        segment = uuid.uuid4().hex
+        if len(positions):
+            # filled block by block, so only the new file and one block are in memory
+            vectors = np.lib.format.open_memmap(self._segment_path(segment, "vectors"), mode="w+",
+                                                dtype=np.float32, shape=(len(positions), self._dim()))
+            for start in range(0, len(positions), self.SCAN_BLOCK_ROWS):
+                block = positions[start:start + self.SCAN_BLOCK_ROWS]
+                vectors[start:start + len(block)] = self._vectors_at(self._slots[block])
+            vectors.flush()
+            self._save_search_copy(segment, vectors)
+            del vectors
+
+        def statements(generation):
+            yield "DELETE FROM segments WHERE name = ?", [(name,) for name in names]
+            if len(positions):
+                yield ("INSERT INTO segments (name, rows, storage_dtype) VALUES (?, ?, ?)",
+                       [(segment, len(positions), self.storage_dtype)])
+                # moved records get the new generation, so readers pick up their new rows
+                yield ("UPDATE records SET segment = ?, offset = ?, generation = ? WHERE id = ?",
+                       [(segment, offset, generation, self._ids[row]) for offset, row in enumerate(positions)])
+
+        # a full compaction also drops the tombstones, readers then reload every record
+        self._commit(conn, statements, epoch=uuid.uuid4().hex if full else None)
+        self._remove_segment_files(keep=(set(self._segments) - names) | {segment})
+        self._reload()
+
+    def compact(self):
+        """
+        Rewrite the live rows into one segment, dropping replaced and deleted rows
+        """
+        with self._write_lock() as conn:
+            self._compact(conn)
+
+    def _dim(self) -> int:
+        return next((segment.vectors.shape[1] for segment in self._segments.values()), 0)
+
+    ## Positions of the slots grouped by segment: (segment, positions, rows in the segment), rows ascending
+    def _by_segment(self, slots: np.ndarray):
+        order = np.argsort(slots, kind="stable")
+        sorted_slots = slots[order]
+        for segment, start in zip(self._segments.values(), self._starts):
+            lo, hi = np.searchsorted(sorted_slots, [start, start + segment.rows])
+            if lo < hi:
+                yield segment, order[lo:hi], sorted_slots[lo:hi] - start
+
+    ## float32 vectors at the given slots, read from each segment in file order
+    def _vectors_at(self, slots: np.ndarray) -> np.ndarray:
+        result = np.empty((len(slots), self._dim()), dtype=np.float32)
+        for segment, positions, rows in self._by_segment(slots):
+            result[positions] = segment.vectors[rows]
+        return result
+
+    def _matching_rows(self, ids=None, where=None, where_document=None) -> List[int]:
+        rows = [self._index[doc_id] for doc_id in ids if doc_id in self._index] if ids is not None else range(len(self._ids))
+        return [row for row in rows
+                if match_where(self._metadatas[row] or {}, where)
+                and match_document(self._documents[row], where_document)]
+
+    def get(self, ids=None, where=None, limit=None, offset=None, where_document=None,
+            include=("metadatas", "documents")):
+        with self._lock:
+            self._reload()
+            rows = self._matching_rows(ids, where, where_document)
+            rows = rows[offset or 0:(offset or 0) + limit if limit is not None else None]
+            return {
+                "ids": [self._ids[row] for row in rows],
+                "documents": [self._documents[row] for row in rows] if "documents" in include else None,
+                "metadatas": [self._metadatas[row] for row in rows] if "metadatas" in include else None,
+                "embeddings": self._vectors_at(self._slots[rows]) if "embeddings" in include and rows else None
+            }
+
+    ## Squared L2 distances from each query to the search copy at the given slots, block by block
+    def _scan(self, queries: np.ndarray, slots: np.ndarray) -> np.ndarray:
+        distances = np.empty((len(queries), len(slots)), dtype=np.float32)
+        query_norms = np.einsum("ij,ij->i", queries, queries)[:, None]
+        query_sums = queries.sum(axis=1)[:, None]
+
+        for segment, positions, segment_rows in self._by_segment(slots):
+            for start in range(0, len(segment_rows), self.SCAN_BLOCK_ROWS):
+                rows = segment_rows[start:start + self.SCAN_BLOCK_ROWS]
+                if rows[-1] - rows[0] + 1 == len(rows):
+                    # a contiguous run, the usual case after a compaction, is read without a gather
+                    rows = slice(int(rows[0]), int(rows[-1]) + 1)
+                block = segment.codes[rows].astype(np.float32, copy=False)
+                dots = queries @ block.T
+                if segment.storage_dtype == "int8":
+                    # q.x = step * q.codes + (low + 128 * step) * sum(q), so codes only need one cast per block
+                    low, step = np.asarray(segment.scales[rows]).T
+                    dots = dots * step[None, :] + query_sums * (low + 128.0 * step)[None, :]
+                # ||q - x||^2 = ||x||^2 - 2 q.x + ||q||^2
+                distances[:, positions[start:start + self.SCAN_BLOCK_ROWS]] = \
+                    segment.norms[rows][None, :] - 2.0 * dots + query_norms
+        return distances
+
+    def query(self, query_embeddings, n_results=10, where=None, where_document=None,
+              include=("metadatas", "documents", "distances")):
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries.reshape(1, -1)
+
+        with self._lock:
+            self._reload()
+            if where or where_document:
+                candidates = np.asarray(self._matching_rows(where=where, where_document=where_document), dtype=np.int64)
+            else:
+                candidates = None
+
+            result = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+            if not self._ids or (candidates is not None and not len(candidates)):
+                for key in result:
+                    result[key] = [[] for _ in range(len(queries))]
+                return result
+
+            distances = self._scan(queries, self._slots if candidates is None else self._slots[candidates])
+            k = min(n_results, distances.shape[1])
+            quantized = any(segment.storage_dtype != "float32" for segment in self._segments.values())
+            # quantized distances only shortlist; the shortlist is re-ranked with float32 vectors
+            shortlist = min(k * self.rerank_factor, distances.shape[1]) if quantized else k
+            top = np.argpartition(distances, shortlist - 1, axis=1)[:, :shortlist]
+
+            for q in range(len(queries)):
+                rows = candidates[top[q]] if candidates is not None else top[q]
+                if quantized:
+                    exact = self._vectors_at(self._slots[rows])
+                    row_distances = ((exact - queries[q]) ** 2).sum(axis=1)
+                else:
+                    row_distances = distances[q, top[q]]
+
+                order = np.argsort(row_distances)[:k]
+                rows = rows[order]
+                result["ids"].append([self._ids[row] for row in rows])
+                result["documents"].append([self._documents[row] for row in rows])
+                result["metadatas"].append([self._metadatas[row] for row in rows])
+                result["distances"].append([float(max(row_distances[i], 0.0)) for i in order])
+            return result
+
+    def delete(self, ids=None, where=None, where_document=None):
+        self._check_writable()
+        if ids is None and where is None and where_document is None:
+            return
+
+        with self._write_lock() as conn:
+            drop = [self._ids[row] for row in self._matching_rows(ids, where, where_document)]
+            if not drop:
+                return
+
+            def statements(generation):
+                yield "DELETE FROM records WHERE id = ?", [(doc_id,) for doc_id in drop]
+                yield "INSERT INTO tombstones (id, generation) VALUES (?, ?)", [(doc_id, generation) for doc_id in drop]
+
+            self._commit(conn, statements)
+            self._reload()
+            self._compact_if_needed(conn)
+
+    def count(self) -> int:
+        with self._lock:
+            self._reload()
+            return len(self._ids)
+
+    ## Bytes of the search copy scanned per query versus the full float32 vectors
+    def memory_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._reload()
+            segments = self._segments.values()
+            storage_dtypes = sorted({segment.storage_dtype for segment in segments}) or [self.storage_dtype]
+            return {
+                "count": len(self._ids),
+                "segments": len(self._segments),
+                "dead_rows": sum(segment.rows for segment in segments) - len(self._ids),
+                "storage_dtype": ",".join(storage_dtypes),
+                "search_bytes": sum(int(segment.codes.nbytes) for segment in segments),
+                "scale_bytes": sum(int(segment.scales.nbytes) for segment in segments if segment.scales is not None),
+                "float32_bytes": sum(int(segment.vectors.nbytes) for segment in segments)
+            }
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    In-process exact search backend, one directory per collection.
+    Meant for corpora up to a few million vectors; every worker process can
+    open the same directory and write to it, writes are serialized by a
+    file lock. read_only=True opens it for search only.
+    storage_dtype float16 / int8 shrinks the in-memory search copy.
+    """
+
+    def __init__(self, path: str, read_only: bool = False, max_batch_size: int = 100000,
+                 storage_dtype: str = "float32", rerank_factor: int = 4):
+        self.path = path
+        self.read_only = read_only
+        self.max_batch_size = max_batch_size
+        self.storage_dtype = storage_dtype
+        self.rerank_factor = rerank_factor
+        self._collections = {}
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    def _collection_path(self, name: str):
+        if not re.fullmatch(r"[A-Za-z0-9._-]+", name):
+            raise ValueError(f"Invalid collection name: {name}")
+        return os.path.join(self.path, name)
+
+    def get_or_create_collection(self, name: str) -> NumpyVectorCollection:
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = NumpyVectorCollection(
+                    name, self._collection_path(name), self.read_only, self.storage_dtype, self.rerank_factor
+                )
+            return self._collections[name]
+
+    def get_collection(self, name: str) -> NumpyVectorCollection:
+        if name not in self._collections and not os.path.isdir(self._collection_path(name)):
+            raise ValueError(f"Collection {name} does not exist")
+        return self.get_or_create_collection(name)
+
+    def delete_collection(self, name: str):
+        if self.read_only:
+            raise PermissionError("Vector store is opened read-only")
+
+        with self._lock:
+            collection = self._collections.pop(name, None)
+            if collection is not None:
+                collection.close()
+            shutil.rmtree(self._collection_path(name), ignore_errors=True)
+
+    def list_collections(self) -> List[str]:
+        return sorted(name for name in os.listdir(self.path) if os.path.isdir(os.path.join(self.path, name)))
+
+    def get_max_batch_size(self) -> int:
+        return self.max_batch_size
@@ -0,0 +1,87 @@
+from typing import List, Dict, Any, Optional
+
+
+class VectorCollection:
+    """
+    Collection operations ChromaVectorDBService relies on. Argument names and
+    result shapes follow chromadb's Collection, so chroma collections satisfy
+    this interface as they are.
+    """
+
+    def add(self, ids: List[str], embeddings, metadatas: Optional[List[Dict[str, Any]]] = None,
+            documents: Optional[List[str]] = None):
+        raise NotImplementedError("Error: add not defined")
+
+    def upsert(self, ids: List[str], embeddings, metadatas: Optional[List[Dict[str, Any]]] = None,
+               documents: Optional[List[str]] = None):
+        raise NotImplementedError("Error: upsert not defined")
+
+    def update(self, ids: List[str], embeddings=None, metadatas: Optional[List[Dict[str, Any]]] = None,
+               documents: Optional[List[str]] = None):
+        raise NotImplementedError("Error: update not defined")
+
+    ## {"ids": [...], "documents": [...], "metadatas": [...]}
+    def get(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None,
+            limit: Optional[int] = None, offset: Optional[int] = None,
+            where_document: Optional[Dict[str, Any]] = None, include=("metadatas", "documents")):
+        raise NotImplementedError("Error: get not defined")
+
+    ## {"ids": [[...]], "documents": [[...]], "metadatas": [[...]], "distances": [[...]]}, one inner list per query
+    def query(self, query_embeddings, n_results: int = 10, where: Optional[Dict[str, Any]] = None,
+              where_document: Optional[Dict[str, Any]] = None, include=("metadatas", "documents", "distances")):
+        raise NotImplementedError("Error: query not defined")
+
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None,
+               where_document: Optional[Dict[str, Any]] = None):
+        raise NotImplementedError("Error: delete not defined")
+
+    def count(self) -> int:
+        raise NotImplementedError("Error: count not defined")
+
+
+class VectorStore:
+    """
+    Backend holding named collections of embeddings.
+    """
+
+    def get_or_create_collection(self, name: str) -> VectorCollection:
+        raise NotImplementedError("Error: get_or_create_collection not defined")
+
+    def get_collection(self, name: str) -> VectorCollection:
+        raise NotImplementedError("Error: get_collection not defined")
+
+    def delete_collection(self, name: str):
+        raise NotImplementedError("Error: delete_collection not defined")
+
+    def list_collections(self) -> List[str]:
+        raise NotImplementedError("Error: list_collections not defined")
+
+    ## Largest number of records one write may carry
+    def get_max_batch_size(self) -> int:
+        raise NotImplementedError("Error: get_max_batch_size not defined")
+
+
+class ChromaVectorStore(VectorStore):
+    """
+    Chroma PersistentClient behind the VectorStore interface.
+    """
+
+    def __init__(self, path: str):
+        import chromadb
+        self.path = path
+        self._client = chromadb.PersistentClient(path=path)
+
+    def get_or_create_collection(self, name: str):
+        return self._client.get_or_create_collection(name=name)
+
+    def get_collection(self, name: str):
+        return self._client.get_collection(name=name)
+
+    def delete_collection(self, name: str):
+        self._client.delete_collection(name=name)
+
+    def list_collections(self) -> List[str]:
+        return [collection.name for collection in self._client.list_collections()]
+
+    def get_max_batch_size(self) -> int:
+        return self._client.get_max_batch_size()
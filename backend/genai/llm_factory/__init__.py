@@ -1 +1,3 @@
-from .llm_factory_service import LLMModelFactory
\ No newline at end of file
+from .llm_factory_service import LLMModelFactory
+from .async_llm_client import AsyncLLMClient, LLMTimeoutError, async_llm_client
+from .llm_response_cache import LLMResponseCache, llm_response_cache
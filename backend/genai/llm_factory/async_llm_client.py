@@ -0,0 +1,102 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+
+class LLMTimeoutError(Exception):
+    pass
+
+
+class AsyncLLMClient:
+    """
+    asyncio front end for the blocking provider SDKs. Each provider gets its
+    own thread pool of max_concurrency[provider] workers, so at most that many
+    calls per provider are in flight and a busy provider never holds threads
+    another provider needs. The pools are shared by every event loop, which
+    keeps the limit when several request threads run batches at once.
+
+    A call's timeout starts when it leaves the queue and reaches the provider.
+    A timed out or cancelled call stops being awaited straight away; the SDK
+    request itself cannot be interrupted and finishes on its thread. A call
+    cancelled while still queued is never sent.
+    """
+
+    DEFAULT_CONCURRENCY = {'gemini': 8, 'chatgpt': 8}
+
+    def __init__(self, max_concurrency: Optional[Dict[str, int]] = None, default_concurrency: int = None,
+                 timeout: float = None, generate_fn: Optional[Callable[[str, str], str]] = None):
+        self.max_concurrency = {
+            provider: int(os.environ.get(f'LLM_CONCURRENCY_{provider.upper()}', limit))
+            for provider, limit in self.DEFAULT_CONCURRENCY.items()
+        }
+        self.max_concurrency.update(max_concurrency or {})
+        self.default_concurrency = default_concurrency or int(os.environ.get('LLM_CONCURRENCY', 4))
+        self.timeout = timeout or float(os.environ.get('LLM_TIMEOUT_SECONDS', 60))
+        self.generate_fn = generate_fn or self._generate
+
+        self._executors = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _generate(provider: str, prompt: str) -> str:
+        from .llm_factory_service import LLMModelFactory
+        return LLMModelFactory.get_model_provider(provider).generate_text(prompt)
+
+    def limit(self, provider: str) -> int:
+        return self.max_concurrency.get(provider, self.default_concurrency)
+
+    def executor(self, provider: str) -> ThreadPoolExecutor:
+        executor = self._executors.get(provider)
+        if executor is None:
+            with self._lock:
+                executor = self._executors.get(provider)
+                if executor is None:
+                    executor = ThreadPoolExecutor(max_workers=self.limit(provider),
+                                                  thread_name_prefix=f'llm-{provider}')
+                    self._executors[provider] = executor
+        return executor
+
+    ## Runs on a provider worker thread: tell the caller the call has started, then call the SDK
+    def _call(self, provider: str, prompt: str, loop, started, cancelled: threading.Event):
+        if cancelled.is_set():
+            return None
+        try:
+            loop.call_soon_threadsafe(lambda: started.done() or started.set_result(None))
+        except RuntimeError:
+            # the caller's event loop is already closed
+            return None
+        return self.generate_fn(provider, prompt)
+
+    async def generate(self, provider: str, prompt: str, timeout: Optional[float] = None) -> str:
+        """
+        Generate text for prompt with the given provider.
+        Raises LLMTimeoutError when no response arrives within timeout seconds,
+        time spent queued behind the provider's other calls is not counted.
+        """
+        timeout = timeout or self.timeout
+        loop = asyncio.get_running_loop()
+        started = loop.create_future()
+        cancelled = threading.Event()
+        call = loop.run_in_executor(self.executor(provider), self._call, provider, prompt, loop, started, cancelled)
+        try:
+            await asyncio.wait([started, call], return_when=asyncio.FIRST_COMPLETED)
+            return await asyncio.wait_for(call, timeout)
+        except asyncio.TimeoutError:
+            raise LLMTimeoutError(f"{provider} did not respond within {timeout:g}s")
+        finally:
+            # drops the call from the queue if no worker has picked it up yet
+            cancelled.set()
+            call.cancel()
+            started.cancel()
+
+    def shutdown(self):
+        with self._lock:
+            executors, self._executors = self._executors, {}
+        for executor in executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Create singleton instance
+async_llm_client = AsyncLLMClient()
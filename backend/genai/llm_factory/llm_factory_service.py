@@ -1,17 +1,54 @@
-from ..llm_models.llm_model_implementation import gemini_model,BaseLLMModel,chatgpt_model
+import threading
+from ..llm_models.llm_model_implementation import GeminiModel, BaseLLMModel, ChatGPTModel
 
 class LLMModelFactory:
 
+    # provider name -> factory, a provider is built on first use and then reused
     _supported_model_providers = {
-        "gemini": gemini_model,
-        'chatgpt':chatgpt_model
+        "gemini": GeminiModel,
+        'chatgpt': ChatGPTModel
     }
+    _instances = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def register_model_provider(model_provider_name: str, factory):
+        """Register a provider factory (a BaseLLMModel subclass or any callable returning one)"""
+        model_provider_name = model_provider_name.lower()
+        with LLMModelFactory._lock:
+            LLMModelFactory._supported_model_providers[model_provider_name] = factory
+            LLMModelFactory._instances.pop(model_provider_name, None)
+
+    @staticmethod
+    def is_supported(model_provider_name: str):
+        return (model_provider_name or '').lower() in LLMModelFactory._supported_model_providers
 
     @staticmethod
     def get_model_provider(model_provider_name: str):
-        model=model.lower()
+        model_provider_name = model_provider_name.lower()
 
-        if model_provider_name in LLMModelFactory._supported_model_providers:
-            return LLMModelFactory._supported_model_providers[model_provider_name]
-        else:
-            raise ValueError(f"Unsupported model provider: {model_provider_name}")
\ No newline at end of file
+        if model_provider_name not in LLMModelFactory._supported_model_providers:
+            raise ValueError(f"Unsupported model provider: {model_provider_name}")
+
+        instance = LLMModelFactory._instances.get(model_provider_name)
+        if instance is None:
+            with LLMModelFactory._lock:
+                # another thread may have built it while we waited
+                instance = LLMModelFactory._instances.get(model_provider_name)
+                if instance is None:
+                    instance = LLMModelFactory._supported_model_providers[model_provider_name]()
+                    LLMModelFactory._instances[model_provider_name] = instance
+        return instance
+
+    @staticmethod
+    def get_model_name(model_provider_name: str):
+        """Name of the model behind a provider, part of the LLM response cache key"""
+        model_provider_name = model_provider_name.lower()
+        factory = LLMModelFactory._supported_model_providers.get(model_provider_name)
+        if factory is None:
+            raise ValueError(f"Unsupported model provider: {model_provider_name}")
+        # read from the class when possible so the provider is not built just for its name
+        model_name = getattr(factory, 'model_name', None)
+        if model_name is None:
+            model_name = getattr(LLMModelFactory.get_model_provider(model_provider_name), 'model_name', None)
+        return model_name
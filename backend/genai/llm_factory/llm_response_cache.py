@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+class LLMResponseCache:
+    """
+    Two-tier cache of LLM responses keyed by (provider, model, normalized
+    prompt, params). An in-memory LRU sits in front of a SQLite table so
+    responses survive restarts. Entries carry their creation time and the
+    latency of the original call; the TTL is chosen by the caller on lookup,
+    so each service can decide how long an answer stays valid.
+    """
+
+    def __init__(self, memory_items: int = 1000, disk_path: Optional[str] = None, enabled: bool = True):
+        self.memory_items = memory_items
+        self.disk_path = disk_path
+        self.enabled = enabled
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._conn = None
+
+    @property
+    def conn(self):
+        # opened on first use so importing the services does not touch the disk
+        if self._conn is None and self.disk_path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.disk_path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.disk_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, provider TEXT NOT NULL, model TEXT, response TEXT NOT NULL, "
+                "latency REAL NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def normalize_prompt(prompt: str) -> str:
+        # prompts are indented f-strings, indentation and blank lines carry no meaning
+        return "\n".join(re.sub(r"\s+", " ", line).strip() for line in prompt.strip().splitlines() if line.strip())
+
+    @classmethod
+    def make_key(cls, provider: str, model: Optional[str], prompt: str, params: Optional[dict] = None) -> str:
+        payload = json.dumps([provider, model, cls.normalize_prompt(prompt), params or {}], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _scope_stats(self, scope):
+        return self._stats.setdefault(scope, {"memory_hits": 0, "disk_hits": 0, "misses": 0, "saved_seconds": 0.0})
+
+    def _remember(self, key, entry):
+        if self.memory_items <= 0:
+            return
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str, ttl: Optional[float] = None, scope: str = "default") -> Optional[str]:
+        """
+        Cached response for key, None when missing or older than ttl seconds
+        """
+        if not self.enabled:
+            return None
+
+        oldest = time.time() - ttl if ttl else 0.0
+        with self._lock:
+            stats = self._scope_stats(scope)
+            entry, tier = self._memory.get(key), "memory_hits"
+            if entry is not None:
+                self._memory.move_to_end(key)
+            elif self.conn is not None:
+                row = self.conn.execute(
+                    "SELECT response, latency, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    entry, tier = row, "disk_hits"
+                    self._remember(key, entry)
+
+            if entry is None or entry[2] < oldest:
+                stats["misses"] += 1
+                return None
+
+            stats[tier] += 1
+            stats["saved_seconds"] += entry[1]
+            return entry[0]
+
+    def put(self, key: str, response: str, provider: str, model: Optional[str] = None, latency: float = 0.0):
+        if not self.enabled:
+            return
+
+        entry = (response, latency, time.time())
+        with self._lock:
+            self._remember(key, entry)
+            if self.conn is not None:
+                self.conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                                  (key, provider, model, *entry))
+                self.conn.commit()
+
+    def stats(self, scope: Optional[str] = None) -> dict:
+        """
+        Hit rate and latency saved per scope (e.g. 'ExpenseService.categorize_expense')
+        """
+        with self._lock:
+            result = {}
+            for name, stats in self._stats.items():
+                if scope is not None and name != scope:
+                    continue
+                hits = stats["memory_hits"] + stats["disk_hits"]
+                lookups = hits + stats["misses"]
+                result[name] = {**stats, "lookups": lookups, "hit_rate": hits / lookups if lookups else 0.0}
+            return result
+
+    def clear(self, older_than: Optional[float] = None) -> None:
+        """
+        Drop every entry, or only those older than older_than seconds
+        """
+        with self._lock:
+            if older_than is None:
+                self._memory.clear()
+                if self.conn is not None:
+                    self.conn.execute("DELETE FROM responses")
+                    self.conn.commit()
+                return
+
+            oldest = time.time() - older_than
+            for key in [key for key, entry in self._memory.items() if entry[2] < oldest]:
+                del self._memory[key]
+            if self.conn is not None:
+                self.conn.execute("DELETE FROM responses WHERE created_at < ?", (oldest,))
+                self.conn.commit()
+
+
+# Create singleton instance
+llm_response_cache = LLMResponseCache(
+    memory_items=int(os.environ.get('LLM_CACHE_SIZE', 1000)),
+    disk_path=os.environ.get('LLM_CACHE_PATH', './llm_cache/responses.sqlite3') or None,
+    enabled=os.environ.get('LLM_CACHE', 'true').lower() == 'true'
+)
@@ -1,2 +1,2 @@
 from .base_llm_model import BaseLLMModel
-from .llm_model_implementation import gemini_model,chatgpt_model
\ No newline at end of file
+from .llm_model_implementation import GeminiModel, ChatGPTModel
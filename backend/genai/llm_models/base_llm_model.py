@@ -1,6 +1,4 @@
 import os 
-import torch
-from transformers import AutoModelForCausalLM, AutoTokenizer
 
 class BaseLLMModel:
     local_models_dir='./saved_models/'
@@ -10,6 +8,9 @@ class BaseLLMModel:
 
     def get_tokenizer(self):
         raise NotImplementedError("Error: Tokenizer not defined")
+
+    def generate_text(self, prompt):
+        raise NotImplementedError("Error: Text generation not defined")
     
     def save_to_local(self,model_name,model,tokenizer):
         if self.local_models_dir:
@@ -28,6 +29,9 @@ class BaseLLMModel:
             path: str = f'{self.local_models_dir}{model_name}'
            
             if os.path.exists(path) and os.path.isdir(path):
+                # torch and transformers are only needed for local models
+                import torch
+                from transformers import AutoModelForCausalLM, AutoTokenizer
                 try:
                     tokenizer=AutoTokenizer.from_pretrained(path)
                     model=AutoModelForCausalLM.from_pretrained(path,torch_dtype=torch.float16,device_map="auto",low_cpu_mem_usage=True)    
@@ -1,12 +1,17 @@
-from backend.genai.llm_models.base_llm_model import BaseLLMModel
-from config import Config
-import google.generativeai as genai
-from openai import OpenAI
+from .base_llm_model import BaseLLMModel
+
+# The provider SDKs and config.Config (which reads .env) are imported when a
+# provider is first instantiated, see LLMModelFactory
 
 class GeminiModel(BaseLLMModel):
+    model_name = "gemini-2.0-flash"
+
     def __init__(self):
+        from config import Config
+        import google.generativeai as genai
+
         genai.configure(api_key=Config.GEMINI_API_KEY)
-        self.model = genai.GenerativeModel("gemini-2.0-flash")
+        self.model = genai.GenerativeModel(self.model_name)
 
     def get_model(self):
         return self.model
@@ -14,11 +19,17 @@ class GeminiModel(BaseLLMModel):
     def get_tokenizer(self):
         return None
 
+    def generate_text(self, prompt):
+        return self.model.generate_content(prompt).text
+
 
 class ChatGPTModel(BaseLLMModel):
+    model_name = 'gpt-4o-mini'
 
     def __init__(self):
-        self.model_name = 'gpt-4o-mini'
+        from config import Config
+        from openai import OpenAI
+
         self.client=OpenAI(api_key=Config.OPENAI_API_KEY)
     
     def get_model(self):
@@ -31,15 +42,13 @@ class ChatGPTModel(BaseLLMModel):
         if model_name is None:
             model_name = self.model_name
         
-        response=self.client.response.create(
+        response=self.client.chat.completions.create(
             model=model_name,
-            prompt=prompt,
+            messages=[{"role": "user", "content": prompt}],
             max_tokens=max_tokens,
             temperature=0
         )
         return response.choices[0].message.content
-    
-
 
-gemini_model = GeminiModel()
-chatgpt_model = ChatGPTModel()
\ No newline at end of file
+    def generate_text(self, prompt):
+        return self.generate_content(prompt)
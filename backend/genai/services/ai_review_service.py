@@ -1,27 +1,46 @@
 from ..prompt import PromptManager
-from ..llm_factory import LLMModelFactory
-from ...utils import TextUtility
+from ..llm_factory import LLMModelFactory, llm_response_cache
+from utils.text_utility import TextUtility
+import time
 
 
 class AIPerformanceReview:
-    def __init__(self, model_name: str = 'gemini'):
+    # a review summary is reused for a day, reviews are edited while a cycle is open
+    CACHE_TTL = 24 * 3600
+
+    def __init__(self, model_name: str = 'gemini', use_cache: bool = True, cache_ttl: float = None, cache=None):
         self.model_name = model_name
+        self.use_cache = use_cache
+        self.cache_ttl = cache_ttl or self.CACHE_TTL
+        self.cache = cache or llm_response_cache
 
     def generate_performance_review(self, employee_review, manager_view):
 
         # load the prompt
         prompt=PromptManager.performance_review_prompt(employee_review, manager_view)
 
+        if not LLMModelFactory.is_supported(self.model_name):
+            raise ValueError(f"Unsupported model provider: {self.model_name}")
+
+        # Reuse a cached answer for the same prompt
+        key = None
+        if self.use_cache:
+            key = self.cache.make_key(self.model_name, LLMModelFactory.get_model_name(self.model_name), prompt)
+            cached = self.cache.get(key, ttl=self.cache_ttl, scope='AIPerformanceReview.generate_performance_review')
+            if cached is not None:
+                return cached
+
         # Load Model
-        if self.model_name is not None and self.model_name == "gemini":
-            model=LLMModelFactory.get_model_provider('gemini').get_model()
-            response=model.generate_content(prompt)
-            return response.text
-
-        elif self.model_name is not None and self.model_name == "chatgpt":
-            model=LLMModelFactory.get_model_provider('chatgpt').get_model()
-            response=model.generate_content(prompt)
-            return response
-        
-        else:
-            raise ValueError(f"Unsupported model provider: {self.model_name}")
\ No newline at end of file
+        started = time.perf_counter()
+        response = LLMModelFactory.get_model_provider(self.model_name).generate_text(prompt)
+
+        if key is not None:
+            self.cache.put(key, response, self.model_name, LLMModelFactory.get_model_name(self.model_name),
+                           latency=time.perf_counter() - started)
+        return response
+
+    def cache_stats(self):
+        """
+        LLM response cache hit rate and latency saved for the review summaries
+        """
+        return self.cache.stats('AIPerformanceReview.generate_performance_review')
@@ -1,7 +1,13 @@
 from ..prompt import PromptManager
-from ..llm_factory import LLMModelFactory
-from ...utils import TextUtility
+from ..llm_factory import LLMModelFactory, LLMTimeoutError, async_llm_client, llm_response_cache
+from utils.text_utility import TextUtility
+import asyncio
 import json
+import logging
+import time
+
+
+logger = logging.getLogger(__name__)
 
 
 class ExpenseService:
@@ -9,14 +15,24 @@ class ExpenseService:
     AI-powered expense verification and analysis service
     """
     
-    def __init__(self, model_name: str = 'gemini'):
+    # a receipt or expense sent again gets the same answer for a week
+    CACHE_TTL = 7 * 24 * 3600
+    # batched receipt verification: prompt budget, per-provider response limit
+    # (every answer of a batch has to fit in one response) and expected answer size
+    BATCH_TOKEN_BUDGET = 6000
+    MAX_RECEIPTS_PER_BATCH = 20
+    MAX_OUTPUT_TOKENS = {'gemini': 8192, 'chatgpt': 500}
+    RECEIPT_OUTPUT_TOKENS = 150
+    
+    def __init__(self, model_name: str = 'gemini', llm_client=None, use_cache: bool = True,
+                 cache_ttl: float = None, cache=None):
         self.model_name = model_name
+        self.llm_client = llm_client or async_llm_client
+        self.use_cache = use_cache
+        self.cache_ttl = cache_ttl or self.CACHE_TTL
+        self.cache = cache or llm_response_cache
     
-    def verify_expense_receipt(self, receipt_text: str, claimed_amount: float, category: str):
-        """
-        Verify expense receipt using AI
-        Extracts information from receipt and compares with claimed amount
-        """
+    def _receipt_prompt(self, receipt_text: str, claimed_amount: float, category: str):
         prompt = f"""
         You are an expert expense auditor.
         Analyze the following receipt text and verify the expense claim.
@@ -50,34 +66,55 @@ class ExpenseService:
         - Output only valid JSON
         """
         
-        try:
-            if self.model_name == "gemini":
-                model = LLMModelFactory.get_model_provider('gemini').get_model()
-                response = model.generate_content(prompt)
-                result = response.text
-            elif self.model_name == "chatgpt":
-                model = LLMModelFactory.get_model_provider('chatgpt').get_model()
-                result = model.generate_content(prompt)
-            else:
-                raise ValueError(f"Unsupported model: {self.model_name}")
-            
-            # Clean and parse JSON response
-            result = TextUtility.remove_json_marker(result)
-            return result
-        
-        except Exception as e:
-            return {
-                "error": str(e),
-                "extracted_amount": claimed_amount,
-                "matches_claimed_amount": True,
-                "confidence_score": 0.0,
-                "recommendation": "Unable to verify automatically. Manual review required."
-            }
+        return prompt
     
-    def check_policy_compliance(self, expense_data: dict, policy_limits: dict):
-        """
-        Check if expense complies with company policy using AI
+    def _receipt_fallback(self, error: str, receipt_text: str, claimed_amount: float, category: str):
+        return {
+            "error": error,
+            "extracted_amount": claimed_amount,
+            "matches_claimed_amount": True,
+            "confidence_score": 0.0,
+            "recommendation": "Unable to verify automatically. Manual review required."
+        }
+    
+    def _receipts_batch_prompt(self, claims: list):
+        prompt = f"""
+        You are an expert expense auditor.
+        Verify each of the following expense claims against its receipt text.
+        
+        Claims (JSON array, every claim has an id):
+        {json.dumps(claims, indent=2)}
+        
+        Extract and verify the receipt information of every claim.
+        Respond only with a valid JSON array holding one object per claim:
+        [
+            {{
+                "id": "",
+                "extracted_amount": 0.0,
+                "extracted_vendor": "",
+                "extracted_date": "",
+                "extracted_items": [],
+                "matches_claimed_amount": true/false,
+                "confidence_score": 0.0-1.0,
+                "discrepancy": 0.0,
+                "flags": [],
+                "recommendation": ""
+            }}
+        ]
+        
+        Rules:
+        - Copy each claim's id unchanged into its result
+        - Judge every claim on its own receipt only
+        - Compare extracted amount with claimed amount
+        - Flag if discrepancy > $5 or > 10%
+        - Confidence score based on receipt clarity
+        - Provide specific recommendations
+        - Output only valid JSON
         """
+        
+        return prompt
+    
+    def _compliance_prompt(self, expense_data: dict, policy_limits: dict):
         prompt = f"""
         You are a company policy compliance expert.
         Review the following expense against company policy.
@@ -111,32 +148,17 @@ class ExpenseService:
         - Output only valid JSON
         """
         
-        try:
-            if self.model_name == "gemini":
-                model = LLMModelFactory.get_model_provider('gemini').get_model()
-                response = model.generate_content(prompt)
-                result = response.text
-            elif self.model_name == "chatgpt":
-                model = LLMModelFactory.get_model_provider('chatgpt').get_model()
-                result = model.generate_content(prompt)
-            else:
-                raise ValueError(f"Unsupported model: {self.model_name}")
-            
-            result = TextUtility.remove_json_marker(result)
-            return result
-        
-        except Exception as e:
-            return {
-                "error": str(e),
-                "is_compliant": True,
-                "approval_recommendation": "review",
-                "reasoning": "Unable to verify automatically. Manual review required."
-            }
+        return prompt
     
-    def categorize_expense(self, description: str, amount: float):
-        """
-        Automatically categorize expense based on description
-        """
+    def _compliance_fallback(self, error: str, expense_data: dict, policy_limits: dict):
+        return {
+            "error": error,
+            "is_compliant": True,
+            "approval_recommendation": "review",
+            "reasoning": "Unable to verify automatically. Manual review required."
+        }
+    
+    def _category_prompt(self, description: str, amount: float):
         prompt = f"""
         You are an expense categorization expert.
         Categorize the following expense into the most appropriate category.
@@ -167,32 +189,17 @@ class ExpenseService:
         - Output only valid JSON
         """
         
-        try:
-            if self.model_name == "gemini":
-                model = LLMModelFactory.get_model_provider('gemini').get_model()
-                response = model.generate_content(prompt)
-                result = response.text
-            elif self.model_name == "chatgpt":
-                model = LLMModelFactory.get_model_provider('chatgpt').get_model()
-                result = model.generate_content(prompt)
-            else:
-                raise ValueError(f"Unsupported model: {self.model_name}")
-            
-            result = TextUtility.remove_json_marker(result)
-            return result
-        
-        except Exception as e:
-            return {
-                "error": str(e),
-                "category": "Other",
-                "confidence": 0.0,
-                "reasoning": "Unable to categorize automatically."
-            }
+        return prompt
     
-    def detect_duplicate_expenses(self, new_expense: dict, existing_expenses: list):
-        """
-        Detect potential duplicate expense submissions using AI
-        """
+    def _category_fallback(self, error: str, description: str, amount: float):
+        return {
+            "error": error,
+            "category": "Other",
+            "confidence": 0.0,
+            "reasoning": "Unable to categorize automatically."
+        }
+    
+    def _duplicate_prompt(self, new_expense: dict, existing_expenses: list):
         prompt = f"""
         You are a fraud detection expert specializing in duplicate expense detection.
         
@@ -231,32 +238,17 @@ class ExpenseService:
         - Output only valid JSON
         """
         
-        try:
-            if self.model_name == "gemini":
-                model = LLMModelFactory.get_model_provider('gemini').get_model()
-                response = model.generate_content(prompt)
-                result = response.text
-            elif self.model_name == "chatgpt":
-                model = LLMModelFactory.get_model_provider('chatgpt').get_model()
-                result = model.generate_content(prompt)
-            else:
-                raise ValueError(f"Unsupported model: {self.model_name}")
-            
-            result = TextUtility.remove_json_marker(result)
-            return result
-        
-        except Exception as e:
-            return {
-                "error": str(e),
-                "is_duplicate": False,
-                "duplicate_probability": 0.0,
-                "recommendation": "Unable to check for duplicates automatically."
-            }
+        return prompt
     
-    def generate_expense_summary(self, expenses: list, period: str):
-        """
-        Generate AI-powered summary of expenses for a period
-        """
+    def _duplicate_fallback(self, error: str, new_expense: dict, existing_expenses: list):
+        return {
+            "error": error,
+            "is_duplicate": False,
+            "duplicate_probability": 0.0,
+            "recommendation": "Unable to check for duplicates automatically."
+        }
+    
+    def _summary_prompt(self, expenses: list, period: str):
         prompt = f"""
         You are a financial analyst.
         Generate a comprehensive summary of the following expenses for {period}.
@@ -290,30 +282,15 @@ class ExpenseService:
         - Output only valid JSON
         """
         
-        try:
-            if self.model_name == "gemini":
-                model = LLMModelFactory.get_model_provider('gemini').get_model()
-                response = model.generate_content(prompt)
-                result = response.text
-            elif self.model_name == "chatgpt":
-                model = LLMModelFactory.get_model_provider('chatgpt').get_model()
-                result = model.generate_content(prompt)
-            else:
-                raise ValueError(f"Unsupported model: {self.model_name}")
-            
-            result = TextUtility.remove_json_marker(result)
-            return result
-        
-        except Exception as e:
-            return {
-                "error": str(e),
-                "executive_summary": "Unable to generate summary automatically."
-            }
+        return prompt
     
-    def suggest_expense_optimization(self, user_expense_history: list):
-        """
-        Suggest ways to optimize expenses based on historical data
-        """
+    def _summary_fallback(self, error: str, expenses: list, period: str):
+        return {
+            "error": error,
+            "executive_summary": "Unable to generate summary automatically."
+        }
+    
+    def _optimization_prompt(self, user_expense_history: list):
         prompt = f"""
         You are a cost optimization consultant.
         Analyze the employee's expense history and suggest optimization strategies.
@@ -350,27 +327,282 @@ class ExpenseService:
         - Output only valid JSON
         """
         
+        return prompt
+    
+    def _optimization_fallback(self, error: str, user_expense_history: list):
+        return {
+            "error": error,
+            "optimization_opportunities": [],
+            "best_practices": []
+        }
+    
+    # method name -> (prompt builder, fallback used when the model call or parsing fails)
+    _TASKS = {
+        'verify_expense_receipt': (_receipt_prompt, _receipt_fallback),
+        'check_policy_compliance': (_compliance_prompt, _compliance_fallback),
+        'categorize_expense': (_category_prompt, _category_fallback),
+        'detect_duplicate_expenses': (_duplicate_prompt, _duplicate_fallback),
+        'generate_expense_summary': (_summary_prompt, _summary_fallback),
+        'suggest_expense_optimization': (_optimization_prompt, _optimization_fallback),
+    }
+    
+    def _check_model(self):
+        if not LLMModelFactory.is_supported(self.model_name):
+            raise ValueError(f"Unsupported model: {self.model_name}")
+    
+    def _cache_lookup(self, task: str, prompt: str):
+        """
+        Cache key and cached response (None on a miss) for a prompt, (None, None) when caching is off
+        """
+        if not self.use_cache:
+            return None, None
+        key = self.cache.make_key(self.model_name, LLMModelFactory.get_model_name(self.model_name), prompt)
+        return key, self.cache.get(key, ttl=self.cache_ttl, scope=f'{type(self).__name__}.{task}')
+    
+    def _run(self, task: str, *args, **kwargs):
+        prompt_fn, fallback_fn = self._TASKS[task]
+        try:
+            self._check_model()
+            prompt = prompt_fn(self, *args, **kwargs)
+            key, result = self._cache_lookup(task, prompt)
+            if result is not None:
+                return TextUtility.remove_json_marker(result)
+            
+            started = time.perf_counter()
+            result = LLMModelFactory.get_model_provider(self.model_name).generate_text(prompt)
+            
+            # Clean and parse JSON response, only responses that parse are cached
+            parsed = TextUtility.remove_json_marker(result)
+            if key is not None:
+                self.cache.put(key, result, self.model_name, LLMModelFactory.get_model_name(self.model_name),
+                               latency=time.perf_counter() - started)
+            return parsed
+        
+        except Exception as e:
+            return fallback_fn(self, str(e), *args, **kwargs)
+    
+    async def _run_async(self, task: str, *args, timeout: float = None, **kwargs):
+        prompt_fn, fallback_fn = self._TASKS[task]
         try:
-            if self.model_name == "gemini":
-                model = LLMModelFactory.get_model_provider('gemini').get_model()
-                response = model.generate_content(prompt)
-                result = response.text
-            elif self.model_name == "chatgpt":
-                model = LLMModelFactory.get_model_provider('chatgpt').get_model()
-                result = model.generate_content(prompt)
-            else:
-                raise ValueError(f"Unsupported model: {self.model_name}")
+            self._check_model()
+            prompt = prompt_fn(self, *args, **kwargs)
+            key, result = self._cache_lookup(task, prompt)
+            if result is not None:
+                return TextUtility.remove_json_marker(result)
             
-            result = TextUtility.remove_json_marker(result)
-            return result
+            started = time.perf_counter()
+            result = await self.llm_client.generate(self.model_name, prompt, timeout=timeout)
+            parsed = TextUtility.remove_json_marker(result)
+            if key is not None:
+                self.cache.put(key, result, self.model_name, LLMModelFactory.get_model_name(self.model_name),
+                               latency=time.perf_counter() - started)
+            return parsed
         
         except Exception as e:
-            return {
-                "error": str(e),
-                "optimization_opportunities": [],
-                "best_practices": []
-            }
+            # CancelledError is not an Exception, so cancelling a batch still propagates
+            return fallback_fn(self, str(e), *args, **kwargs)
+    
+    def cache_stats(self):
+        """
+        LLM response cache hit rate and latency saved per method of this service
+        """
+        prefix = f'{type(self).__name__}.'
+        return {name[len(prefix):]: stats for name, stats in self.cache.stats().items() if name.startswith(prefix)}
+    
+    def verify_expense_receipt(self, receipt_text: str, claimed_amount: float, category: str):
+        """
+        Verify expense receipt using AI
+        Extracts information from receipt and compares with claimed amount
+        """
+        return self._run('verify_expense_receipt', receipt_text, claimed_amount, category)
+    
+    def check_policy_compliance(self, expense_data: dict, policy_limits: dict):
+        """
+        Check if expense complies with company policy using AI
+        """
+        return self._run('check_policy_compliance', expense_data, policy_limits)
+    
+    def categorize_expense(self, description: str, amount: float):
+        """
+        Automatically categorize expense based on description
+        """
+        return self._run('categorize_expense', description, amount)
+    
+    def detect_duplicate_expenses(self, new_expense: dict, existing_expenses: list):
+        """
+        Detect potential duplicate expense submissions using AI
+        """
+        return self._run('detect_duplicate_expenses', new_expense, existing_expenses)
+    
+    def generate_expense_summary(self, expenses: list, period: str):
+        """
+        Generate AI-powered summary of expenses for a period
+        """
+        return self._run('generate_expense_summary', expenses, period)
+    
+    def suggest_expense_optimization(self, user_expense_history: list):
+        """
+        Suggest ways to optimize expenses based on historical data
+        """
+        return self._run('suggest_expense_optimization', user_expense_history)
+    
+    async def verify_expense_receipt_async(self, receipt_text: str, claimed_amount: float, category: str,
+                                           timeout: float = None):
+        return await self._run_async('verify_expense_receipt', receipt_text, claimed_amount, category, timeout=timeout)
+    
+    async def check_policy_compliance_async(self, expense_data: dict, policy_limits: dict, timeout: float = None):
+        return await self._run_async('check_policy_compliance', expense_data, policy_limits, timeout=timeout)
+    
+    async def categorize_expense_async(self, description: str, amount: float, timeout: float = None):
+        return await self._run_async('categorize_expense', description, amount, timeout=timeout)
+    
+    async def detect_duplicate_expenses_async(self, new_expense: dict, existing_expenses: list, timeout: float = None):
+        return await self._run_async('detect_duplicate_expenses', new_expense, existing_expenses, timeout=timeout)
+    
+    async def generate_expense_summary_async(self, expenses: list, period: str, timeout: float = None):
+        return await self._run_async('generate_expense_summary', expenses, period, timeout=timeout)
+    
+    async def suggest_expense_optimization_async(self, user_expense_history: list, timeout: float = None):
+        return await self._run_async('suggest_expense_optimization', user_expense_history, timeout=timeout)
+    
+    async def run_batch_async(self, task: str, calls: list, timeout: float = None):
+        """
+        Run one task for many inputs concurrently, results come back in input order.
+        Each call is a dict of keyword arguments or a tuple of positional ones.
+        Concurrency is bounded per provider by the LLM client, failed or timed
+        out items get the task's fallback result.
+        """
+        if task not in self._TASKS:
+            raise ValueError(f"Unsupported task: {task}")
+        
+        return await asyncio.gather(*(
+            self._run_async(task, **call, timeout=timeout) if isinstance(call, dict)
+            else self._run_async(task, *call, timeout=timeout)
+            for call in calls
+        ))
+    
+    def run_batch(self, task: str, calls: list, timeout: float = None):
+        """
+        Blocking wrapper around run_batch_async for code without an event loop
+        """
+        return asyncio.run(self.run_batch_async(task, calls, timeout=timeout))
+    
+    def verify_expense_receipts(self, receipts: list, timeout: float = None):
+        """
+        Verify many receipts concurrently
+        receipts: [{"receipt_text": ..., "claimed_amount": ..., "category": ...}]
+        """
+        return self.run_batch('verify_expense_receipt', receipts, timeout=timeout)
+    
+    def _plan_receipt_batches(self, claims: list, max_batch_size: int, token_budget: int):
+        """
+        Greedily pack claims into batches that fit the prompt token budget and
+        whose answers fit in one response of the provider
+        """
+        overhead = TextUtility.estimate_tokens(self._receipts_batch_prompt([]))
+        max_items = min(max_batch_size,
+                        self.MAX_OUTPUT_TOKENS.get(self.model_name, 1000) // self.RECEIPT_OUTPUT_TOKENS)
+        
+        batches, batch, used = [], [], overhead
+        for claim in claims:
+            cost = TextUtility.estimate_tokens(json.dumps(claim, indent=2))
+            if batch and (len(batch) >= max_items or used + cost > token_budget):
+                batches.append(batch)
+                batch, used = [], overhead
+            batch.append(claim)
+            used += cost
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    async def _verify_receipt_batch_async(self, claims: list, receipts: dict, timeout: float = None):
+        """
+        Verify one batch in a single request. Claims missing from the answer,
+        or all of them when the answer is not a JSON array, are verified one by one.
+        When the batch request times out the claims get the manual review fallback
+        instead, retrying each of them would only wait out the timeout again.
+        """
+        parsed = {}
+        if len(claims) > 1:
+            try:
+                self._check_model()
+                prompt = self._receipts_batch_prompt(claims)
+                key, result = self._cache_lookup('verify_expense_receipts_batched', prompt)
+                cached = result is not None
+                if not cached:
+                    started = time.perf_counter()
+                    result = await self.llm_client.generate(self.model_name, prompt, timeout=timeout)
+                    latency = time.perf_counter() - started
+                
+                items = TextUtility.remove_json_marker(result)
+                if isinstance(items, list):
+                    parsed = {str(item.pop('id')): item for item in items if isinstance(item, dict) and 'id' in item}
+                
+                # partial answers are not cached, the next run retries the whole batch
+                if key is not None and not cached and all(claim['id'] in parsed for claim in claims):
+                    self.cache.put(key, result, self.model_name, LLMModelFactory.get_model_name(self.model_name),
+                                   latency=latency)
+            
+            except LLMTimeoutError as e:
+                logger.warning("Receipt batch of %d timed out, not retrying per receipt: %s", len(claims), e)
+                return [self._receipt_fallback(str(e), receipts[claim['id']]['receipt_text'],
+                                               receipts[claim['id']]['claimed_amount'],
+                                               receipts[claim['id']]['category']) for claim in claims]
+            except Exception as e:
+                logger.warning("Receipt batch of %d failed, verifying receipts one by one: %s", len(claims), e)
+                parsed = {}
+        
+        missing = [claim['id'] for claim in claims if claim['id'] not in parsed]
+        fallbacks = await asyncio.gather(*(
+            self._run_async('verify_expense_receipt', receipts[claim_id]['receipt_text'],
+                            receipts[claim_id]['claimed_amount'], receipts[claim_id]['category'], timeout=timeout)
+            for claim_id in missing
+        ))
+        parsed.update(zip(missing, fallbacks))
+        return [parsed[claim['id']] for claim in claims]
+    
+    async def verify_expense_receipts_batched_async(self, receipts: list, max_batch_size: int = None,
+                                                    token_budget: int = None, timeout: float = None):
+        """
+        Verify many receipts with several receipts packed into each request.
+        receipts: [{"receipt_text": ..., "claimed_amount": ..., "category": ...}]
+        Batch size adapts to token_budget and the provider's response limit,
+        results come back in input order with the same fields as verify_expense_receipt.
+        """
+        receipts_by_id = {str(i): receipt for i, receipt in enumerate(receipts)}
+        claims = [{'id': claim_id, **receipt} for claim_id, receipt in receipts_by_id.items()]
+        batches = self._plan_receipt_batches(
+            claims, max_batch_size or self.MAX_RECEIPTS_PER_BATCH, token_budget or self.BATCH_TOKEN_BUDGET
+        )
+        
+        results = await asyncio.gather(*(
+            self._verify_receipt_batch_async(batch, receipts_by_id, timeout=timeout) for batch in batches
+        ))
+        return [result for batch_results in results for result in batch_results]
+    
+    def verify_expense_receipts_batched(self, receipts: list, max_batch_size: int = None,
+                                        token_budget: int = None, timeout: float = None):
+        """
+        Blocking wrapper around verify_expense_receipts_batched_async
+        """
+        return asyncio.run(self.verify_expense_receipts_batched_async(
+            receipts, max_batch_size=max_batch_size, token_budget=token_budget, timeout=timeout
+        ))
+    
+    def check_policy_compliance_many(self, expenses: list, policy_limits: dict, timeout: float = None):
+        """
+        Check many expenses against the same policy limits concurrently
+        """
+        return self.run_batch('check_policy_compliance', [(expense, policy_limits) for expense in expenses],
+                              timeout=timeout)
+    
+    def categorize_expenses(self, expenses: list, timeout: float = None):
+        """
+        Categorize many expenses concurrently
+        expenses: [{"description": ..., "amount": ...}]
+        """
+        return self.run_batch('categorize_expense', expenses, timeout=timeout)
 
 
 # Create singleton instance
-expense_service = ExpenseService()
\ No newline at end of file
+expense_service = ExpenseService()
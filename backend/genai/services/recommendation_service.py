@@ -1,6 +1,6 @@
 from ..prompt import PromptManager
 from ..llm_factory import LLMModelFactory
-from ...utils import TextUtility
+from utils.text_utility import TextUtility
 
 
 class RecommendationService:
@@ -1,9 +1,8 @@
 from ..prompt import PromptManager
-from ...models import User, Role, Resume, JobPost, Application, PerformanceReview
-from ..schema import Schema
-from ...database.vector_db import chroma_db_service
+from models import User, Role, Resume, JobPost, Application, PerformanceReview
+from database.vector_db import chroma_db_service
 from ..llm_factory import LLMModelFactory
-from ...utils import TextUtility
+from utils.text_utility import TextUtility
 
 class ResumeService:
     def __init__(self, file_path, user_id, resume_id):
@@ -34,24 +33,25 @@ class ResumeService:
             result=model.generate_content(prompt)
 
         # remove json marker from resume
-        parsed_resume = TextUtility.remove_json_marker(result)
+        parsed_data = TextUtility.remove_json_marker(result)
 
         #structure the resume 
-        parsed_resume=TextUtility.format_resume_text(parsed_resume)
-
-        # embed resume and store it in chroma
-        chroma_db_service.load_data(
-            collection_name="resume"+self.resume_id,
-            doc_id=self.resume_id,
-            meta_data={
-                "user_id": self.user_id,
-                "resume_id": self.resume_id
-            },
-            text=parsed_resume
-        )
+        parsed_resume=TextUtility.format_resume_text(parsed_data)
+
+        # embed resume into the shared resume collection, and chunk by chunk for long resumes
+        metadata = {"user_id": self.user_id}
+        chroma_db_service.add_resume(self.resume_id, parsed_resume, metadata, location=parsed_data.get("location") or None)
+        chroma_db_service.index_chunks("resume", [self.resume_id], [parsed_resume],
+                                       [{**metadata, "resume_id": self.resume_id, "status": "active"}])
 
         # search top-n job based on resume
         jobs = chroma_db_service.search_jobs_for_resume(parsed_resume, k=5)
+
+        return {
+            "resume_id": self.resume_id,
+            "parsed_data": parsed_data,
+            "jobs": jobs
+        }
         
 
 
@@ -4,7 +4,8 @@ from app import create_app, db
 from models import (
     Role, User, JobPost, Resume, Application, Interview,
     Training, Course, Enrollment, Report, EODReport, ExpenseReport,
-    PerformanceReview, Notification, AuditLog
+    PerformanceReview, PerformanceReviewSummary, Notification, AuditLog, IndexingJob,
+    JobResumeMatch, ResumeJobMatch, MatchSource
 )
 
 def init_database():
@@ -1,5 +1,6 @@
 import uuid
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
+from sqlalchemy import event
 from app import db
 import json
 
@@ -28,9 +29,11 @@ class User(db.Model):
     name = db.Column(db.String(200), nullable=False)
     email = db.Column(db.String(200), unique=True, nullable=False)
     role_id = db.Column(db.String(36), db.ForeignKey('roles.id'), nullable=False)
+    manager_id = db.Column(db.String(36), db.ForeignKey('users.id'), index=True)
     status = db.Column(db.String(50), default='active')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    direct_reports = db.relationship('User', backref=db.backref('manager', remote_side=[id]), lazy=True)
     job_posts = db.relationship('JobPost', backref='posted_by', lazy=True)
     resumes = db.relationship('Resume', backref='owner', lazy=True)
     applications = db.relationship('Application', backref='candidate', lazy=True)
@@ -50,6 +53,7 @@ class User(db.Model):
             'email': self.email,
             'role_id': self.role_id,
             'role_name': self.role.name if self.role else None,
+            'manager_id': self.manager_id,
             'status': self.status,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
@@ -138,21 +142,36 @@ class Interview(db.Model):
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     application_id = db.Column(db.String(36), db.ForeignKey('applications.id'), nullable=False)
     scheduled_at = db.Column(db.DateTime, nullable=False)
+    duration_mins = db.Column(db.Integer, default=60)
+    ends_at = db.Column(db.DateTime)
     interviewer_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
     status = db.Column(db.String(50), default='scheduled')
     feedback = db.Column(db.Text)
     
+    __table_args__ = (
+        db.Index('ix_interviews_interviewer_scheduled', 'interviewer_id', 'scheduled_at'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
             'application_id': self.application_id,
             'scheduled_at': self.scheduled_at.isoformat() if self.scheduled_at else None,
+            'duration_mins': self.duration_mins,
+            'ends_at': self.ends_at.isoformat() if self.ends_at else None,
             'interviewer_id': self.interviewer_id,
             'interviewer_name': self.interviewer.name if self.interviewer else None,
             'status': self.status,
             'feedback': self.feedback
         }
 
+@event.listens_for(Interview, 'before_insert')
+@event.listens_for(Interview, 'before_update')
+def set_interview_end(mapper, connection, interview):
+    # ends_at drives the overlap check, keep it in step however the row is written
+    if interview.scheduled_at is not None:
+        interview.ends_at = interview.scheduled_at + timedelta(minutes=interview.duration_mins or 60)
+
 class Training(db.Model):
     __tablename__ = 'trainings'
     
@@ -202,6 +221,11 @@ class Enrollment(db.Model):
     course_id = db.Column(db.String(36), db.ForeignKey('courses.id'), nullable=False)
     progress = db.Column(db.Float, default=0.0)
     status = db.Column(db.String(50), default='enrolled')
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        db.UniqueConstraint('course_id', 'user_id', name='uq_enrollments_course_user'),
+    )
     
     def to_dict(self):
         return {
@@ -211,14 +235,15 @@ class Enrollment(db.Model):
             'course_id': self.course_id,
             'course_title': self.course.title if self.course else None,
             'progress': self.progress,
-            'status': self.status
+            'status': self.status,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
 class Report(db.Model):
     __tablename__ = 'reports'
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False, index=True)
     type = db.Column(db.String(50), nullable=False)
     submitted_at = db.Column(db.DateTime, default=datetime.utcnow)
     approved_by = db.Column(db.String(36), db.ForeignKey('users.id'))
@@ -296,6 +321,11 @@ class PerformanceReview(db.Model):
     rating = db.Column(db.Float)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('ix_performance_reviews_employee_created', 'employee_id', 'created_at'),
+        db.Index('ix_performance_reviews_reviewer_created', 'reviewer_id', 'created_at'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -309,6 +339,34 @@ class PerformanceReview(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
+class PerformanceReviewSummary(db.Model):
+    __tablename__ = 'performance_review_summaries'
+    
+    # Materialized rating stats per dimension (employee, reviewer, type) and quarter
+    dimension = db.Column(db.String(20), primary_key=True)
+    key = db.Column(db.String(50), primary_key=True)
+    year = db.Column(db.Integer, primary_key=True)
+    quarter = db.Column(db.Integer, primary_key=True)
+    review_count = db.Column(db.Integer, nullable=False)
+    avg_rating = db.Column(db.Float)
+    min_rating = db.Column(db.Float)
+    max_rating = db.Column(db.Float)
+    refreshed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'dimension': self.dimension,
+            'key': self.key,
+            'year': self.year,
+            'quarter': self.quarter,
+            'period': f'{self.year}-Q{self.quarter}',
+            'review_count': self.review_count,
+            'avg_rating': self.avg_rating,
+            'min_rating': self.min_rating,
+            'max_rating': self.max_rating,
+            'refreshed_at': self.refreshed_at.isoformat() if self.refreshed_at else None
+        }
+
 class Notification(db.Model):
     __tablename__ = 'notifications'
     
@@ -348,3 +406,98 @@ class AuditLog(db.Model):
             'target_id': self.target_id,
             'timestamp': self.timestamp.isoformat() if self.timestamp else None
         }
+
+class IndexingJob(db.Model):
+    __tablename__ = 'indexing_jobs'
+    
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    kind = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.Text)
+    status = db.Column(db.String(50), default='queued', index=True)
+    attempts = db.Column(db.Integer, default=0)
+    error = db.Column(db.Text)
+    result = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    
+    def get_payload(self):
+        return json.loads(self.payload) if self.payload else {}
+    
+    def set_payload(self, payload):
+        self.payload = json.dumps(payload)
+    
+    def get_result(self):
+        return json.loads(self.result) if self.result else None
+    
+    def set_result(self, result):
+        self.result = json.dumps(result, default=str)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'payload': self.get_payload(),
+            'status': self.status,
+            'attempts': self.attempts,
+            'error': self.error,
+            'result': self.get_result(),
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+class JobResumeMatch(db.Model):
+    __tablename__ = 'job_resume_matches'
+    __table_args__ = (
+        db.Index('ix_job_resume_matches_job_rank', 'job_id', 'rank'),
+        db.Index('ix_job_resume_matches_resume', 'resume_id'),
+    )
+    
+    # Precomputed top-k resumes per open job, refreshed by the match matrix job
+    job_id = db.Column(db.String(36), primary_key=True)
+    resume_id = db.Column(db.String(36), primary_key=True)
+    rank = db.Column(db.Integer, nullable=False)
+    score = db.Column(db.Float, nullable=False)
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'job_id': self.job_id,
+            'resume_id': self.resume_id,
+            'rank': self.rank,
+            'score': self.score,
+            'computed_at': self.computed_at.isoformat() if self.computed_at else None
+        }
+
+class ResumeJobMatch(db.Model):
+    __tablename__ = 'resume_job_matches'
+    __table_args__ = (
+        db.Index('ix_resume_job_matches_resume_rank', 'resume_id', 'rank'),
+        db.Index('ix_resume_job_matches_job', 'job_id'),
+    )
+    
+    # Precomputed top-k open jobs per active resume
+    resume_id = db.Column(db.String(36), primary_key=True)
+    job_id = db.Column(db.String(36), primary_key=True)
+    rank = db.Column(db.Integer, nullable=False)
+    score = db.Column(db.Float, nullable=False)
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'resume_id': self.resume_id,
+            'job_id': self.job_id,
+            'rank': self.rank,
+            'score': self.score,
+            'computed_at': self.computed_at.isoformat() if self.computed_at else None
+        }
+
+class MatchSource(db.Model):
+    __tablename__ = 'match_sources'
+    
+    # Embedding fingerprint each job / resume had when the match tables were last refreshed
+    kind = db.Column(db.String(20), primary_key=True)
+    entity_id = db.Column(db.String(36), primary_key=True)
+    fingerprint = db.Column(db.String(64), nullable=False)
+    refreshed_at = db.Column(db.DateTime, default=datetime.utcnow)
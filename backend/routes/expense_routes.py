@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from werkzeug.utils import secure_filename
 from app import db
 from models import ExpenseReport, Report, User
+from services.hierarchy_service import hierarchy_service
 from datetime import datetime
 import os
 import uuid
@@ -385,6 +386,65 @@ def get_pending_expenses():
         return jsonify({'error': str(e)}), 500
 
 
+# 6b. MANAGER APPROVAL INBOX
+@expense_bp.route('/inbox/<manager_id>', methods=['GET'])
+def get_manager_inbox(manager_id):
+    """
+    Get pending expenses of a manager's reports
+    Query params: transitive (default true), page, limit
+    """
+    try:
+        transitive = request.args.get('transitive', 'true').lower() == 'true'
+        page = int(request.args.get('page', 1))
+        limit = int(request.args.get('limit', 10))
+        
+        manager = User.query.get(manager_id)
+        if not manager:
+            return jsonify({'error': 'Manager not found'}), 404
+        
+        # Resolve the reporting tree in the database with a recursive CTE
+        query = db.session.query(ExpenseReport, Report, User.name).join(
+            Report, ExpenseReport.report_id == Report.id
+        ).join(
+            User, Report.user_id == User.id
+        ).filter(
+            ExpenseReport.status == 'pending',
+            Report.user_id.in_(hierarchy_service.report_ids(manager_id, transitive))
+        )
+        
+        total_count = query.count()
+        expenses = query.order_by(Report.submitted_at.desc()).offset(
+            (page - 1) * limit
+        ).limit(limit).all()
+        
+        result = []
+        for expense_report, report, user_name in expenses:
+            result.append({
+                'id': expense_report.id,
+                'report_id': report.id,
+                'user_id': report.user_id,
+                'user_name': user_name,
+                'items': expense_report.get_items(),
+                'total': expense_report.total,
+                'status': expense_report.status,
+                'submitted_at': report.submitted_at.isoformat() if report.submitted_at else None
+            })
+        
+        return jsonify({
+            'manager_id': manager_id,
+            'data': result,
+            'pagination': {
+                'current_page': page,
+                'total_pages': (total_count + limit - 1) // limit,
+                'total_count': total_count,
+                'per_page': limit
+            }
+        }), 200
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 # 7. GET EXPENSE REPORTS/SUMMARY
 @expense_bp.route('/reports', methods=['GET'])
 def get_expense_reports():
@@ -0,0 +1,25 @@
+from flask import Blueprint, jsonify
+from app import db
+from models import IndexingJob
+from services.indexing_worker import indexing_worker_pool
+
+indexing_bp = Blueprint('indexing', __name__)
+
+@indexing_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_indexing_job(job_id):
+    try:
+        job = db.session.get(IndexingJob, job_id)
+        if not job:
+            return jsonify({'error': 'Indexing job not found'}), 404
+        return jsonify(job.to_dict()), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@indexing_bp.route('/stats', methods=['GET'])
+def get_indexing_stats():
+    try:
+        return jsonify(indexing_worker_pool.stats()), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,150 @@
+from flask import Blueprint, request, jsonify
+from app import db
+from models import Interview, Application, User
+from services.interview_service import interview_service, SchedulingConflict
+from datetime import datetime
+
+interview_bp = Blueprint('interviews', __name__)
+
+def conflict_response(e):
+    return jsonify({
+        'error': str(e),
+        'conflicts': [interview.to_dict() for interview in e.conflicts]
+    }), 409
+
+@interview_bp.route('/', methods=['POST'])
+def schedule_interview():
+    """
+    Schedule an interview
+    Body: application_id, interviewer_id, scheduled_at (ISO 8601), duration_mins
+    """
+    try:
+        data = request.get_json()
+
+        if not all(data.get(key) for key in ('application_id', 'interviewer_id', 'scheduled_at')):
+            return jsonify({'error': 'Missing required fields'}), 400
+
+        if not Application.query.get(data['application_id']):
+            return jsonify({'error': 'Application not found'}), 404
+
+        if not User.query.get(data['interviewer_id']):
+            return jsonify({'error': 'Interviewer not found'}), 404
+
+        interview = interview_service.schedule(
+            application_id=data['application_id'],
+            interviewer_id=data['interviewer_id'],
+            scheduled_at=datetime.fromisoformat(data['scheduled_at']),
+            duration_mins=data.get('duration_mins', 60)
+        )
+
+        return jsonify({'message': 'Interview scheduled successfully', 'interview': interview.to_dict()}), 201
+
+    except SchedulingConflict as e:
+        return conflict_response(e)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@interview_bp.route('/<interview_id>', methods=['GET'])
+def get_interview(interview_id):
+    try:
+        interview = Interview.query.get_or_404(interview_id)
+        return jsonify(interview.to_dict()), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@interview_bp.route('/<interview_id>/reschedule', methods=['PUT'])
+def reschedule_interview(interview_id):
+    try:
+        interview = Interview.query.get_or_404(interview_id)
+        data = request.get_json()
+
+        if not data.get('scheduled_at'):
+            return jsonify({'error': 'scheduled_at is required'}), 400
+
+        if interview.status == 'cancelled':
+            return jsonify({'error': 'Cannot reschedule a cancelled interview'}), 400
+
+        interview = interview_service.reschedule(
+            interview,
+            scheduled_at=datetime.fromisoformat(data['scheduled_at']),
+            duration_mins=data.get('duration_mins')
+        )
+
+        return jsonify({'message': 'Interview rescheduled successfully', 'interview': interview.to_dict()}), 200
+
+    except SchedulingConflict as e:
+        db.session.rollback()
+        return conflict_response(e)
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@interview_bp.route('/<interview_id>/cancel', methods=['PUT'])
+def cancel_interview(interview_id):
+    try:
+        interview = Interview.query.get_or_404(interview_id)
+        interview.status = 'cancelled'
+
+        db.session.commit()
+
+        return jsonify({'message': 'Interview cancelled'}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@interview_bp.route('/interviewers/<interviewer_id>', methods=['GET'])
+def get_interviewer_schedule(interviewer_id):
+    """
+    Get the interviews of an interviewer
+    Query params: start, end (ISO 8601)
+    """
+    try:
+        start = datetime.fromisoformat(request.args['start'])
+        end = datetime.fromisoformat(request.args['end'])
+
+        interviews = interview_service.find_conflicts(interviewer_id, start, end)
+        return jsonify([interview.to_dict() for interview in interviews]), 200
+
+    except (KeyError, ValueError):
+        return jsonify({'error': 'start and end must be ISO 8601 datetimes'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@interview_bp.route('/free-slots', methods=['GET'])
+def get_free_slots():
+    """
+    Find windows where every interviewer of a panel is free
+    Query params: interviewer_ids (comma separated), start, end, duration_mins,
+    work_start_hour, work_end_hour
+    """
+    try:
+        interviewer_ids = [i for i in request.args.get('interviewer_ids', '').split(',') if i]
+        if not interviewer_ids:
+            return jsonify({'error': 'interviewer_ids is required'}), 400
+
+        if not request.args.get('start') or not request.args.get('end'):
+            return jsonify({'error': 'start and end are required'}), 400
+
+        slots = interview_service.free_slots(
+            interviewer_ids,
+            start=datetime.fromisoformat(request.args['start']),
+            end=datetime.fromisoformat(request.args['end']),
+            duration_mins=int(request.args.get('duration_mins', 60)),
+            work_start_hour=int(request.args.get('work_start_hour', 9)),
+            work_end_hour=int(request.args.get('work_end_hour', 17))
+        )
+
+        return jsonify({'interviewer_ids': interviewer_ids, 'slots': slots}), 200
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from app import db
-from models import JobPost
+from models import JobPost, JobResumeMatch, Resume
+from services.purge_service import purge_service
 
 job_bp = Blueprint('jobs', __name__)
 
@@ -66,11 +67,10 @@ def update_job(job_id):
 @job_bp.route('/<job_id>', methods=['DELETE'])
 def delete_job(job_id):
     try:
-        job = JobPost.query.get_or_404(job_id)
-        db.session.delete(job)
-        db.session.commit()
+        JobPost.query.get_or_404(job_id)
+        deleted = purge_service.purge_job(job_id)
         
-        return jsonify({'message': 'Job post deleted successfully'}), 200
+        return jsonify({'message': 'Job post deleted successfully', 'deleted': deleted}), 200
     
     except Exception as e:
         db.session.rollback()
@@ -85,3 +85,53 @@ def get_job_applications(job_id):
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+@job_bp.route('/<job_id>/resume-matches', methods=['GET'])
+def get_job_resume_matches(job_id):
+    """Ad-hoc top-k resumes for a job, optionally filtered by ?location= and ?status= inside the vector index.
+    ?chunked=true scores resumes by their best matching chunks, ?mode=hybrid adds BM25 keyword matching.
+    These options are not precomputed; the plain ranking is served from the match table by /top-candidates"""
+    try:
+        from database.vector_db import chroma_db_service
+        from utils.text_utility import TextUtility
+
+        job = JobPost.query.get_or_404(job_id)
+        k = request.args.get('k', 5, type=int)
+        filters = {
+            'location': request.args.getlist('location') or None,
+            'status': request.args.getlist('status') or None
+        }
+
+        matches = chroma_db_service.search_resumes_for_job(
+            TextUtility.format_job_post_text(job.title, job.description, job.requirements),
+            k=k,
+            filters=filters,
+            chunked=request.args.get('chunked', 'false').lower() == 'true',
+            mode=request.args.get('mode', 'vector')
+        )
+        return jsonify(matches), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@job_bp.route('/<job_id>/top-candidates', methods=['GET'])
+def get_job_top_candidates(job_id):
+    """Best resumes for a job from the precomputed match table (flask refresh-match-matrix)"""
+    try:
+        JobPost.query.get_or_404(job_id)
+        limit = request.args.get('limit', type=int)
+
+        # resumes deleted since the last refresh are dropped by the join
+        query = db.session.query(JobResumeMatch, Resume).join(
+            Resume, Resume.id == JobResumeMatch.resume_id
+        ).filter(JobResumeMatch.job_id == job_id).order_by(JobResumeMatch.rank)
+        if limit:
+            query = query.limit(limit)
+
+        return jsonify([
+            {**match.to_dict(), 'owner_id': resume.owner_id, 'file_url': resume.file_url}
+            for match, resume in query
+        ]), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
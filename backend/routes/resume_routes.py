@@ -0,0 +1,111 @@
+from flask import Blueprint, request, jsonify, current_app
+from werkzeug.utils import secure_filename
+from app import db
+from models import Resume, User, JobPost, ResumeJobMatch
+from services.indexing_worker import indexing_worker_pool, QueueFullError
+from genai.llm_factory import LLMModelFactory
+import os
+import uuid
+
+resume_bp = Blueprint('resumes', __name__)
+
+# Configuration
+UPLOAD_FOLDER = './uploads/resumes'
+ALLOWED_EXTENSIONS = {'pdf', 'docx'}
+
+os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+
+def allowed_file(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+
+@resume_bp.route('/upload', methods=['POST'])
+def upload_resume():
+    """
+    Upload a resume and queue it for parsing and indexing
+    Form data: user_id, resume (file), model_name (gemini|chatgpt)
+    Returns immediately with an indexing job id to poll
+    """
+    try:
+        user_id = request.form.get('user_id')
+        model_name = request.form.get('model_name', 'gemini')
+
+        if not user_id or 'resume' not in request.files:
+            return jsonify({'error': 'Missing required fields'}), 400
+
+        if not LLMModelFactory.is_supported(model_name):
+            return jsonify({'error': f'Unsupported model: {model_name}'}), 400
+
+        if not User.query.get(user_id):
+            return jsonify({'error': 'User not found'}), 404
+
+        file = request.files['resume']
+        if file.filename == '' or not allowed_file(file.filename):
+            return jsonify({'error': 'Invalid file type. Allowed: pdf, docx'}), 400
+
+        filename = secure_filename(file.filename)
+        filepath = os.path.join(UPLOAD_FOLDER, f"{uuid.uuid4()}_{filename}")
+        file.save(filepath)
+
+        resume = Resume(owner_id=user_id, file_url=filepath)
+        db.session.add(resume)
+        db.session.commit()
+
+        try:
+            job_id = indexing_worker_pool.submit(current_app._get_current_object(), 'resume', {
+                'file_path': filepath,
+                'user_id': user_id,
+                'resume_id': resume.id,
+                'model_name': model_name
+            })
+        except QueueFullError as e:
+            # nothing would ever index this upload, so do not keep it
+            Resume.query.filter(Resume.id == resume.id).delete(synchronize_session=False)
+            db.session.commit()
+            os.remove(filepath)
+            response = jsonify({'error': str(e)})
+            response.headers['Retry-After'] = '30'
+            return response, 503
+
+        return jsonify({
+            'message': 'Resume uploaded, indexing queued',
+            'resume_id': resume.id,
+            'job_id': job_id,
+            'status_url': f'/api/indexing/jobs/{job_id}'
+        }), 202
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+@resume_bp.route('/<resume_id>', methods=['GET'])
+def get_resume(resume_id):
+    try:
+        resume = Resume.query.get_or_404(resume_id)
+        return jsonify(resume.to_dict()), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@resume_bp.route('/<resume_id>/top-jobs', methods=['GET'])
+def get_resume_top_jobs(resume_id):
+    """Best open jobs for a resume from the precomputed match table"""
+    try:
+        Resume.query.get_or_404(resume_id)
+        limit = request.args.get('limit', type=int)
+
+        query = db.session.query(ResumeJobMatch, JobPost).join(
+            JobPost, JobPost.id == ResumeJobMatch.job_id
+        ).filter(ResumeJobMatch.resume_id == resume_id).order_by(ResumeJobMatch.rank)
+        if limit:
+            query = query.limit(limit)
+
+        return jsonify([
+            {**match.to_dict(), 'title': job.title, 'status': job.status}
+            for match, job in query
+        ]), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
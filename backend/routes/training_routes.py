@@ -0,0 +1,178 @@
+from flask import Blueprint, request, jsonify
+from app import db
+from models import Training, Course, Enrollment, User
+from services.training_service import training_service
+from datetime import date
+
+training_bp = Blueprint('trainings', __name__)
+
+@training_bp.route('/', methods=['GET'])
+def get_trainings():
+    try:
+        trainings = Training.query.all()
+        return jsonify([training.to_dict() for training in trainings]), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@training_bp.route('/', methods=['POST'])
+def create_training():
+    try:
+        data = request.get_json()
+
+        training = Training(
+            title=data['title'],
+            description=data.get('description', ''),
+            start_date=date.fromisoformat(data['start_date']) if data.get('start_date') else None,
+            end_date=date.fromisoformat(data['end_date']) if data.get('end_date') else None
+        )
+
+        db.session.add(training)
+        db.session.commit()
+
+        return jsonify({'message': 'Training created successfully', 'training': training.to_dict()}), 201
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@training_bp.route('/<training_id>/courses', methods=['GET'])
+def get_training_courses(training_id):
+    try:
+        training = Training.query.get_or_404(training_id)
+        return jsonify([course.to_dict() for course in training.courses]), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@training_bp.route('/<training_id>/courses', methods=['POST'])
+def create_course(training_id):
+    try:
+        Training.query.get_or_404(training_id)
+        data = request.get_json()
+
+        course = Course(
+            training_id=training_id,
+            title=data['title'],
+            content_url=data.get('content_url'),
+            duration_mins=data.get('duration_mins')
+        )
+
+        db.session.add(course)
+        db.session.commit()
+
+        return jsonify({'message': 'Course created successfully', 'course': course.to_dict()}), 201
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@training_bp.route('/courses/<course_id>/enrollments', methods=['POST'])
+def enroll_users(course_id):
+    """
+    Enroll many users in a course
+    Body: {"user_ids": [...]}
+    """
+    try:
+        Course.query.get_or_404(course_id)
+        data = request.get_json()
+
+        user_ids = data.get('user_ids')
+        if not isinstance(user_ids, list) or not user_ids:
+            return jsonify({'error': 'user_ids must be a non-empty list'}), 400
+
+        result = training_service.enroll_users(course_id, user_ids)
+
+        return jsonify({
+            'message': f"{len(result['enrolled'])} users enrolled",
+            **result
+        }), 201
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@training_bp.route('/courses/<course_id>/enrollments', methods=['GET'])
+def get_course_enrollments(course_id):
+    """
+    Get enrollments of a course
+    Query params: status, page, limit
+    """
+    try:
+        status = request.args.get('status')
+        page = int(request.args.get('page', 1))
+        limit = int(request.args.get('limit', 50))
+
+        # Select the user name in the same query instead of lazy loading per row
+        query = db.session.query(Enrollment, User.name).join(
+            User, Enrollment.user_id == User.id
+        ).filter(Enrollment.course_id == course_id)
+
+        if status:
+            query = query.filter(Enrollment.status == status)
+
+        total_count = query.count()
+        enrollments = query.order_by(User.name).offset((page - 1) * limit).limit(limit).all()
+
+        result = []
+        for enrollment, user_name in enrollments:
+            result.append({
+                'id': enrollment.id,
+                'user_id': enrollment.user_id,
+                'user_name': user_name,
+                'course_id': enrollment.course_id,
+                'progress': enrollment.progress,
+                'status': enrollment.status,
+                'updated_at': enrollment.updated_at.isoformat() if enrollment.updated_at else None
+            })
+
+        return jsonify({
+            'data': result,
+            'pagination': {
+                'current_page': page,
+                'total_pages': (total_count + limit - 1) // limit,
+                'total_count': total_count,
+                'per_page': limit
+            }
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@training_bp.route('/courses/<course_id>/summary', methods=['GET'])
+def get_course_summary(course_id):
+    try:
+        Course.query.get_or_404(course_id)
+        return jsonify(training_service.course_summary(course_id)), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@training_bp.route('/enrollments/progress', methods=['PUT'])
+def upsert_progress():
+    """
+    Upsert progress for many learners in one transaction
+    Body: {"updates": [{"user_id", "course_id", "progress", "status"?}, ...]}
+    Progress is a percentage from 0 to 100
+    """
+    try:
+        data = request.get_json()
+
+        updates = data.get('updates')
+        if not isinstance(updates, list):
+            return jsonify({'error': 'updates must be a list'}), 400
+
+        for item in updates:
+            if not all(key in item for key in ('user_id', 'course_id', 'progress')):
+                return jsonify({'error': 'Each update requires user_id, course_id and progress'}), 400
+
+        result = training_service.upsert_progress(updates)
+
+        return jsonify({'message': 'Progress updated successfully', **result}), 200
+
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
@@ -1,6 +1,9 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from app import db
 from models import User, Role, Notification, PerformanceReview
+from services.purge_service import purge_service
+from services.review_analytics_service import review_analytics_service
+from services.hierarchy_service import hierarchy_service
 
 user_bp = Blueprint('users', __name__)
 
@@ -22,10 +25,14 @@ def create_user():
         if existing_user:
             return jsonify({'error': 'Email already exists'}), 400
         
+        if data.get('manager_id') and not User.query.get(data['manager_id']):
+            return jsonify({'error': 'Manager not found'}), 404
+        
         user = User(
             name=data['name'],
             email=data['email'],
             role_id=data['role_id'],
+            manager_id=data.get('manager_id'),
             status=data.get('status', 'active')
         )
         
@@ -58,6 +65,15 @@ def update_user(user_id):
         user.role_id = data.get('role_id', user.role_id)
         user.status = data.get('status', user.status)
         
+        if 'manager_id' in data and data['manager_id'] != user.manager_id:
+            manager_id = data['manager_id']
+            if manager_id:
+                if not User.query.get(manager_id):
+                    return jsonify({'error': 'Manager not found'}), 404
+                if hierarchy_service.would_create_cycle(user.id, manager_id):
+                    return jsonify({'error': 'Manager cannot be the user or one of their reports'}), 400
+            user.manager_id = manager_id
+        
         db.session.commit()
         
         return jsonify({'message': 'User updated successfully', 'user': user.to_dict()}), 200
@@ -69,16 +85,50 @@ def update_user(user_id):
 @user_bp.route('/<user_id>', methods=['DELETE'])
 def delete_user(user_id):
     try:
-        user = User.query.get_or_404(user_id)
-        db.session.delete(user)
-        db.session.commit()
+        User.query.get_or_404(user_id)
+        
+        # Large histories can be purged in the background in committed batches
+        if request.args.get('async', 'false').lower() == 'true':
+            job_id = purge_service.purge_user_async(current_app._get_current_object(), user_id)
+            return jsonify({
+                'message': 'User deletion started',
+                'job_id': job_id,
+                'status_url': f'/api/users/purge-jobs/{job_id}'
+            }), 202
         
-        return jsonify({'message': 'User deleted successfully'}), 200
+        deleted = purge_service.purge_user(user_id)
+        
+        return jsonify({'message': 'User deleted successfully', 'deleted': deleted}), 200
     
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@user_bp.route('/purge-jobs/<job_id>', methods=['GET'])
+def get_purge_job(job_id):
+    try:
+        job = purge_service.get_job_status(job_id)
+        if not job:
+            return jsonify({'error': 'Purge job not found'}), 404
+        return jsonify(job), 200
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@user_bp.route('/<user_id>/reports', methods=['GET'])
+def get_user_reports(user_id):
+    """
+    Get the people reporting to a manager
+    Query params: transitive (default false)
+    """
+    try:
+        transitive = request.args.get('transitive', 'false').lower() == 'true'
+        users = User.query.filter(User.id.in_(hierarchy_service.report_ids(user_id, transitive))).order_by(User.name).all()
+        return jsonify([user.to_dict() for user in users]), 200
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @user_bp.route('/<user_id>/notifications', methods=['GET'])
 def get_user_notifications(user_id):
     try:
@@ -152,3 +202,66 @@ def create_performance_review(user_id):
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
+
+@user_bp.route('/<user_id>/performance-reviews/analytics', methods=['GET'])
+def get_user_performance_review_analytics(user_id):
+    """
+    Rating trend of one employee by quarter
+    Query params: group_by (type|reviewer), start_date, end_date
+    """
+    try:
+        group_by = request.args.get('group_by', 'type')
+        if group_by == 'employee':
+            return jsonify({'error': 'group_by must be type or reviewer'}), 400
+        
+        stats = review_analytics_service.rating_stats(
+            group_by,
+            employee_id=user_id,
+            start_date=request.args.get('start_date'),
+            end_date=request.args.get('end_date')
+        )
+        return jsonify({'employee_id': user_id, 'group_by': group_by, 'data': stats}), 200
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@user_bp.route('/performance-reviews/analytics', methods=['GET'])
+def get_performance_review_analytics():
+    """
+    Average, min and max rating per employee, reviewer or review type by quarter
+    Query params: group_by (employee|reviewer|type), employee_id, reviewer_id, type,
+    start_date, end_date, cached
+    """
+    try:
+        group_by = request.args.get('group_by', 'employee')
+        
+        # Company-wide views can be served from the materialized summary
+        if request.args.get('cached', 'false').lower() == 'true':
+            stats = review_analytics_service.cached_stats(group_by)
+        else:
+            stats = review_analytics_service.rating_stats(
+                group_by,
+                employee_id=request.args.get('employee_id'),
+                reviewer_id=request.args.get('reviewer_id'),
+                review_type=request.args.get('type'),
+                start_date=request.args.get('start_date'),
+                end_date=request.args.get('end_date')
+            )
+        return jsonify({'group_by': group_by, 'data': stats}), 200
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@user_bp.route('/performance-reviews/analytics/refresh', methods=['POST'])
+def refresh_performance_review_analytics():
+    try:
+        result = review_analytics_service.refresh_summary()
+        return jsonify({'message': 'Performance review analytics refreshed', **result}), 200
+    
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
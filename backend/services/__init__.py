@@ -0,0 +1,7 @@
+from .purge_service import PurgeService, purge_service
+from .review_analytics_service import ReviewAnalyticsService, review_analytics_service
+from .training_service import TrainingService, training_service
+from .interview_service import InterviewService, SchedulingConflict, interview_service
+from .hierarchy_service import HierarchyService, hierarchy_service
+from .indexing_worker import IndexingWorkerPool, QueueFullError, indexing_worker_pool
+from .match_matrix_service import MatchMatrixService, match_matrix_service
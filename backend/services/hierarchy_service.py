@@ -0,0 +1,44 @@
+from app import db
+from models import User
+
+
+class HierarchyService:
+    """
+    Reporting hierarchy queries resolved in the database with a recursive CTE
+    over the indexed users.manager_id column.
+    """
+
+    def reports_cte(self, manager_id: str, transitive: bool = True):
+        """
+        CTE with a single id column holding the direct or transitive reports of a manager
+        """
+        reports = db.session.query(User.id).filter(User.manager_id == manager_id)
+        if not transitive:
+            return reports.cte(name='report_tree')
+
+        reports = reports.cte(name='report_tree', recursive=True)
+        # UNION instead of UNION ALL so a cycle in bad data cannot recurse forever
+        return reports.union(
+            db.session.query(User.id).join(reports, User.manager_id == reports.c.id)
+        )
+
+    def report_ids(self, manager_id: str, transitive: bool = True):
+        """
+        Subquery of report ids, usable with in_()
+        """
+        return db.session.query(self.reports_cte(manager_id, transitive).c.id)
+
+    def would_create_cycle(self, user_id: str, manager_id: str):
+        """
+        True if making manager_id the manager of user_id would close a loop
+        """
+        if manager_id == user_id:
+            return True
+        reports = self.reports_cte(user_id)
+        return db.session.query(
+            db.session.query(reports.c.id).filter(reports.c.id == manager_id).exists()
+        ).scalar()
+
+
+# Create singleton instance
+hierarchy_service = HierarchyService()
@@ -0,0 +1,242 @@
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+from app import db
+from models import IndexingJob, Resume
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class IndexingWorkerPool:
+    """
+    Thread pool that runs embedding/indexing jobs off the request path.
+    Jobs wait in a bounded queue; when it is full submit() raises QueueFullError
+    so callers can push back instead of piling up work. Job status lives in the
+    indexing_jobs table, so any process can report it.
+
+    Jobs still queued after a restart, or left running longer than
+    stale_after seconds, are picked up again when the pool starts. A worker
+    claims a job with a conditional UPDATE, so a job enqueued by several
+    processes runs once.
+    """
+
+    def __init__(self, num_workers: int = 2, max_queue_size: int = 100,
+                 max_attempts: int = 3, retry_backoff: float = 2.0, stale_after: float = 900):
+        self.num_workers = num_workers
+        self.max_queue_size = max_queue_size
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.stale_after = stale_after
+
+        self._handlers = {}
+        self._queue = None
+        self._threads = []
+        self._app = None
+        self._lock = threading.Lock()
+        self._running = 0
+
+    def register(self, kind: str, handler):
+        """
+        Register handler(payload) -> result for a job kind
+        """
+        self._handlers[kind] = handler
+
+    def start(self, app):
+        with self._lock:
+            # threads do not survive a fork, e.g. gunicorn --preload, so a forked worker starts its own
+            if any(thread.is_alive() for thread in self._threads):
+                return
+            self._threads = []
+            self._app = app
+            self.num_workers = app.config.get('INDEXING_WORKERS', self.num_workers)
+            self.max_queue_size = app.config.get('INDEXING_QUEUE_SIZE', self.max_queue_size)
+            self._queue = queue.Queue(maxsize=self.max_queue_size)
+            for i in range(self.num_workers):
+                thread = threading.Thread(target=self._worker_loop, name=f'indexing-worker-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        self.recover()
+
+    def recover(self):
+        """
+        Re-enqueue jobs a previous process left queued, retrying or running.
+        Returns the number of enqueued jobs; jobs that do not fit in the queue
+        stay queued for the next recovery.
+        """
+        with self._app.app_context():
+            if not db.inspect(db.engine).has_table(IndexingJob.__tablename__):
+                # database not created yet, nothing to recover
+                return 0
+
+            cutoff = datetime.utcnow() - timedelta(seconds=self.stale_after)
+            IndexingJob.query.filter(
+                IndexingJob.status == 'running', IndexingJob.started_at < cutoff
+            ).update({IndexingJob.status: 'queued'}, synchronize_session=False)
+            db.session.commit()
+
+            job_ids = [row[0] for row in db.session.query(IndexingJob.id).filter(
+                IndexingJob.status.in_(('queued', 'retrying')),
+                IndexingJob.kind.in_(list(self._handlers))
+            ).order_by(IndexingJob.created_at).limit(self.max_queue_size).all()]
+            db.session.remove()
+
+        recovered = 0
+        for job_id in job_ids:
+            try:
+                self._queue.put_nowait(job_id)
+            except queue.Full:
+                break
+            recovered += 1
+        return recovered
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def submit(self, app, kind: str, payload: dict) -> str:
+        """
+        Record a job and enqueue it. Returns the job id.
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown indexing job kind: {kind}")
+
+        self.start(app)
+        if self._queue.full():
+            raise QueueFullError('Indexing queue is full, retry later')
+
+        job = IndexingJob(kind=kind, status='queued')
+        job.set_payload(payload)
+        db.session.add(job)
+        db.session.commit()
+
+        try:
+            self._queue.put_nowait(job.id)
+        except queue.Full:
+            job.status = 'rejected'
+            job.error = 'Indexing queue is full'
+            job.finished_at = datetime.utcnow()
+            db.session.commit()
+            raise QueueFullError('Indexing queue is full, retry later')
+
+        return job.id
+
+    def _requeue(self, job_id):
+        try:
+            self._queue.put(job_id, timeout=self.retry_backoff * 10)
+        except queue.Full:
+            with self._app.app_context():
+                job = db.session.get(IndexingJob, job_id)
+                job.status = 'failed'
+                job.error = f'{job.error} (retry dropped, queue full)'
+                job.finished_at = datetime.utcnow()
+                db.session.commit()
+                db.session.remove()
+
+    def _worker_loop(self):
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                return
+            with self._lock:
+                self._running += 1
+            try:
+                with self._app.app_context():
+                    self._run(job_id)
+                    db.session.remove()
+            finally:
+                with self._lock:
+                    self._running -= 1
+                self._queue.task_done()
+
+    def _run(self, job_id):
+        # claim the job, another worker or process may have run it already
+        claimed = IndexingJob.query.filter(
+            IndexingJob.id == job_id, IndexingJob.status.in_(('queued', 'retrying'))
+        ).update({
+            IndexingJob.status: 'running',
+            IndexingJob.attempts: db.func.coalesce(IndexingJob.attempts, 0) + 1,
+            IndexingJob.started_at: datetime.utcnow()
+        }, synchronize_session=False)
+        db.session.commit()
+        if not claimed:
+            return
+
+        job = db.session.get(IndexingJob, job_id)
+        payload = job.get_payload()
+
+        try:
+            result = self._handlers[job.kind](payload)
+        except Exception as e:
+            db.session.rollback()
+            job = db.session.get(IndexingJob, job_id)
+            job.error = str(e)
+            if job.attempts < self.max_attempts:
+                job.status = 'retrying'
+                db.session.commit()
+                # exponential backoff without holding a worker thread
+                delay = self.retry_backoff * (2 ** (job.attempts - 1))
+                timer = threading.Timer(delay, self._requeue, args=(job_id,))
+                timer.daemon = True
+                timer.start()
+            else:
+                job.status = 'failed'
+                job.finished_at = datetime.utcnow()
+                db.session.commit()
+            return
+
+        job.status = 'completed'
+        job.error = None
+        job.set_result(result)
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+
+    def wait_idle(self, timeout: float = None):
+        """
+        Block until the queue is drained, for scripts and tests
+        """
+        deadline = time.monotonic() + timeout if timeout else None
+        while self._queue is not None and (self._queue.unfinished_tasks or self._running):
+            if deadline and time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stats(self):
+        return {
+            'workers': len(self._threads),
+            'running': self._running,
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'max_queue_size': self.max_queue_size,
+            'max_attempts': self.max_attempts
+        }
+
+
+def index_resume(payload):
+    """
+    Parse, embed and index an uploaded resume, then store the parsed data
+    """
+    from genai.services.resume_service import ResumeService
+
+    result = ResumeService(payload['file_path'], payload['user_id'], payload['resume_id']).preprocess_resume(
+        payload.get('model_name', 'gemini')
+    )
+
+    resume = db.session.get(Resume, payload['resume_id'])
+    if resume is not None:
+        resume.set_parsed_data(result['parsed_data'])
+        db.session.commit()
+
+    return {'resume_id': payload['resume_id'], 'jobs': result['jobs']}
+
+
+# Create singleton instance
+indexing_worker_pool = IndexingWorkerPool()
+indexing_worker_pool.register('resume', index_resume)
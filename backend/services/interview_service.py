@@ -0,0 +1,166 @@
+from datetime import datetime, timedelta
+from app import db
+from models import Interview
+
+
+class SchedulingConflict(Exception):
+    def __init__(self, conflicts):
+        super().__init__('Interviewer is not available in the requested time range')
+        self.conflicts = conflicts
+
+
+class InterviewService:
+    """
+    Interview scheduling with interval-overlap checks done in SQL.
+    Every interview stores its end time so overlaps are a range predicate
+    on the (interviewer_id, scheduled_at) index. Rows written before ends_at
+    existed are matched on their duration until backfill_end_times runs.
+    """
+
+    # Upper bound on interview length, lets the overlap query scan a bounded index range
+    MAX_DURATION_MINS = 8 * 60
+
+    def _busy_query(self, interviewer_ids, start: datetime, end: datetime, exclude_id=None):
+        query = Interview.query.filter(
+            Interview.interviewer_id.in_(interviewer_ids),
+            Interview.status != 'cancelled',
+            Interview.scheduled_at > start - timedelta(minutes=self.MAX_DURATION_MINS),
+            Interview.scheduled_at < end,
+            db.or_(Interview.ends_at > start, Interview.ends_at.is_(None))
+        )
+        if exclude_id:
+            query = query.filter(Interview.id != exclude_id)
+        return query
+
+    @staticmethod
+    def _end_of(scheduled_at, ends_at, duration_mins):
+        return ends_at or scheduled_at + timedelta(minutes=duration_mins or 60)
+
+    def find_conflicts(self, interviewer_id: str, start: datetime, end: datetime, exclude_id=None):
+        interviews = self._busy_query([interviewer_id], start, end, exclude_id).order_by(Interview.scheduled_at).all()
+        return [
+            interview for interview in interviews
+            if self._end_of(interview.scheduled_at, interview.ends_at, interview.duration_mins) > start
+        ]
+
+    def backfill_end_times(self, batch_size: int = 1000):
+        """
+        Set ends_at on interviews stored before the column existed.
+        Returns the number of updated rows.
+        """
+        total = 0
+        while True:
+            rows = db.session.query(Interview.id, Interview.scheduled_at, Interview.duration_mins).filter(
+                Interview.ends_at.is_(None), Interview.scheduled_at.isnot(None)
+            ).limit(batch_size).all()
+            if not rows:
+                return total
+            db.session.execute(db.update(Interview), [
+                {'id': row.id, 'ends_at': self._end_of(row.scheduled_at, None, row.duration_mins)} for row in rows
+            ])
+            db.session.commit()
+            total += len(rows)
+
+    def _validate_duration(self, duration_mins):
+        duration_mins = int(duration_mins)
+        if duration_mins <= 0 or duration_mins > self.MAX_DURATION_MINS:
+            raise ValueError(f"duration_mins must be between 1 and {self.MAX_DURATION_MINS}")
+        return duration_mins
+
+    def schedule(self, application_id: str, interviewer_id: str, scheduled_at: datetime, duration_mins=60):
+        """
+        Create an interview if the interviewer is free, else raise SchedulingConflict
+        """
+        duration_mins = self._validate_duration(duration_mins)
+        ends_at = scheduled_at + timedelta(minutes=duration_mins)
+
+        conflicts = self.find_conflicts(interviewer_id, scheduled_at, ends_at)
+        if conflicts:
+            raise SchedulingConflict(conflicts)
+
+        interview = Interview(
+            application_id=application_id,
+            interviewer_id=interviewer_id,
+            scheduled_at=scheduled_at,
+            duration_mins=duration_mins,
+            ends_at=ends_at
+        )
+        db.session.add(interview)
+        db.session.commit()
+        return interview
+
+    def reschedule(self, interview: Interview, scheduled_at: datetime, duration_mins=None):
+        duration_mins = self._validate_duration(duration_mins or interview.duration_mins or 60)
+        ends_at = scheduled_at + timedelta(minutes=duration_mins)
+
+        conflicts = self.find_conflicts(interview.interviewer_id, scheduled_at, ends_at, exclude_id=interview.id)
+        if conflicts:
+            raise SchedulingConflict(conflicts)
+
+        interview.scheduled_at = scheduled_at
+        interview.duration_mins = duration_mins
+        interview.ends_at = ends_at
+        db.session.commit()
+        return interview
+
+    @staticmethod
+    def _merge(intervals):
+        merged = []
+        for start, end in intervals:
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        return merged
+
+    @staticmethod
+    def _working_windows(start: datetime, end: datetime, work_start_hour: int, work_end_hour: int):
+        day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        while day < end:
+            window_start = max(start, day + timedelta(hours=work_start_hour))
+            window_end = min(end, day + timedelta(hours=work_end_hour))
+            if window_start < window_end:
+                yield window_start, window_end
+            day += timedelta(days=1)
+
+    def free_slots(self, interviewer_ids: list, start: datetime, end: datetime, duration_mins=60,
+                   work_start_hour=9, work_end_hour=17):
+        """
+        Time windows of at least duration_mins where every interviewer of the
+        panel is free. Busy intervals of the whole panel are fetched with one
+        query ordered by start time and swept once against the working hours.
+        """
+        duration = timedelta(minutes=self._validate_duration(duration_mins))
+        if not 0 <= work_start_hour < work_end_hour <= 24:
+            raise ValueError("Working hours must satisfy 0 <= work_start_hour < work_end_hour <= 24")
+
+        rows = self._busy_query(interviewer_ids, start, end).with_entities(
+            Interview.scheduled_at, Interview.ends_at, Interview.duration_mins
+        ).order_by(Interview.scheduled_at).all()
+        busy = self._merge([
+            (scheduled_at, self._end_of(scheduled_at, ends_at, duration_mins))
+            for scheduled_at, ends_at, duration_mins in rows
+        ])
+
+        slots = []
+        index = 0
+        for window_start, window_end in self._working_windows(start, end, work_start_hour, work_end_hour):
+            # Busy intervals are sorted, skip the ones that ended before this window
+            while index < len(busy) and busy[index][1] <= window_start:
+                index += 1
+
+            cursor = window_start
+            position = index
+            while position < len(busy) and busy[position][0] < window_end:
+                if busy[position][0] - cursor >= duration:
+                    slots.append((cursor, busy[position][0]))
+                cursor = max(cursor, busy[position][1])
+                position += 1
+            if window_end - cursor >= duration:
+                slots.append((cursor, window_end))
+
+        return [{'start': slot_start.isoformat(), 'end': slot_end.isoformat()} for slot_start, slot_end in slots]
+
+
+# Create singleton instance
+interview_service = InterviewService()
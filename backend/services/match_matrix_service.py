@@ -0,0 +1,224 @@
+import time
+from datetime import datetime
+import numpy as np
+from app import db
+from models import JobResumeMatch, ResumeJobMatch, MatchSource
+from database.vector_db import chroma_db_service
+
+
+class MatchMatrixService:
+    """
+    Precomputes the best resumes for every open job and the best jobs for
+    every active resume from the stored embeddings, so the recruiter views
+    read a table instead of running a vector search per request.
+
+    Similarities are cosine scores from blocked matrix products. A refresh
+    only recomputes rows whose own embedding changed or whose stored top-k
+    contains a changed or removed document; other rows are merged with the
+    scores of the changed documents alone.
+    """
+
+    JOB_COLLECTION = 'job_post'
+    RESUME_COLLECTION = 'resume'
+
+    def __init__(self, vector_db=None, k: int = 20, block_size: int = 1024,
+                 job_where=None, resume_where=None):
+        self.vector_db = vector_db or chroma_db_service
+        self.k = k
+        self.block_size = block_size
+        self.job_where = job_where or {'status': 'active'}
+        self.resume_where = resume_where or {'status': 'active'}
+
+    def _load(self, collection_name, where, page_size=5000):
+        """
+        Ids, L2-normalized embedding matrix and fingerprints of the matching documents
+        """
+        collection = self.vector_db.get_collection(collection_name)
+        ids, vectors, fingerprints = [], [], {}
+        offset = 0
+        while True:
+            result = collection.get(where=where, include=['embeddings', 'metadatas'], limit=page_size, offset=offset)
+            for doc_id, embedding, metadata in zip(result['ids'], result['embeddings'], result['metadatas']):
+                ids.append(doc_id)
+                vectors.append(embedding)
+                fingerprints[doc_id] = (metadata or {}).get(self.vector_db.FINGERPRINT_KEY) or ''
+            if len(result['ids']) < page_size:
+                break
+            offset += page_size
+
+        if not ids:
+            return ids, np.zeros((0, 0), dtype=np.float32), fingerprints
+
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return ids, matrix / norms, fingerprints
+
+    def top_k(self, rows, cols, k):
+        """
+        Indices and scores of the k best columns for every row, computed in
+        row x column blocks so memory stays at block_size^2 scores
+        """
+        k = min(k, len(cols))
+        best_idx = np.zeros((len(rows), k), dtype=np.int64)
+        best_scores = np.full((len(rows), k), -np.inf, dtype=np.float32)
+        if not k:
+            return best_idx, best_scores
+
+        for r in range(0, len(rows), self.block_size):
+            row_block = rows[r:r + self.block_size]
+            idx = np.zeros((len(row_block), 0), dtype=np.int64)
+            scores = np.zeros((len(row_block), 0), dtype=np.float32)
+
+            for c in range(0, len(cols), self.block_size):
+                block_scores = row_block @ cols[c:c + self.block_size].T
+                take = min(k, block_scores.shape[1])
+                part = np.argpartition(-block_scores, take - 1, axis=1)[:, :take]
+                # keep a running top-k across column blocks
+                scores = np.hstack([scores, np.take_along_axis(block_scores, part, axis=1)])
+                idx = np.hstack([idx, part + c])
+                if scores.shape[1] > k:
+                    keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                    scores = np.take_along_axis(scores, keep, axis=1)
+                    idx = np.take_along_axis(idx, keep, axis=1)
+
+            order = np.argsort(-scores, axis=1)
+            best_idx[r:r + len(row_block)] = np.take_along_axis(idx, order, axis=1)
+            best_scores[r:r + len(row_block)] = np.take_along_axis(scores, order, axis=1)
+        return best_idx, best_scores
+
+    def _refresh_side(self, model, row_column, col_column, row_ids, row_matrix, col_ids, col_matrix,
+                      changed_rows, removed_rows, changed_cols, removed_cols, now):
+        """
+        Bring one match table (rows -> top-k cols) up to date. Returns the number of rewritten rows.
+        """
+        model.query.filter(row_column.in_(list(removed_rows))).delete(synchronize_session=False)
+
+        stale_cols = list(changed_cols | removed_cols)
+        full_rows = set(changed_rows)
+        if stale_cols:
+            # a changed column may have dropped out of a stored top-k, so those rows start over
+            for start in range(0, len(stale_cols), 500):
+                full_rows.update(row_id for (row_id,) in db.session.query(row_column).filter(
+                    col_column.in_(stale_cols[start:start + 500])
+                ).distinct())
+        full_rows &= set(row_ids)
+
+        row_index = {row_id: i for i, row_id in enumerate(row_ids)}
+        col_index = {col_id: i for i, col_id in enumerate(col_ids)}
+        results = {}
+
+        full = sorted(full_rows, key=row_index.get)
+        if full and col_ids:
+            idx, scores = self.top_k(row_matrix[[row_index[row_id] for row_id in full]], col_matrix, self.k)
+            for row_id, row_idx, row_scores in zip(full, idx, scores):
+                results[row_id] = [(col_ids[i], float(score)) for i, score in zip(row_idx, row_scores)]
+
+        new_cols = [col_id for col_id in changed_cols if col_id in col_index]
+        merge = [row_id for row_id in row_ids if row_id not in full_rows]
+        if merge and new_cols:
+            idx, scores = self.top_k(row_matrix[[row_index[row_id] for row_id in merge]],
+                                     col_matrix[[col_index[col_id] for col_id in new_cols]], self.k)
+            stored = {}
+            for start in range(0, len(merge), 500):
+                for match in model.query.filter(row_column.in_(merge[start:start + 500])):
+                    stored.setdefault(getattr(match, row_column.key), []).append(
+                        (getattr(match, col_column.key), match.score)
+                    )
+            for row_id, row_idx, row_scores in zip(merge, idx, scores):
+                candidates = stored.get(row_id, []) + [(new_cols[i], float(score)) for i, score in zip(row_idx, row_scores)]
+                results[row_id] = sorted(candidates, key=lambda item: item[1], reverse=True)[:self.k]
+
+        rewritten = list(results)
+        for start in range(0, len(rewritten), 500):
+            model.query.filter(row_column.in_(rewritten[start:start + 500])).delete(synchronize_session=False)
+
+        rows = [
+            {row_column.key: row_id, col_column.key: col_id, 'rank': rank, 'score': score, 'computed_at': now}
+            for row_id, matches in results.items()
+            for rank, (col_id, score) in enumerate(matches, start=1)
+        ]
+        if rows:
+            db.session.execute(model.__table__.insert(), rows)
+        return len(rewritten)
+
+    def refresh(self, full: bool = False):
+        """
+        Recompute the match tables from the current embeddings.
+        full=True ignores the stored fingerprints and rebuilds everything.
+        """
+        timings = {}
+        started = time.perf_counter()
+        now = datetime.utcnow()
+
+        t0 = time.perf_counter()
+        job_ids, job_matrix, job_fps = self._load(self.JOB_COLLECTION, self.job_where)
+        resume_ids, resume_matrix, resume_fps = self._load(self.RESUME_COLLECTION, self.resume_where)
+        timings['load_seconds'] = time.perf_counter() - t0
+
+        previous = {'job': {}, 'resume': {}}
+        for source in MatchSource.query.all():
+            previous.setdefault(source.kind, {})[source.entity_id] = source.fingerprint
+
+        if full:
+            JobResumeMatch.query.delete(synchronize_session=False)
+            ResumeJobMatch.query.delete(synchronize_session=False)
+            previous = {'job': {}, 'resume': {}}
+
+        changed_jobs = {job_id for job_id, fp in job_fps.items() if previous['job'].get(job_id) != fp}
+        removed_jobs = set(previous['job']) - set(job_fps)
+        changed_resumes = {resume_id for resume_id, fp in resume_fps.items() if previous['resume'].get(resume_id) != fp}
+        removed_resumes = set(previous['resume']) - set(resume_fps)
+
+        t0 = time.perf_counter()
+        jobs_rewritten = self._refresh_side(
+            JobResumeMatch, JobResumeMatch.job_id, JobResumeMatch.resume_id,
+            job_ids, job_matrix, resume_ids, resume_matrix,
+            changed_jobs, removed_jobs, changed_resumes, removed_resumes, now
+        )
+        timings['job_matches_seconds'] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        resumes_rewritten = self._refresh_side(
+            ResumeJobMatch, ResumeJobMatch.resume_id, ResumeJobMatch.job_id,
+            resume_ids, resume_matrix, job_ids, job_matrix,
+            changed_resumes, removed_resumes, changed_jobs, removed_jobs, now
+        )
+        timings['resume_matches_seconds'] = time.perf_counter() - t0
+
+        for kind, removed in (('job', removed_jobs), ('resume', removed_resumes)):
+            removed = list(removed)
+            for start in range(0, len(removed), 500):
+                MatchSource.query.filter(
+                    MatchSource.kind == kind, MatchSource.entity_id.in_(removed[start:start + 500])
+                ).delete(synchronize_session=False)
+        for kind, changed, fps in (('job', changed_jobs, job_fps), ('resume', changed_resumes, resume_fps)):
+            for entity_id in changed:
+                db.session.merge(MatchSource(kind=kind, entity_id=entity_id, fingerprint=fps[entity_id], refreshed_at=now))
+
+        db.session.commit()
+        timings['total_seconds'] = time.perf_counter() - started
+
+        return {
+            'jobs': len(job_ids),
+            'resumes': len(resume_ids),
+            'changed_jobs': len(changed_jobs),
+            'changed_resumes': len(changed_resumes),
+            'removed_jobs': len(removed_jobs),
+            'removed_resumes': len(removed_resumes),
+            'job_rows_rewritten': jobs_rewritten,
+            'resume_rows_rewritten': resumes_rewritten,
+            'timings': timings
+        }
+
+    def top_candidates(self, job_id: str, limit: int = None):
+        query = JobResumeMatch.query.filter(JobResumeMatch.job_id == job_id).order_by(JobResumeMatch.rank)
+        return query.limit(limit).all() if limit else query.all()
+
+    def top_jobs(self, resume_id: str, limit: int = None):
+        query = ResumeJobMatch.query.filter(ResumeJobMatch.resume_id == resume_id).order_by(ResumeJobMatch.rank)
+        return query.limit(limit).all() if limit else query.all()
+
+
+# Create singleton instance
+match_matrix_service = MatchMatrixService()
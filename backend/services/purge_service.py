@@ -0,0 +1,179 @@
+import threading
+import uuid
+from datetime import datetime
+from app import db
+from models import (
+    User, JobPost, Resume, Application, Interview, Enrollment,
+    Report, EODReport, ExpenseReport, PerformanceReview, Notification, AuditLog,
+    JobResumeMatch, ResumeJobMatch
+)
+
+
+class PurgeService:
+    """
+    Set-based deletion of users and job posts together with their dependents.
+    Dependents are removed with bulk DELETE statements in foreign key order,
+    so nothing is loaded into the session.
+    """
+
+    def __init__(self, batch_size: int = 1000):
+        self.batch_size = batch_size
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def _delete_where(self, model, criterion, batched=False):
+        """
+        Delete all rows of model matching criterion.
+        In batched mode rows are deleted batch_size at a time and each batch is
+        committed, keeping transactions and locks short. Batches are selected
+        by primary key, composite keys included (the match tables).
+        """
+        if not batched:
+            return model.query.filter(criterion).delete(synchronize_session=False)
+
+        key_columns = model.__mapper__.primary_key
+        total = 0
+        while True:
+            keys = [tuple(row) for row in db.session.query(*key_columns).filter(criterion).limit(self.batch_size).all()]
+            if not keys:
+                return total
+            total += model.query.filter(db.tuple_(*key_columns).in_(keys)).delete(synchronize_session=False)
+            db.session.commit()
+
+    def _user_steps(self, user_id):
+        job_ids = db.session.query(JobPost.id).filter(JobPost.posted_by_id == user_id)
+        resume_ids = db.session.query(Resume.id).filter(Resume.owner_id == user_id)
+        application_ids = db.session.query(Application.id).filter(
+            db.or_(
+                Application.candidate_id == user_id,
+                Application.job_id.in_(job_ids),
+                Application.resume_id.in_(resume_ids)
+            )
+        )
+        report_ids = db.session.query(Report.id).filter(Report.user_id == user_id)
+
+        return [
+            ('interviews', Interview, db.or_(
+                Interview.interviewer_id == user_id,
+                Interview.application_id.in_(application_ids)
+            )),
+            ('applications', Application, Application.id.in_(application_ids)),
+            # only the purged side's own rows; rows on the other side that point at them
+            # are how the match refresh finds what to recompute
+            ('job_resume_matches', JobResumeMatch, JobResumeMatch.job_id.in_(job_ids)),
+            ('resume_job_matches', ResumeJobMatch, ResumeJobMatch.resume_id.in_(resume_ids)),
+            ('job_posts', JobPost, JobPost.posted_by_id == user_id),
+            ('resumes', Resume, Resume.owner_id == user_id),
+            ('enrollments', Enrollment, Enrollment.user_id == user_id),
+            ('eod_reports', EODReport, EODReport.report_id.in_(report_ids)),
+            ('expense_reports', ExpenseReport, ExpenseReport.report_id.in_(report_ids)),
+            ('reports', Report, Report.user_id == user_id),
+            ('performance_reviews', PerformanceReview, db.or_(
+                PerformanceReview.employee_id == user_id,
+                PerformanceReview.reviewer_id == user_id
+            )),
+            ('notifications', Notification, Notification.recipient_id == user_id),
+            ('audit_logs', AuditLog, AuditLog.actor_id == user_id),
+        ]
+
+    def _job_steps(self, job_id):
+        application_ids = db.session.query(Application.id).filter(Application.job_id == job_id)
+
+        return [
+            ('interviews', Interview, Interview.application_id.in_(application_ids)),
+            ('applications', Application, Application.job_id == job_id),
+            ('job_resume_matches', JobResumeMatch, JobResumeMatch.job_id == job_id),
+        ]
+
+    def _run_steps(self, steps, batched=False, progress=None):
+        counts = {}
+        for name, model, criterion in steps:
+            counts[name] = self._delete_where(model, criterion, batched=batched)
+            if progress is not None:
+                progress(name, counts[name])
+        return counts
+
+    def purge_user(self, user_id: str, batched: bool = False, progress=None):
+        """
+        Delete a user and everything that references it.
+        Reports the user approved are kept, with approved_by cleared, and
+        the user's direct reports move up to the user's own manager.
+        Returns the number of deleted rows per table.
+        """
+        counts = self._run_steps(self._user_steps(user_id), batched=batched, progress=progress)
+
+        manager_id = db.session.query(User.manager_id).filter(User.id == user_id).scalar()
+        User.query.filter(User.manager_id == user_id).update(
+            {User.manager_id: manager_id}, synchronize_session=False
+        )
+        Report.query.filter(Report.approved_by == user_id).update(
+            {Report.approved_by: None}, synchronize_session=False
+        )
+        counts['users'] = User.query.filter(User.id == user_id).delete(synchronize_session=False)
+        db.session.commit()
+        return counts
+
+    def purge_job(self, job_id: str):
+        """
+        Delete a job post with its applications and interviews.
+        Returns the number of deleted rows per table.
+        """
+        counts = self._run_steps(self._job_steps(job_id))
+        counts['job_posts'] = JobPost.query.filter(JobPost.id == job_id).delete(synchronize_session=False)
+        db.session.commit()
+        return counts
+
+    def purge_user_async(self, app, user_id: str):
+        """
+        Purge a user on a background thread in committed batches.
+        Returns a job id that can be polled with get_job_status.
+        """
+        job_id = str(uuid.uuid4())
+        with self._lock:
+            self._jobs[job_id] = {
+                'id': job_id,
+                'user_id': user_id,
+                'status': 'queued',
+                'deleted': {},
+                'error': None,
+                'created_at': datetime.utcnow().isoformat(),
+                'finished_at': None
+            }
+
+        thread = threading.Thread(target=self._run_async_purge, args=(app, job_id, user_id), daemon=True)
+        thread.start()
+        return job_id
+
+    def _run_async_purge(self, app, job_id, user_id):
+        job = self._jobs[job_id]
+
+        def progress(name, count):
+            with self._lock:
+                job['deleted'][name] = count
+
+        with app.app_context():
+            try:
+                with self._lock:
+                    job['status'] = 'running'
+                counts = self.purge_user(user_id, batched=True, progress=progress)
+                with self._lock:
+                    job['deleted'] = counts
+                    job['status'] = 'completed'
+            except Exception as e:
+                db.session.rollback()
+                with self._lock:
+                    job['status'] = 'failed'
+                    job['error'] = str(e)
+            finally:
+                with self._lock:
+                    job['finished_at'] = datetime.utcnow().isoformat()
+                db.session.remove()
+
+    def get_job_status(self, job_id: str):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job, deleted=dict(job['deleted'])) if job else None
+
+
+# Create singleton instance
+purge_service = PurgeService()
@@ -0,0 +1,126 @@
+from datetime import datetime
+from sqlalchemy import insert, literal, select
+from app import db
+from models import PerformanceReview, PerformanceReviewSummary, User
+
+
+class ReviewAnalyticsService:
+    """
+    Performance review rating statistics computed with SQL GROUP BY,
+    bucketed by calendar quarter.
+    """
+
+    DIMENSIONS = {
+        'employee': PerformanceReview.employee_id,
+        'reviewer': PerformanceReview.reviewer_id,
+        'type': PerformanceReview.type
+    }
+
+    @staticmethod
+    def _period_columns():
+        year = db.cast(db.extract('year', PerformanceReview.created_at), db.Integer)
+        month = db.cast(db.extract('month', PerformanceReview.created_at), db.Integer)
+        quarter = (month - 1) // 3 + 1
+        return year, quarter
+
+    def _aggregate(self, dimension: str):
+        if dimension not in self.DIMENSIONS:
+            raise ValueError(f"Unsupported dimension: {dimension}")
+
+        key = self.DIMENSIONS[dimension]
+        year, quarter = self._period_columns()
+        return select(
+            key.label('key'),
+            year.label('year'),
+            quarter.label('quarter'),
+            db.func.count(PerformanceReview.id).label('review_count'),
+            db.func.avg(PerformanceReview.rating).label('avg_rating'),
+            db.func.min(PerformanceReview.rating).label('min_rating'),
+            db.func.max(PerformanceReview.rating).label('max_rating')
+        ).group_by(key, year, quarter)
+
+    @staticmethod
+    def _format(rows, dimension):
+        names = {}
+        if dimension in ('employee', 'reviewer'):
+            keys = {row.key for row in rows}
+            if keys:
+                names = dict(db.session.query(User.id, User.name).filter(User.id.in_(keys)).all())
+
+        return [{
+            'key': row.key,
+            'name': names.get(row.key),
+            'year': row.year,
+            'quarter': row.quarter,
+            'period': f'{row.year}-Q{row.quarter}',
+            'review_count': row.review_count,
+            'avg_rating': float(row.avg_rating) if row.avg_rating is not None else None,
+            'min_rating': row.min_rating,
+            'max_rating': row.max_rating
+        } for row in rows]
+
+    def rating_stats(self, dimension: str, employee_id=None, reviewer_id=None, review_type=None,
+                     start_date=None, end_date=None):
+        """
+        Average, min and max rating grouped by dimension and quarter
+        """
+        query = self._aggregate(dimension)
+
+        if employee_id:
+            query = query.where(PerformanceReview.employee_id == employee_id)
+        if reviewer_id:
+            query = query.where(PerformanceReview.reviewer_id == reviewer_id)
+        if review_type:
+            query = query.where(PerformanceReview.type == review_type)
+        if start_date:
+            query = query.where(PerformanceReview.created_at >= start_date)
+        if end_date:
+            query = query.where(PerformanceReview.created_at <= end_date)
+
+        rows = db.session.execute(query.order_by('key', 'year', 'quarter')).all()
+        return self._format(rows, dimension)
+
+    def refresh_summary(self):
+        """
+        Rebuild the materialized company-wide stats with INSERT ... SELECT
+        """
+        refreshed_at = datetime.utcnow()
+        columns = ['dimension', 'key', 'year', 'quarter', 'review_count',
+                   'avg_rating', 'min_rating', 'max_rating', 'refreshed_at']
+
+        PerformanceReviewSummary.query.delete(synchronize_session=False)
+        for dimension in self.DIMENSIONS:
+            aggregate = self._aggregate(dimension).subquery()
+            db.session.execute(insert(PerformanceReviewSummary).from_select(columns, select(
+                literal(dimension),
+                aggregate.c.key,
+                aggregate.c.year,
+                aggregate.c.quarter,
+                aggregate.c.review_count,
+                aggregate.c.avg_rating,
+                aggregate.c.min_rating,
+                aggregate.c.max_rating,
+                literal(refreshed_at, db.DateTime)
+            )))
+        db.session.commit()
+
+        return {
+            'refreshed_at': refreshed_at.isoformat(),
+            'row_count': PerformanceReviewSummary.query.count()
+        }
+
+    def cached_stats(self, dimension: str):
+        """
+        Read stats from the materialized summary table
+        """
+        if dimension not in self.DIMENSIONS:
+            raise ValueError(f"Unsupported dimension: {dimension}")
+
+        rows = PerformanceReviewSummary.query.filter_by(dimension=dimension).order_by(
+            PerformanceReviewSummary.key, PerformanceReviewSummary.year, PerformanceReviewSummary.quarter
+        ).all()
+        return self._format(rows, dimension)
+
+
+# Create singleton instance
+review_analytics_service = ReviewAnalyticsService()
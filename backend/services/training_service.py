@@ -0,0 +1,152 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import bindparam, insert, update
+from app import db
+from models import Course, Enrollment, User
+
+
+class TrainingService:
+    """
+    Set-based enrollment and progress updates for the training subsystem.
+    Each call issues a fixed number of statements regardless of batch size
+    and is applied in a single transaction.
+    """
+
+    PROGRESS_COMPLETE = 100.0
+
+    @classmethod
+    def _status_for(cls, progress, status=None):
+        if status:
+            return status
+        if progress >= cls.PROGRESS_COMPLETE:
+            return 'completed'
+        if progress > 0:
+            return 'in_progress'
+        return 'enrolled'
+
+    def enroll_users(self, course_id: str, user_ids: list):
+        """
+        Enroll many users in a course, skipping users already enrolled
+        or unknown. Returns the enrolled and skipped user ids.
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return {'enrolled': [], 'skipped': []}
+
+        known = {row[0] for row in db.session.query(User.id).filter(User.id.in_(user_ids)).all()}
+        enrolled = {row[0] for row in db.session.query(Enrollment.user_id).filter(
+            Enrollment.course_id == course_id,
+            Enrollment.user_id.in_(user_ids)
+        ).all()}
+
+        new_ids = [user_id for user_id in user_ids if user_id in known and user_id not in enrolled]
+        if new_ids:
+            now = datetime.utcnow()
+            db.session.execute(insert(Enrollment), [{
+                'id': str(uuid.uuid4()),
+                'user_id': user_id,
+                'course_id': course_id,
+                'progress': 0.0,
+                'status': 'enrolled',
+                'updated_at': now
+            } for user_id in new_ids])
+        db.session.commit()
+
+        return {
+            'enrolled': new_ids,
+            'skipped': [user_id for user_id in user_ids if user_id not in new_ids]
+        }
+
+    def upsert_progress(self, updates: list):
+        """
+        Apply progress for many (user_id, course_id) pairs.
+        Existing enrollments are updated with one executemany UPDATE and
+        missing ones are inserted with one executemany INSERT.
+        """
+        rows = {}
+        for item in updates:
+            progress = float(item['progress'])
+            if progress < 0 or progress > self.PROGRESS_COMPLETE:
+                raise ValueError(f"Progress must be between 0 and {self.PROGRESS_COMPLETE:g}")
+            # Last update for a pair wins
+            rows[(item['user_id'], item['course_id'])] = {
+                'progress': progress,
+                'status': self._status_for(progress, item.get('status'))
+            }
+
+        if not rows:
+            return {'updated': 0, 'inserted': 0}
+
+        user_ids = {user_id for user_id, _ in rows}
+        course_ids = {course_id for _, course_id in rows}
+
+        unknown_courses = course_ids - {row[0] for row in db.session.query(Course.id).filter(Course.id.in_(course_ids)).all()}
+        unknown_users = user_ids - {row[0] for row in db.session.query(User.id).filter(User.id.in_(user_ids)).all()}
+        if unknown_courses or unknown_users:
+            raise ValueError(f"Unknown courses: {sorted(unknown_courses)}, unknown users: {sorted(unknown_users)}")
+
+        existing = set(db.session.query(Enrollment.user_id, Enrollment.course_id).filter(
+            Enrollment.course_id.in_(course_ids),
+            Enrollment.user_id.in_(user_ids)
+        ).all())
+
+        now = datetime.utcnow()
+        to_update = [{
+            'b_user_id': user_id,
+            'b_course_id': course_id,
+            'b_progress': values['progress'],
+            'b_status': values['status'],
+            'b_updated_at': now
+        } for (user_id, course_id), values in rows.items() if (user_id, course_id) in existing]
+        to_insert = [{
+            'id': str(uuid.uuid4()),
+            'user_id': user_id,
+            'course_id': course_id,
+            'progress': values['progress'],
+            'status': values['status'],
+            'updated_at': now
+        } for (user_id, course_id), values in rows.items() if (user_id, course_id) not in existing]
+
+        if to_update:
+            statement = update(Enrollment.__table__).where(
+                Enrollment.__table__.c.user_id == bindparam('b_user_id'),
+                Enrollment.__table__.c.course_id == bindparam('b_course_id')
+            ).values(
+                progress=bindparam('b_progress'),
+                status=bindparam('b_status'),
+                updated_at=bindparam('b_updated_at')
+            )
+            db.session.execute(statement, to_update)
+        if to_insert:
+            db.session.execute(insert(Enrollment), to_insert)
+        db.session.commit()
+
+        return {'updated': len(to_update), 'inserted': len(to_insert)}
+
+    def course_summary(self, course_id: str):
+        """
+        Completion summary for a course computed in SQL
+        """
+        totals = db.session.query(
+            db.func.count(Enrollment.id),
+            db.func.avg(Enrollment.progress),
+            db.func.sum(db.case((Enrollment.progress >= self.PROGRESS_COMPLETE, 1), else_=0))
+        ).filter(Enrollment.course_id == course_id).one()
+        by_status = db.session.query(Enrollment.status, db.func.count(Enrollment.id)).filter(
+            Enrollment.course_id == course_id
+        ).group_by(Enrollment.status).all()
+
+        enrolled_count, average_progress, completed_count = totals
+        completed_count = completed_count or 0
+        return {
+            'course_id': course_id,
+            'enrolled_count': enrolled_count,
+            'completed_count': completed_count,
+            'completion_rate': completed_count / enrolled_count if enrolled_count else 0.0,
+            'average_progress': float(average_progress) if average_progress is not None else 0.0,
+            'status_breakdown': {status: count for status, count in by_status}
+        }
+
+
+# Create singleton instance
+training_service = TrainingService()
@@ -0,0 +1,119 @@
+import json
+from app import db
+from models import JobPost, Resume, User
+from database.vector_db import chroma_db_service
+from utils.text_utility import TextUtility
+
+
+class VectorSyncService:
+    """
+    Incremental reconciliation of the job post and resume tables with their
+    Chroma collections. Rows are compared by id and content fingerprint, so a
+    sync only re-embeds rows whose text changed and deletes rows that are gone.
+
+    Resumes are only indexed from parsed_data, which older uploads never got.
+    Their vectors (embedded at upload or migrated from the per-resume
+    collections) are kept for as long as the Resume row exists.
+    """
+
+    JOB_POST_COLLECTION = 'job_post'
+    RESUME_COLLECTION = 'resume'
+
+    def __init__(self, vector_db=None):
+        self.vector_db = vector_db or chroma_db_service
+
+    @staticmethod
+    def _clean_metadata(metadata):
+        # chroma metadata values must be str, int, float or bool
+        return {key: value for key, value in metadata.items() if value is not None}
+
+    def job_post_documents(self):
+        rows = db.session.query(
+            JobPost.id, JobPost.title, JobPost.description, JobPost.requirements,
+            JobPost.status, JobPost.posted_by_id
+        ).all()
+
+        return {
+            row.id: (
+                TextUtility.format_job_post_text(row.title, row.description, row.requirements),
+                self._clean_metadata({
+                    'job_post_id': row.id,
+                    'title': row.title,
+                    'status': row.status,
+                    'posted_by_id': row.posted_by_id
+                })
+            )
+            for row in rows
+        }
+
+    def resume_documents(self):
+        rows = db.session.query(Resume.id, Resume.owner_id, Resume.parsed_data, User.status).join(
+            User, User.id == Resume.owner_id
+        ).filter(Resume.parsed_data.isnot(None)).all()
+
+        documents = {}
+        for row in rows:
+            try:
+                parsed_data = json.loads(row.parsed_data)
+                text = TextUtility.format_resume_text(parsed_data)
+            except (ValueError, KeyError, TypeError, AttributeError):
+                # parsed data that does not follow the resume schema is not indexed
+                continue
+            # location and status are stored so searches can filter on them in chroma
+            documents[row.id] = (text, self._clean_metadata({
+                'resume_id': row.id,
+                'user_id': row.owner_id,
+                'location': parsed_data.get('location') or None,
+                'status': row.status
+            }))
+        return documents
+
+    def sync_job_posts(self, delete_missing=True):
+        return self.vector_db.sync_collection(self.JOB_POST_COLLECTION, self.job_post_documents(), delete_missing)
+
+    @staticmethod
+    def stale_resume_ids(doc_ids, documents):
+        """
+        The doc ids, '<resume_id>' or chunk ids '<resume_id>#<n>', that may be deleted:
+        their Resume row is gone, or the resume was indexed from documents in this sync
+        """
+        resume_ids = {doc_id: doc_id.split('#', 1)[0] for doc_id in doc_ids}
+        unique = list(set(resume_ids.values()))
+        existing = set()
+        for start in range(0, len(unique), 500):
+            existing.update(row[0] for row in db.session.query(Resume.id).filter(
+                Resume.id.in_(unique[start:start + 500])
+            ))
+        return [doc_id for doc_id, resume_id in resume_ids.items()
+                if resume_id not in existing or resume_id in documents]
+
+    def sync_resumes(self, delete_missing=True):
+        documents = self.resume_documents()
+        return self.vector_db.sync_collection(
+            self.RESUME_COLLECTION, documents, delete_missing,
+            delete_filter=lambda doc_ids: self.stale_resume_ids(doc_ids, documents)
+        )
+
+    def sync_resume_chunks(self, delete_missing=True):
+        """
+        Index resumes chunk by chunk, so long resumes are not cut off by the
+        embedding model's input limit
+        """
+        documents = self.resume_documents()
+        return self.vector_db.sync_collection(
+            self.vector_db.chunk_collection_name(self.RESUME_COLLECTION),
+            self.vector_db.chunk_documents(documents),
+            delete_missing,
+            delete_filter=lambda doc_ids: self.stale_resume_ids(doc_ids, documents)
+        )
+
+    def sync_all(self, delete_missing=True):
+        return {
+            'job_post': self.sync_job_posts(delete_missing),
+            'resume': self.sync_resumes(delete_missing),
+            'resume_chunks': self.sync_resume_chunks(delete_missing)
+        }
+
+
+# Create singleton instance
+vector_sync_service = VectorSyncService()
@@ -0,0 +1,120 @@
+import unittest
+import json
+from app import create_app, db
+from models import User, Role, Report, ExpenseReport
+
+
+class HierarchyAPITestCase(unittest.TestCase):
+    """Test cases for the reporting hierarchy and manager approval inbox"""
+
+    def setUp(self):
+        """Set up test client and database"""
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            self._create_test_data()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _create_test_data(self):
+        """Create a director -> manager -> employee chain and an unrelated user"""
+        role = Role(name='Employee', description='Regular employee')
+        db.session.add(role)
+        db.session.flush()
+
+        director = User(name='Director', email='director@test.com', role_id=role.id)
+        db.session.add(director)
+        db.session.flush()
+
+        manager = User(name='Manager', email='manager@test.com', role_id=role.id, manager_id=director.id)
+        other = User(name='Other', email='other@test.com', role_id=role.id)
+        db.session.add_all([manager, other])
+        db.session.flush()
+
+        employee = User(name='Employee', email='employee@test.com', role_id=role.id, manager_id=manager.id)
+        db.session.add(employee)
+        db.session.commit()
+
+        self.director_id = director.id
+        self.manager_id = manager.id
+        self.employee_id = employee.id
+        self.other_id = other.id
+
+    def _create_expense(self, user_id, status='pending', amount=50.0):
+        report = Report(user_id=user_id, type='expense')
+        db.session.add(report)
+        db.session.flush()
+
+        expense = ExpenseReport(report_id=report.id, total=amount, status=status)
+        expense.set_items([{'category': 'Food', 'amount': amount, 'description': 'Test expense'}])
+        db.session.add(expense)
+        db.session.commit()
+        return expense.id
+
+    def _inbox(self, manager_id, query=''):
+        response = self.client.get(f'/api/expenses/inbox/{manager_id}{query}')
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.data)
+
+    def test_inbox_transitive_reports(self):
+        """Test the inbox holds only pending expenses of the manager's reporting tree"""
+        with self.app.app_context():
+            manager_expense = self._create_expense(self.manager_id)
+            employee_expense = self._create_expense(self.employee_id)
+            self._create_expense(self.employee_id, status='approved')
+            self._create_expense(self.other_id)
+
+            inbox = self._inbox(self.director_id)
+            self.assertEqual({row['id'] for row in inbox['data']}, {manager_expense, employee_expense})
+            self.assertEqual(inbox['pagination']['total_count'], 2)
+
+            inbox = self._inbox(self.director_id, '?transitive=false')
+            self.assertEqual([row['id'] for row in inbox['data']], [manager_expense])
+
+            inbox = self._inbox(self.employee_id)
+            self.assertEqual(inbox['data'], [])
+
+    def test_get_user_reports(self):
+        """Test listing direct and transitive reports"""
+        response = self.client.get(f'/api/users/{self.director_id}/reports')
+        self.assertEqual([user['id'] for user in json.loads(response.data)], [self.manager_id])
+
+        response = self.client.get(f'/api/users/{self.director_id}/reports?transitive=true')
+        self.assertEqual({user['id'] for user in json.loads(response.data)}, {self.manager_id, self.employee_id})
+
+    def test_manager_cycle_rejected(self):
+        """Test a user cannot report to one of their own reports"""
+        response = self.client.put(
+            f'/api/users/{self.director_id}',
+            data=json.dumps({'manager_id': self.employee_id}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.put(
+            f'/api/users/{self.employee_id}',
+            data=json.dumps({'manager_id': self.director_id}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)['user']['manager_id'], self.director_id)
+
+    def test_delete_manager_reassigns_reports(self):
+        """Test deleting a manager moves their reports up one level"""
+        response = self.client.delete(f'/api/users/{self.manager_id}')
+        self.assertEqual(response.status_code, 200)
+
+        with self.app.app_context():
+            self.assertEqual(db.session.get(User, self.employee_id).manager_id, self.director_id)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,213 @@
+import unittest
+import io
+import os
+import json
+import threading
+from datetime import datetime, timedelta
+from app import create_app, db
+from models import User, Role, IndexingJob, Resume
+from services.indexing_worker import IndexingWorkerPool, QueueFullError, indexing_worker_pool
+
+
+class IndexingWorkerTestCase(unittest.TestCase):
+    """Test cases for the background indexing worker pool and its API"""
+
+    def setUp(self):
+        """Set up test client and database"""
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            role = Role(name='Candidate', description='Job candidate')
+            db.session.add(role)
+            db.session.flush()
+            user = User(name='Candidate', email='candidate@test.com', role_id=role.id)
+            db.session.add(user)
+            db.session.commit()
+            self.user_id = user.id
+
+        self.pool = IndexingWorkerPool(num_workers=1, max_queue_size=1, max_attempts=3, retry_backoff=0.01)
+        self.app.config['INDEXING_WORKERS'] = 1
+        self.app.config['INDEXING_QUEUE_SIZE'] = 1
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.pool.shutdown()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _wait_for(self, job_id, statuses=('completed', 'failed')):
+        for _ in range(200):
+            with self.app.app_context():
+                job = db.session.get(IndexingJob, job_id)
+                if job.status in statuses:
+                    return job.to_dict()
+            threading.Event().wait(0.01)
+        self.fail(f'Job {job_id} did not finish')
+
+    def test_job_completes_with_result(self):
+        """Test a job runs in the background and stores its result"""
+        self.pool.register('echo', lambda payload: {'echo': payload['value']})
+
+        with self.app.app_context():
+            job_id = self.pool.submit(self.app, 'echo', {'value': 42})
+
+        job = self._wait_for(job_id)
+        self.assertEqual(job['status'], 'completed')
+        self.assertEqual(job['result'], {'echo': 42})
+        self.assertEqual(job['attempts'], 1)
+
+    def test_failed_job_is_retried(self):
+        """Test failures are retried until max_attempts"""
+        calls = []
+
+        def flaky(payload):
+            calls.append(payload)
+            if len(calls) < 2:
+                raise RuntimeError('temporary failure')
+            return 'ok'
+
+        self.pool.register('flaky', flaky)
+        self.pool.register('broken', lambda payload: 1 / 0)
+
+        with self.app.app_context():
+            flaky_id = self.pool.submit(self.app, 'flaky', {})
+        job = self._wait_for(flaky_id)
+        self.assertEqual(job['status'], 'completed')
+        self.assertEqual(job['attempts'], 2)
+
+        with self.app.app_context():
+            broken_id = self.pool.submit(self.app, 'broken', {})
+        job = self._wait_for(broken_id)
+        self.assertEqual(job['status'], 'failed')
+        self.assertEqual(job['attempts'], 3)
+        self.assertIn('division by zero', job['error'])
+
+    def test_full_queue_pushes_back(self):
+        """Test submit raises once the bounded queue is full"""
+        release = threading.Event()
+        started = threading.Event()
+
+        def blocking(payload):
+            started.set()
+            release.wait(5)
+            return payload
+
+        self.pool.register('blocking', blocking)
+
+        with self.app.app_context():
+            first = self.pool.submit(self.app, 'blocking', {'n': 1})
+            self.assertTrue(started.wait(5))
+            second = self.pool.submit(self.app, 'blocking', {'n': 2})
+            with self.assertRaises(QueueFullError):
+                self.pool.submit(self.app, 'blocking', {'n': 3})
+
+        release.set()
+        self.assertEqual(self._wait_for(first)['status'], 'completed')
+        self.assertEqual(self._wait_for(second)['status'], 'completed')
+
+    def test_unfinished_jobs_are_recovered_on_start(self):
+        """Test queued and stale running jobs left by a previous process run again on start"""
+        self.pool = IndexingWorkerPool(num_workers=1, max_queue_size=10, max_attempts=3, retry_backoff=0.01)
+        self.app.config['INDEXING_QUEUE_SIZE'] = 10
+        self.pool.register('echo', lambda payload: {'echo': payload['value']})
+
+        with self.app.app_context():
+            queued = IndexingJob(kind='echo', payload=json.dumps({'value': 1}), status='queued')
+            stale = IndexingJob(kind='echo', payload=json.dumps({'value': 2}), status='running', attempts=1,
+                                started_at=datetime.utcnow() - timedelta(hours=1))
+            fresh = IndexingJob(kind='echo', payload=json.dumps({'value': 3}), status='running', attempts=1,
+                                started_at=datetime.utcnow())
+            db.session.add_all([queued, stale, fresh])
+            db.session.commit()
+            job_ids = queued.id, stale.id, fresh.id
+
+        self.pool.start(self.app)
+
+        self.assertEqual(self._wait_for(job_ids[0])['result'], {'echo': 1})
+        job = self._wait_for(job_ids[1])
+        self.assertEqual((job['result'], job['attempts']), ({'echo': 2}, 2))
+        self.pool.wait_idle(5)
+        with self.app.app_context():
+            self.assertEqual(db.session.get(IndexingJob, job_ids[2]).status, 'running')
+
+    def test_upload_returns_job_id(self):
+        """Test resume upload returns immediately and the job can be polled"""
+        handler = indexing_worker_pool._handlers['resume']
+        indexing_worker_pool.register('resume', lambda payload: {'resume_id': payload['resume_id']})
+        try:
+            response = self.client.post('/api/resumes/upload', data={
+                'user_id': self.user_id,
+                'resume': (io.BytesIO(b'%PDF-1.4'), 'resume.pdf')
+            }, content_type='multipart/form-data')
+            self.assertEqual(response.status_code, 202)
+
+            response_data = json.loads(response.data)
+            job = self._wait_for(response_data['job_id'])
+            self.assertEqual(job['result'], {'resume_id': response_data['resume_id']})
+
+            response = self.client.get(f"/api/indexing/jobs/{response_data['job_id']}")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(json.loads(response.data)['status'], 'completed')
+
+            with self.app.app_context():
+                resume = db.session.get(Resume, response_data['resume_id'])
+                self.assertTrue(resume.file_url.endswith('resume.pdf'))
+                os.remove(resume.file_url)
+        finally:
+            indexing_worker_pool.register('resume', handler)
+            indexing_worker_pool.wait_idle(5)
+
+    def test_upload_with_full_queue_keeps_nothing(self):
+        """Test a rejected upload leaves neither a Resume row nor the saved file"""
+        saved = []
+
+        def submit(app, kind, payload):
+            saved.append(payload['file_path'])
+            raise QueueFullError('Indexing queue is full')
+
+        indexing_worker_pool.submit = submit
+        try:
+            response = self.client.post('/api/resumes/upload', data={
+                'user_id': self.user_id,
+                'resume': (io.BytesIO(b'%PDF-1.4'), 'resume.pdf')
+            }, content_type='multipart/form-data')
+        finally:
+            del indexing_worker_pool.submit
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], '30')
+        self.assertFalse(os.path.exists(saved[0]))
+        with self.app.app_context():
+            self.assertEqual(Resume.query.filter_by(owner_id=self.user_id).count(), 0)
+
+    def test_app_starts_shared_pool(self):
+        """Test create_app starts the indexing workers without waiting for an upload"""
+        self.assertTrue(any(thread.is_alive() for thread in indexing_worker_pool._threads))
+
+    def test_upload_rejects_unknown_model(self):
+        """Test an unsupported model is refused before anything is stored"""
+        response = self.client.post('/api/resumes/upload', data={
+            'user_id': self.user_id,
+            'model_name': 'unknown',
+            'resume': (io.BytesIO(b'%PDF-1.4'), 'resume.pdf')
+        }, content_type='multipart/form-data')
+        self.assertEqual(response.status_code, 400)
+        with self.app.app_context():
+            self.assertEqual(Resume.query.filter_by(owner_id=self.user_id).count(), 0)
+
+    def test_upload_rejects_invalid_file(self):
+        """Test unsupported resume files are rejected"""
+        response = self.client.post('/api/resumes/upload', data={
+            'user_id': self.user_id,
+            'resume': (io.BytesIO(b'text'), 'resume.txt')
+        }, content_type='multipart/form-data')
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
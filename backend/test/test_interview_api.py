@@ -0,0 +1,155 @@
+import unittest
+import json
+from app import create_app, db
+from datetime import datetime
+from models import User, Role, JobPost, Resume, Application, Interview
+from services.interview_service import interview_service
+
+
+class InterviewAPITestCase(unittest.TestCase):
+    """Test cases for Interview scheduling API"""
+
+    def setUp(self):
+        """Set up test client and database"""
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            self._create_test_data()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _create_test_data(self):
+        """Create a candidate application and two interviewers"""
+        role = Role(name='Employee', description='Regular employee')
+        db.session.add(role)
+        db.session.flush()
+
+        candidate = User(name='Candidate', email='candidate@test.com', role_id=role.id)
+        alice = User(name='Alice', email='alice@test.com', role_id=role.id)
+        bob = User(name='Bob', email='bob@test.com', role_id=role.id)
+        db.session.add_all([candidate, alice, bob])
+        db.session.flush()
+
+        job = JobPost(title='Engineer', posted_by_id=alice.id)
+        resume = Resume(owner_id=candidate.id)
+        db.session.add_all([job, resume])
+        db.session.flush()
+
+        application = Application(candidate_id=candidate.id, job_id=job.id, resume_id=resume.id)
+        db.session.add(application)
+        db.session.commit()
+
+        self.application_id = application.id
+        self.alice_id = alice.id
+        self.bob_id = bob.id
+
+    def _schedule(self, interviewer_id, scheduled_at, duration_mins=60):
+        return self.client.post(
+            '/api/interviews/',
+            data=json.dumps({
+                'application_id': self.application_id,
+                'interviewer_id': interviewer_id,
+                'scheduled_at': scheduled_at,
+                'duration_mins': duration_mins
+            }),
+            content_type='application/json'
+        )
+
+    def test_schedule_interview(self):
+        """Test scheduling stores the end time"""
+        response = self._schedule(self.alice_id, '2024-07-01T10:00:00', 45)
+        self.assertEqual(response.status_code, 201)
+
+        interview = json.loads(response.data)['interview']
+        self.assertEqual(interview['ends_at'], '2024-07-01T10:45:00')
+
+    def test_schedule_overlap_conflict(self):
+        """Test overlapping interviews for the same interviewer are rejected"""
+        self._schedule(self.alice_id, '2024-07-01T10:00:00', 60)
+
+        response = self._schedule(self.alice_id, '2024-07-01T10:30:00', 60)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(len(json.loads(response.data)['conflicts']), 1)
+
+        # Back-to-back and other interviewers are fine
+        self.assertEqual(self._schedule(self.alice_id, '2024-07-01T11:00:00').status_code, 201)
+        self.assertEqual(self._schedule(self.bob_id, '2024-07-01T10:30:00').status_code, 201)
+
+    def test_legacy_interview_without_end_blocks_slot(self):
+        """Test interviews stored before ends_at existed still count as busy and get backfilled"""
+        with self.app.app_context():
+            # a Core insert skips the ORM hook, like rows written before the column existed
+            db.session.execute(Interview.__table__.insert().values(
+                id='legacy-interview', application_id=self.application_id, interviewer_id=self.alice_id,
+                scheduled_at=datetime(2024, 7, 1, 10, 0), duration_mins=90, status='scheduled'
+            ))
+            db.session.commit()
+
+        self.assertEqual(self._schedule(self.alice_id, '2024-07-01T11:00:00').status_code, 409)
+
+        with self.app.app_context():
+            self.assertEqual(interview_service.backfill_end_times(), 1)
+            self.assertEqual(db.session.get(Interview, 'legacy-interview').ends_at, datetime(2024, 7, 1, 11, 30))
+
+        self.assertEqual(self._schedule(self.alice_id, '2024-07-01T11:15:00').status_code, 409)
+        self.assertEqual(self._schedule(self.alice_id, '2024-07-01T11:30:00').status_code, 201)
+
+    def test_cancelled_interview_frees_slot(self):
+        """Test cancelled interviews do not block the interviewer"""
+        interview_id = json.loads(self._schedule(self.alice_id, '2024-07-01T10:00:00').data)['interview']['id']
+
+        response = self.client.put(f'/api/interviews/{interview_id}/cancel')
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self._schedule(self.alice_id, '2024-07-01T10:00:00').status_code, 201)
+
+    def test_reschedule_ignores_itself(self):
+        """Test rescheduling checks conflicts against other interviews only"""
+        interview_id = json.loads(self._schedule(self.alice_id, '2024-07-01T10:00:00').data)['interview']['id']
+        self._schedule(self.alice_id, '2024-07-01T12:00:00')
+
+        response = self.client.put(
+            f'/api/interviews/{interview_id}/reschedule',
+            data=json.dumps({'scheduled_at': '2024-07-01T10:30:00'}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.put(
+            f'/api/interviews/{interview_id}/reschedule',
+            data=json.dumps({'scheduled_at': '2024-07-01T11:30:00'}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 409)
+
+    def test_panel_free_slots(self):
+        """Test free slots are the working hours where the whole panel is free"""
+        self._schedule(self.alice_id, '2024-07-01T10:00:00', 60)
+        self._schedule(self.bob_id, '2024-07-01T10:30:00', 90)
+        self._schedule(self.bob_id, '2024-07-01T14:00:00', 30)
+
+        response = self.client.get(
+            '/api/interviews/free-slots'
+            f'?interviewer_ids={self.alice_id},{self.bob_id}'
+            '&start=2024-07-01T00:00:00&end=2024-07-02T00:00:00&duration_mins=60'
+        )
+        self.assertEqual(response.status_code, 200)
+
+        slots = json.loads(response.data)['slots']
+        self.assertEqual(slots, [
+            {'start': '2024-07-01T09:00:00', 'end': '2024-07-01T10:00:00'},
+            {'start': '2024-07-01T12:00:00', 'end': '2024-07-01T14:00:00'},
+            {'start': '2024-07-01T14:30:00', 'end': '2024-07-01T17:00:00'}
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
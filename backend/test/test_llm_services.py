@@ -0,0 +1,291 @@
+import unittest
+import asyncio
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from genai.llm_factory import LLMModelFactory, AsyncLLMClient, LLMTimeoutError, LLMResponseCache
+from genai.llm_models import BaseLLMModel
+from genai.services.expense_service import ExpenseService
+from utils.text_utility import TextUtility
+
+
+class EchoModel(BaseLLMModel):
+    """Provider answering receipt prompts from the claims in the prompt"""
+
+    model_name = 'echo-1'
+    instances = 0
+
+    def __init__(self):
+        EchoModel.instances += 1
+        self.calls = []
+
+    def generate_text(self, prompt):
+        self.calls.append(prompt)
+        match = re.search(r'has an id\):\n\s*(\[.*?\n\])', prompt, re.S)
+        if match is None:
+            return '```json\n{"extracted_amount": -1.0, "matches_claimed_amount": false}\n```'
+        # the answer for the last claim is left out
+        claims = json.loads(match.group(1))[:-1]
+        return json.dumps([{'id': claim['id'], 'extracted_amount': claim['claimed_amount']} for claim in claims])
+
+
+class LLMServicesTestCase(unittest.TestCase):
+    """Test cases for the LLM provider factory, async client, response cache and batching"""
+
+    def setUp(self):
+        EchoModel.instances = 0
+        LLMModelFactory.register_model_provider('echo', EchoModel)
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = LLMResponseCache(disk_path=os.path.join(self.cache_dir, 'responses.sqlite3'))
+
+    def tearDown(self):
+        LLMModelFactory._supported_model_providers.pop('echo', None)
+        LLMModelFactory._instances.pop('echo', None)
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def _service(self, **kwargs):
+        client = AsyncLLMClient(max_concurrency={'echo': 4})
+        return ExpenseService(model_name='echo', llm_client=client, cache=self.cache, **kwargs)
+
+    def test_provider_is_built_once_on_first_use(self):
+        """Test providers are instantiated lazily and shared between threads"""
+        self.assertEqual(LLMModelFactory.get_model_name('echo'), 'echo-1')
+        self.assertEqual(EchoModel.instances, 0)
+
+        providers = []
+        threads = [threading.Thread(target=lambda: providers.append(LLMModelFactory.get_model_provider('Echo')))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(EchoModel.instances, 1)
+        self.assertTrue(all(provider is providers[0] for provider in providers))
+        with self.assertRaises(ValueError):
+            LLMModelFactory.get_model_provider('unknown')
+
+    def test_async_client_bounds_concurrency_and_times_out(self):
+        """Test at most max_concurrency calls run at once and slow calls time out"""
+        lock = threading.Lock()
+        running, peak = [0], [0]
+
+        def generate(provider, prompt):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.5 if prompt == 'slow' else 0.02)
+            with lock:
+                running[0] -= 1
+            return prompt
+
+        client = AsyncLLMClient(max_concurrency={'echo': 3}, generate_fn=generate)
+
+        async def run():
+            results = await asyncio.gather(*(client.generate('echo', str(i)) for i in range(12)))
+            with self.assertRaises(LLMTimeoutError):
+                await client.generate('echo', 'slow', timeout=0.05)
+            return results
+
+        self.assertEqual(asyncio.run(run()), [str(i) for i in range(12)])
+        self.assertLessEqual(peak[0], 3)
+        client.shutdown()
+
+    def test_concurrency_limit_holds_across_event_loops(self):
+        """Test run_batch from two threads shares one per-provider limit"""
+        lock = threading.Lock()
+        running, peak = [0], [0]
+
+        def generate(provider, prompt):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+            return '{"category": "Travel"}'
+
+        client = AsyncLLMClient(max_concurrency={'echo': 3}, generate_fn=generate)
+        service = ExpenseService(model_name='echo', llm_client=client, use_cache=False)
+        start = threading.Barrier(2)
+        results = []
+
+        def audit(offset):
+            start.wait()
+            results.append(service.run_batch('categorize_expense', [(f'Taxi {offset + i}', 10.0) for i in range(12)]))
+
+        threads = [threading.Thread(target=audit, args=(offset,)) for offset in (0, 100)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(results), 2)
+        self.assertTrue(all(len(batch) == 12 for batch in results))
+        self.assertEqual(peak[0], 3)
+        client.shutdown()
+
+    def test_busy_provider_does_not_block_other_providers(self):
+        """Test calls queued for one provider leave the other providers' workers free"""
+        release = threading.Event()
+
+        def generate(provider, prompt):
+            if provider == 'slow':
+                release.wait(5)
+            return prompt
+
+        client = AsyncLLMClient(max_concurrency={'slow': 2, 'echo': 2}, generate_fn=generate)
+
+        async def run():
+            blocked = [asyncio.ensure_future(client.generate('slow', str(i))) for i in range(40)]
+            await asyncio.sleep(0.05)
+            answer = await asyncio.wait_for(client.generate('echo', 'free'), 1)
+            release.set()
+            return answer, await asyncio.gather(*blocked)
+
+        answer, blocked = asyncio.run(run())
+        self.assertEqual(answer, 'free')
+        self.assertEqual(blocked, [str(i) for i in range(40)])
+        client.shutdown()
+
+    def test_timeout_excludes_queue_time_and_cancelled_calls_are_not_sent(self):
+        """Test queued calls get their full timeout and a call cancelled in the queue never runs"""
+        sent = []
+
+        def generate(provider, prompt):
+            sent.append(prompt)
+            time.sleep(0.1)
+            return prompt
+
+        client = AsyncLLMClient(max_concurrency={'echo': 1}, generate_fn=generate)
+
+        async def run():
+            results = await asyncio.gather(*(client.generate('echo', str(i), timeout=0.15) for i in range(3)))
+            first = asyncio.ensure_future(client.generate('echo', 'first'))
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(client.generate('echo', 'dropped'), 0.05)
+            await first
+            return results
+
+        self.assertEqual(asyncio.run(run()), ['0', '1', '2'])
+        self.assertEqual(sent, ['0', '1', '2', 'first'])
+        client.shutdown()
+
+    def test_response_cache_ttl_and_persistence(self):
+        """Test keys ignore prompt indentation, entries expire and survive a restart"""
+        key = LLMResponseCache.make_key('echo', 'echo-1', 'Hello\n        world  ')
+        self.assertEqual(key, LLMResponseCache.make_key('echo', 'echo-1', '  Hello\n\n world'))
+        self.assertNotEqual(key, LLMResponseCache.make_key('echo', 'echo-2', 'Hello\nworld'))
+
+        self.cache.put(key, 'answer', 'echo', 'echo-1', latency=1.5)
+        self.assertEqual(self.cache.get(key, ttl=60, scope='test'), 'answer')
+
+        reopened = LLMResponseCache(disk_path=self.cache.disk_path)
+        self.assertEqual(reopened.get(key, ttl=60, scope='test'), 'answer')
+        self.assertEqual(reopened.stats('test')['test']['disk_hits'], 1)
+        self.assertEqual(reopened.stats('test')['test']['saved_seconds'], 1.5)
+
+        time.sleep(0.02)
+        self.assertIsNone(reopened.get(key, ttl=0.01, scope='test'))
+
+    def test_expense_service_uses_cache(self):
+        """Test a repeated prompt is answered from the cache and recorded per method"""
+        service = self._service()
+        first = service.verify_expense_receipt('Cafe 12.50', 12.5, 'Food')
+        second = service.verify_expense_receipt('Cafe 12.50', 12.5, 'Food')
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(LLMModelFactory.get_model_provider('echo').calls), 1)
+        stats = service.cache_stats()['verify_expense_receipt']
+        self.assertEqual((stats['memory_hits'], stats['misses']), (1, 1))
+
+        self._service(use_cache=False).verify_expense_receipt('Cafe 12.50', 12.5, 'Food')
+        self.assertEqual(len(LLMModelFactory.get_model_provider('echo').calls), 2)
+
+    def test_batched_verification_falls_back_per_item(self):
+        """Test receipts are packed per request and missing answers are verified one by one"""
+        service = self._service(use_cache=False)
+        receipts = [{'receipt_text': f'Taxi {i}', 'claimed_amount': float(i), 'category': 'Travel'}
+                    for i in range(7)]
+
+        results = service.verify_expense_receipts_batched(receipts, max_batch_size=3)
+
+        calls = LLMModelFactory.get_model_provider('echo').calls
+        # batches of 3, 3 and 1; the two batch answers each miss their last claim
+        self.assertEqual(len(calls), 5)
+        self.assertEqual([result['extracted_amount'] for result in results],
+                         [0.0, 1.0, -1.0, 3.0, 4.0, -1.0, -1.0])
+
+
+    def test_batched_verification_timeout_skips_per_item_retry(self):
+        """Test a timed out batch is logged and its receipts get the manual review fallback"""
+        prompts = []
+
+        def generate(provider, prompt):
+            prompts.append(prompt)
+            time.sleep(0.3)
+            return '[]'
+
+        client = AsyncLLMClient(max_concurrency={'echo': 4}, generate_fn=generate)
+        service = ExpenseService(model_name='echo', llm_client=client, use_cache=False)
+        receipts = [{'receipt_text': f'Taxi {i}', 'claimed_amount': float(i), 'category': 'Travel'}
+                    for i in range(4)]
+
+        with self.assertLogs('genai.services.expense_service', level='WARNING') as logs:
+            results = service.verify_expense_receipts_batched(receipts, max_batch_size=2, timeout=0.05)
+
+        self.assertEqual(len(prompts), 2)
+        self.assertEqual(len(logs.records), 2)
+        self.assertIn('timed out', logs.output[0])
+        self.assertEqual([result['extracted_amount'] for result in results], [0.0, 1.0, 2.0, 3.0])
+        self.assertTrue(all(result['confidence_score'] == 0.0 and result['error'] for result in results))
+        client.shutdown()
+
+    def test_receipt_batches_fit_token_budget_and_response_limit(self):
+        """Test batches stay within the prompt budget and the provider's response size"""
+        claims = [{'id': str(i), 'receipt_text': 'Taxi ' * 40, 'claimed_amount': 10.0, 'category': 'Travel'}
+                  for i in range(10)]
+
+        # chatgpt answers fit 500 output tokens, so at most 3 receipts per request
+        service = ExpenseService(model_name='chatgpt', use_cache=False)
+        self.assertEqual([len(batch) for batch in service._plan_receipt_batches(claims, 20, 100000)], [3, 3, 3, 1])
+
+        service = self._service(use_cache=False)
+        overhead = TextUtility.estimate_tokens(service._receipts_batch_prompt([]))
+        cost = TextUtility.estimate_tokens(json.dumps(claims[0], indent=2))
+        batches = service._plan_receipt_batches(claims, 20, overhead + 2 * cost)
+        self.assertEqual([len(batch) for batch in batches], [2] * 5)
+        self.assertEqual([claim['id'] for batch in batches for claim in batch], [str(i) for i in range(10)])
+
+    def test_batched_verification_caches_complete_answers_only(self):
+        """Test a batch answered in full is cached and a partial answer is asked again"""
+        def generate(provider, prompt):
+            claims = json.loads(re.search(r'has an id\):\n\s*(\[.*?\n\])', prompt, re.S).group(1))
+            return json.dumps([{'id': claim['id'], 'extracted_amount': claim['claimed_amount']} for claim in claims])
+
+        client = AsyncLLMClient(max_concurrency={'echo': 4}, generate_fn=generate)
+        service = ExpenseService(model_name='echo', llm_client=client, cache=self.cache)
+        receipts = [{'receipt_text': f'Taxi {i}', 'claimed_amount': float(i), 'category': 'Travel'}
+                    for i in range(3)]
+
+        first = service.verify_expense_receipts_batched(receipts)
+        second = service.verify_expense_receipts_batched(receipts)
+        self.assertEqual(first, second)
+        stats = service.cache_stats()['verify_expense_receipts_batched']
+        self.assertEqual((stats['memory_hits'], stats['misses']), (1, 1))
+
+        # the echo provider leaves the last claim out, so nothing is cached
+        partial = self._service()
+        partial.verify_expense_receipts_batched(receipts[:2])
+        partial.verify_expense_receipts_batched(receipts[:2])
+        calls = LLMModelFactory.get_model_provider('echo').calls
+        self.assertEqual(len([prompt for prompt in calls if 'has an id' in prompt]), 2)
+        client.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import os
+import unittest
+import shutil
+import tempfile
+import numpy as np
+from app import create_app, db
+from models import JobResumeMatch, ResumeJobMatch
+from database.vector_db.chroma_vector_db import ChromaVectorDBService
+from services.match_matrix_service import MatchMatrixService
+
+
+class MatchMatrixServiceTestCase(unittest.TestCase):
+    """Test cases for the precomputed job x resume match tables"""
+
+    def setUp(self):
+        """Set up a temporary vector store and an in-memory database"""
+        # the engine is bound inside create_app, so the URL has to be set before it runs
+        self._database_url = os.environ.get('DATABASE_URL')
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.persist_dir = tempfile.mkdtemp()
+        self.vector_db = ChromaVectorDBService(persist_dir=self.persist_dir, backend='numpy')
+        self.service = MatchMatrixService(vector_db=self.vector_db, k=3, block_size=4)
+        self.rng = np.random.default_rng(0)
+
+        with self.app.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+        shutil.rmtree(self.persist_dir, ignore_errors=True)
+        if self._database_url is None:
+            os.environ.pop('DATABASE_URL', None)
+        else:
+            os.environ['DATABASE_URL'] = self._database_url
+
+    def _put(self, collection_name, ids, vectors, fingerprint='v1', status='active'):
+        self.vector_db.get_collection(collection_name).upsert(
+            ids=ids, embeddings=vectors,
+            metadatas=[{'status': status, 'fingerprint': f'{doc_id}-{fingerprint}'} for doc_id in ids]
+        )
+
+    def _expected(self, rows, cols, col_ids):
+        rows = rows / np.linalg.norm(rows, axis=1, keepdims=True)
+        cols = cols / np.linalg.norm(cols, axis=1, keepdims=True)
+        return [[col_ids[i] for i in np.argsort(-(row @ cols.T))[:3]] for row in rows]
+
+    def _stored(self, model, row_column, col_column, row_id):
+        query = model.query.filter(row_column == row_id).order_by(model.rank)
+        return [getattr(match, col_column.key) for match in query]
+
+    def test_blocked_top_k_matches_full_sort(self):
+        """Test the blocked running top-k equals a full argsort"""
+        rows = self.rng.normal(size=(10, 8)).astype(np.float32)
+        cols = self.rng.normal(size=(11, 8)).astype(np.float32)
+
+        idx, scores = self.service.top_k(rows, cols, 3)
+
+        expected = np.argsort(-(rows @ cols.T), axis=1)[:, :3]
+        np.testing.assert_array_equal(idx, expected)
+        self.assertTrue(np.all(scores[:, :-1] >= scores[:, 1:]))
+
+    def test_refresh_stores_top_k_both_ways(self):
+        """Test a refresh stores the best resumes per job and jobs per resume"""
+        jobs = self.rng.normal(size=(6, 8)).astype(np.float32)
+        resumes = self.rng.normal(size=(9, 8)).astype(np.float32)
+        job_ids = [f'job-{i}' for i in range(6)]
+        resume_ids = [f'resume-{i}' for i in range(9)]
+        self._put('job_post', job_ids, jobs)
+        self._put('resume', resume_ids, resumes)
+        self._put('resume', ['resume-closed'], resumes[:1] * 10, status='inactive')
+
+        with self.app.app_context():
+            stats = self.service.refresh()
+            self.assertEqual(stats['jobs'], 6)
+            self.assertEqual(stats['resumes'], 9)
+
+            expected = self._expected(jobs, resumes, resume_ids)
+            for job_id, best in zip(job_ids, expected):
+                self.assertEqual(self._stored(JobResumeMatch, JobResumeMatch.job_id,
+                                              JobResumeMatch.resume_id, job_id), best)
+
+            expected = self._expected(resumes, jobs, job_ids)
+            for resume_id, best in zip(resume_ids, expected):
+                self.assertEqual(self._stored(ResumeJobMatch, ResumeJobMatch.resume_id,
+                                              ResumeJobMatch.job_id, resume_id), best)
+
+    def test_incremental_refresh_matches_full_rebuild(self):
+        """Test refreshing only changed rows gives the same tables as a full rebuild"""
+        jobs = self.rng.normal(size=(6, 8)).astype(np.float32)
+        resumes = self.rng.normal(size=(9, 8)).astype(np.float32)
+        job_ids = [f'job-{i}' for i in range(6)]
+        resume_ids = [f'resume-{i}' for i in range(9)]
+        self._put('job_post', job_ids, jobs)
+        self._put('resume', resume_ids, resumes)
+
+        with self.app.app_context():
+            self.service.refresh()
+            unchanged = self.service.refresh()
+            self.assertEqual(unchanged['job_rows_rewritten'], 0)
+            self.assertEqual(unchanged['resume_rows_rewritten'], 0)
+
+            # one resume moves next to job-0, another is removed
+            resumes[2] = jobs[0]
+            self._put('resume', ['resume-2'], resumes[2:3], fingerprint='v2')
+            self.vector_db.get_collection('resume').delete(ids=['resume-5'])
+
+            stats = self.service.refresh()
+            self.assertEqual(stats['changed_resumes'], 1)
+            self.assertEqual(stats['removed_resumes'], 1)
+            incremental = sorted((m.job_id, m.resume_id, m.rank) for m in JobResumeMatch.query)
+            incremental_jobs = sorted((m.resume_id, m.job_id, m.rank) for m in ResumeJobMatch.query)
+
+            self.assertEqual(self.service.top_candidates('job-0', limit=1)[0].resume_id, 'resume-2')
+            self.assertEqual(self.service.top_jobs('resume-5'), [])
+
+            self.service.refresh(full=True)
+            self.assertEqual(sorted((m.job_id, m.resume_id, m.rank) for m in JobResumeMatch.query), incremental)
+            self.assertEqual(sorted((m.resume_id, m.job_id, m.rank) for m in ResumeJobMatch.query), incremental_jobs)
+
+
+if __name__ == '__main__':
+    unittest.main()
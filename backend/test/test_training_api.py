@@ -0,0 +1,150 @@
+import unittest
+import json
+from app import create_app, db
+from models import User, Role, Training, Course, Enrollment
+
+
+class TrainingAPITestCase(unittest.TestCase):
+    """Test cases for Training API"""
+
+    def setUp(self):
+        """Set up test client and database"""
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            self._create_test_data()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _create_test_data(self):
+        """Create learners, a training and a course"""
+        role = Role(name='Employee', description='Regular employee')
+        db.session.add(role)
+        db.session.flush()
+
+        users = [User(name=f'Learner {i}', email=f'learner{i}@test.com', role_id=role.id) for i in range(5)]
+        training = Training(title='Onboarding')
+        db.session.add_all(users + [training])
+        db.session.flush()
+
+        course = Course(training_id=training.id, title='Security basics', duration_mins=30)
+        db.session.add(course)
+        db.session.commit()
+
+        self.user_ids = [user.id for user in users]
+        self.training_id = training.id
+        self.course_id = course.id
+
+    def _put_progress(self, updates):
+        return self.client.put(
+            '/api/trainings/enrollments/progress',
+            data=json.dumps({'updates': updates}),
+            content_type='application/json'
+        )
+
+    def test_bulk_enroll(self):
+        """Test enrolling many users skips duplicates and unknown users"""
+        response = self.client.post(
+            f'/api/trainings/courses/{self.course_id}/enrollments',
+            data=json.dumps({'user_ids': self.user_ids[:3]}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(json.loads(response.data)['enrolled']), 3)
+
+        response = self.client.post(
+            f'/api/trainings/courses/{self.course_id}/enrollments',
+            data=json.dumps({'user_ids': self.user_ids + ['missing-user']}),
+            content_type='application/json'
+        )
+        response_data = json.loads(response.data)
+        self.assertEqual(sorted(response_data['enrolled']), sorted(self.user_ids[3:]))
+        self.assertEqual(len(response_data['skipped']), 4)
+
+        with self.app.app_context():
+            self.assertEqual(Enrollment.query.filter_by(course_id=self.course_id).count(), 5)
+
+    def test_bulk_progress_upsert(self):
+        """Test progress updates existing enrollments and inserts missing ones"""
+        self.client.post(
+            f'/api/trainings/courses/{self.course_id}/enrollments',
+            data=json.dumps({'user_ids': self.user_ids[:2]}),
+            content_type='application/json'
+        )
+
+        response = self._put_progress([
+            {'user_id': self.user_ids[0], 'course_id': self.course_id, 'progress': 100},
+            {'user_id': self.user_ids[1], 'course_id': self.course_id, 'progress': 40},
+            {'user_id': self.user_ids[2], 'course_id': self.course_id, 'progress': 10}
+        ])
+        self.assertEqual(response.status_code, 200)
+
+        response_data = json.loads(response.data)
+        self.assertEqual(response_data['updated'], 2)
+        self.assertEqual(response_data['inserted'], 1)
+
+        with self.app.app_context():
+            enrollment = Enrollment.query.filter_by(user_id=self.user_ids[0], course_id=self.course_id).one()
+            self.assertEqual(enrollment.progress, 100)
+            self.assertEqual(enrollment.status, 'completed')
+
+    def test_bulk_progress_invalid(self):
+        """Test out-of-range progress and unknown courses are rejected atomically"""
+        response = self._put_progress([{'user_id': self.user_ids[0], 'course_id': self.course_id, 'progress': 150}])
+        self.assertEqual(response.status_code, 400)
+
+        response = self._put_progress([
+            {'user_id': self.user_ids[0], 'course_id': self.course_id, 'progress': 50},
+            {'user_id': self.user_ids[0], 'course_id': 'missing-course', 'progress': 50}
+        ])
+        self.assertEqual(response.status_code, 400)
+
+        with self.app.app_context():
+            self.assertEqual(Enrollment.query.count(), 0)
+
+    def test_course_summary(self):
+        """Test completion summary is aggregated per course"""
+        self._put_progress([
+            {'user_id': self.user_ids[0], 'course_id': self.course_id, 'progress': 100},
+            {'user_id': self.user_ids[1], 'course_id': self.course_id, 'progress': 50},
+            {'user_id': self.user_ids[2], 'course_id': self.course_id, 'progress': 0},
+            {'user_id': self.user_ids[3], 'course_id': self.course_id, 'progress': 100}
+        ])
+
+        response = self.client.get(f'/api/trainings/courses/{self.course_id}/summary')
+        self.assertEqual(response.status_code, 200)
+
+        summary = json.loads(response.data)
+        self.assertEqual(summary['enrolled_count'], 4)
+        self.assertEqual(summary['completed_count'], 2)
+        self.assertEqual(summary['completion_rate'], 0.5)
+        self.assertEqual(summary['average_progress'], 62.5)
+        self.assertEqual(summary['status_breakdown'], {'completed': 2, 'in_progress': 1, 'enrolled': 1})
+
+    def test_course_enrollments_pagination(self):
+        """Test listing enrollments of a course"""
+        self.client.post(
+            f'/api/trainings/courses/{self.course_id}/enrollments',
+            data=json.dumps({'user_ids': self.user_ids}),
+            content_type='application/json'
+        )
+
+        response = self.client.get(f'/api/trainings/courses/{self.course_id}/enrollments?page=1&limit=2')
+        self.assertEqual(response.status_code, 200)
+
+        response_data = json.loads(response.data)
+        self.assertEqual(len(response_data['data']), 2)
+        self.assertEqual(response_data['pagination']['total_count'], 5)
+        self.assertEqual(response_data['data'][0]['user_name'], 'Learner 0')
+
+
+if __name__ == '__main__':
+    unittest.main()
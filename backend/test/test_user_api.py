@@ -0,0 +1,252 @@
+import unittest
+import json
+import time
+from app import create_app, db
+from models import (
+    User, Role, JobPost, Resume, Application, Interview,
+    Report, ExpenseReport, PerformanceReview, Notification, AuditLog,
+    JobResumeMatch, ResumeJobMatch
+)
+from datetime import datetime
+
+
+class UserAPITestCase(unittest.TestCase):
+    """Test cases for User Management API"""
+
+    def setUp(self):
+        """Set up test client and database"""
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            self._create_test_data()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _create_test_data(self):
+        """Create test users and roles"""
+        employee_role = Role(name='Employee', description='Regular employee')
+        manager_role = Role(name='Manager', description='Manager')
+
+        db.session.add_all([employee_role, manager_role])
+        db.session.flush()
+
+        employee = User(name='John Doe', email='john@test.com', role_id=employee_role.id)
+        manager = User(name='Jane Manager', email='jane@test.com', role_id=manager_role.id)
+
+        db.session.add_all([employee, manager])
+        db.session.commit()
+
+        # Keep ids only, instances are detached once the app context closes
+        self.employee_id = employee.id
+        self.manager_id = manager.id
+
+    def _create_history(self):
+        """Create job, resume, application, report and review rows around both users"""
+        job = JobPost(title='Engineer', posted_by_id=self.manager_id)
+        resume = Resume(owner_id=self.employee_id, file_url='resume.pdf')
+        db.session.add_all([job, resume])
+        db.session.flush()
+
+        application = Application(candidate_id=self.employee_id, job_id=job.id, resume_id=resume.id)
+        db.session.add(application)
+        db.session.flush()
+
+        interview = Interview(application_id=application.id, scheduled_at=datetime.utcnow(), interviewer_id=self.manager_id)
+        report = Report(user_id=self.employee_id, type='expense', approved_by=self.manager_id)
+        manager_report = Report(user_id=self.manager_id, type='expense')
+        db.session.add_all([interview, report, manager_report])
+        db.session.flush()
+
+        db.session.add_all([
+            ExpenseReport(report_id=report.id, total=10.0),
+            PerformanceReview(employee_id=self.employee_id, reviewer_id=self.manager_id, type='annual', rating=4.0),
+            Notification(recipient_id=self.employee_id, message='Hello'),
+            AuditLog(actor_id=self.employee_id, action='login', target_type='user', target_id=self.employee_id)
+        ])
+        db.session.commit()
+
+        return job.id, manager_report.id
+
+    def test_delete_user_purges_dependents(self):
+        """Test deleting a user removes every row that references it"""
+        with self.app.app_context():
+            _, manager_report_id = self._create_history()
+
+            response = self.client.delete(f'/api/users/{self.employee_id}')
+            self.assertEqual(response.status_code, 200)
+
+            deleted = json.loads(response.data)['deleted']
+            self.assertEqual(deleted['users'], 1)
+            self.assertEqual(deleted['applications'], 1)
+            self.assertEqual(deleted['interviews'], 1)
+            self.assertEqual(deleted['expense_reports'], 1)
+
+            self.assertIsNone(db.session.get(User, self.employee_id))
+            self.assertEqual(Application.query.count(), 0)
+            self.assertEqual(PerformanceReview.query.count(), 0)
+            self.assertEqual(Notification.query.count(), 0)
+            self.assertEqual(AuditLog.query.count(), 0)
+            self.assertIsNotNone(db.session.get(Report, manager_report_id))
+            self.assertIsNotNone(db.session.get(User, self.manager_id))
+
+    def test_delete_user_clears_approvals(self):
+        """Test deleting an approver keeps the reports they approved"""
+        with self.app.app_context():
+            self._create_history()
+
+            response = self.client.delete(f'/api/users/{self.manager_id}')
+            self.assertEqual(response.status_code, 200)
+
+            report = Report.query.filter_by(user_id=self.employee_id).first()
+            self.assertIsNotNone(report)
+            self.assertIsNone(report.approved_by)
+            self.assertEqual(JobPost.query.count(), 0)
+            self.assertEqual(Interview.query.count(), 0)
+
+    def test_delete_user_async(self):
+        """Test background deletion reports its progress through the purge job"""
+        with self.app.app_context():
+            self._create_history()
+
+            response = self.client.delete(f'/api/users/{self.employee_id}?async=true')
+            self.assertEqual(response.status_code, 202)
+            job_id = json.loads(response.data)['job_id']
+
+            job = None
+            for _ in range(50):
+                job = json.loads(self.client.get(f'/api/users/purge-jobs/{job_id}').data)
+                if job['status'] in ('completed', 'failed'):
+                    break
+                time.sleep(0.1)
+
+            self.assertEqual(job['status'], 'completed')
+            self.assertEqual(job['deleted']['users'], 1)
+
+    def _create_matches(self, job_id):
+        """Match the manager's job against a resume of each user, both ways"""
+        resume_ids = [resume.id for resume in Resume.query.all()]
+        manager_resume = Resume(owner_id=self.manager_id, file_url='manager.pdf')
+        db.session.add(manager_resume)
+        db.session.flush()
+        resume_ids.append(manager_resume.id)
+
+        for rank, resume_id in enumerate(resume_ids):
+            db.session.add_all([
+                JobResumeMatch(job_id=job_id, resume_id=resume_id, rank=rank, score=0.5),
+                ResumeJobMatch(resume_id=resume_id, job_id=job_id, rank=0, score=0.5)
+            ])
+        db.session.commit()
+        return manager_resume.id
+
+    def test_delete_user_purges_matches(self):
+        """Test deleting a resume owner or a job poster removes their own precomputed matches"""
+        with self.app.app_context():
+            job_id, _ = self._create_history()
+            employee_resume_id = Resume.query.filter_by(owner_id=self.employee_id).one().id
+            manager_resume_id = self._create_matches(job_id)
+
+            response = self.client.delete(f'/api/users/{self.employee_id}')
+            self.assertEqual(response.status_code, 200)
+            deleted = json.loads(response.data)['deleted']
+            self.assertEqual((deleted['job_resume_matches'], deleted['resume_job_matches']), (0, 1))
+            # the job's row still points at the deleted resume, so the match refresh recomputes it
+            self.assertEqual(sorted(match.resume_id for match in JobResumeMatch.query.all()),
+                             sorted([employee_resume_id, manager_resume_id]))
+            self.assertEqual([match.resume_id for match in ResumeJobMatch.query.all()], [manager_resume_id])
+
+            # batched deletes select the composite keys of the match tables
+            response = self.client.delete(f'/api/users/{self.manager_id}?async=true')
+            job_id = json.loads(response.data)['job_id']
+            for _ in range(50):
+                job = json.loads(self.client.get(f'/api/users/purge-jobs/{job_id}').data)
+                if job['status'] in ('completed', 'failed'):
+                    break
+                time.sleep(0.1)
+
+            self.assertEqual(job['status'], 'completed')
+            self.assertEqual((job['deleted']['job_resume_matches'], job['deleted']['resume_job_matches']), (2, 1))
+            db.session.expire_all()
+            self.assertEqual(JobResumeMatch.query.count(), 0)
+            self.assertEqual(ResumeJobMatch.query.count(), 0)
+
+    def test_delete_job_purges_applications(self):
+        """Test deleting a job post removes its applications and interviews"""
+        with self.app.app_context():
+            job_id, _ = self._create_history()
+
+            response = self.client.delete(f'/api/jobs/{job_id}')
+            self.assertEqual(response.status_code, 200)
+
+            self.assertIsNone(db.session.get(JobPost, job_id))
+            self.assertEqual(Application.query.count(), 0)
+            self.assertEqual(Interview.query.count(), 0)
+            self.assertEqual(Resume.query.count(), 1)
+
+    def _create_reviews(self):
+        """Create reviews for the employee across two quarters"""
+        db.session.add_all([
+            PerformanceReview(employee_id=self.employee_id, reviewer_id=self.manager_id, type='annual',
+                              rating=3.0, created_at=datetime(2024, 1, 15)),
+            PerformanceReview(employee_id=self.employee_id, reviewer_id=self.manager_id, type='annual',
+                              rating=5.0, created_at=datetime(2024, 3, 20)),
+            PerformanceReview(employee_id=self.employee_id, reviewer_id=self.manager_id, type='peer',
+                              rating=4.0, created_at=datetime(2024, 8, 1))
+        ])
+        db.session.commit()
+
+    def test_performance_review_analytics_by_employee(self):
+        """Test rating stats are grouped per employee and quarter"""
+        with self.app.app_context():
+            self._create_reviews()
+
+            response = self.client.get('/api/users/performance-reviews/analytics?group_by=employee')
+            self.assertEqual(response.status_code, 200)
+
+            data = json.loads(response.data)['data']
+            self.assertEqual([row['period'] for row in data], ['2024-Q1', '2024-Q3'])
+            self.assertEqual(data[0]['name'], 'John Doe')
+            self.assertEqual(data[0]['review_count'], 2)
+            self.assertEqual(data[0]['avg_rating'], 4.0)
+            self.assertEqual(data[0]['min_rating'], 3.0)
+            self.assertEqual(data[0]['max_rating'], 5.0)
+
+    def test_user_performance_review_analytics_by_type(self):
+        """Test an employee's trend grouped by review type"""
+        with self.app.app_context():
+            self._create_reviews()
+
+            response = self.client.get(f'/api/users/{self.employee_id}/performance-reviews/analytics')
+            self.assertEqual(response.status_code, 200)
+
+            data = json.loads(response.data)['data']
+            self.assertEqual({(row['key'], row['period']) for row in data},
+                             {('annual', '2024-Q1'), ('peer', '2024-Q3')})
+
+    def test_performance_review_analytics_invalid_group(self):
+        """Test unsupported grouping is rejected"""
+        response = self.client.get('/api/users/performance-reviews/analytics?group_by=department')
+        self.assertEqual(response.status_code, 400)
+
+    def test_performance_review_analytics_cached(self):
+        """Test the materialized summary matches the live aggregation"""
+        with self.app.app_context():
+            self._create_reviews()
+
+            response = self.client.post('/api/users/performance-reviews/analytics/refresh')
+            self.assertEqual(response.status_code, 200)
+
+            live = json.loads(self.client.get('/api/users/performance-reviews/analytics?group_by=reviewer').data)
+            cached = json.loads(self.client.get('/api/users/performance-reviews/analytics?group_by=reviewer&cached=true').data)
+            self.assertEqual(live['data'], cached['data'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,708 @@
+import unittest
+import hashlib
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+import numpy as np
+from database.vector_db.chroma_vector_db import ChromaVectorDBService
+from database.vector_db.bm25_index import BM25Index, reciprocal_rank_fusion
+from database.vector_db.embedding_dispatcher import EmbeddingDispatcher
+from database.vector_db.numpy_vector_store import NumpyVectorStore, quantize
+from app import create_app, db
+from models import User, Role, Resume
+from services.vector_sync_service import VectorSyncService
+
+
+class HashingEncoder:
+    """Deterministic bag-of-words encoder standing in for SentenceTransformer"""
+
+    dim = 32
+
+    def __init__(self):
+        self.calls = 0
+        self.encoded = 0
+
+    def encode(self, sentences, batch_size=32, **kwargs):
+        self.calls += 1
+        single = isinstance(sentences, str)
+        sentences = [sentences] if single else list(sentences)
+        self.encoded += len(sentences)
+
+        vectors = np.zeros((len(sentences), self.dim), dtype=np.float32)
+        for i, sentence in enumerate(sentences):
+            for word in sentence.lower().split():
+                vectors[i, int(hashlib.md5(word.encode()).hexdigest(), 16) % self.dim] += 1.0
+            norm = np.linalg.norm(vectors[i])
+            if norm:
+                vectors[i] /= norm
+        return vectors[0] if single else vectors
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+
+def add_one_at_a_time(path, prefix, count):
+    """Writer process for the numpy store: one add per record"""
+    collection = NumpyVectorStore(path).get_or_create_collection('shared')
+    rng = np.random.default_rng(len(prefix))
+    for i in range(count):
+        collection.add(ids=[f'{prefix}-{i}'], embeddings=rng.normal(size=(1, 8)), documents=[f'{prefix} {i}'])
+
+
+class ChromaVectorDBServiceTestCase(unittest.TestCase):
+    """Test cases for the Chroma vector DB service"""
+
+    backend = 'chroma'
+
+    def setUp(self):
+        self.persist_dir = tempfile.mkdtemp()
+        self.encoder = HashingEncoder()
+        self.service = self._make_service()
+
+    def tearDown(self):
+        shutil.rmtree(self.persist_dir, ignore_errors=True)
+
+    def _make_service(self, **kwargs):
+        service = ChromaVectorDBService(persist_dir=self.persist_dir, backend=self.backend, **kwargs)
+        service._model = self.encoder
+        return service
+
+    def test_lazy_initialization(self):
+        """Test the client is opened on first use in the configured directory"""
+        service = ChromaVectorDBService(persist_dir=self.persist_dir, backend=self.backend)
+        self.assertIsNone(service._client)
+        self.assertIsNone(service._model)
+        self.assertFalse(service.is_warm())
+
+        service._model = self.encoder
+        timings = service.warm_up(['job_post'])
+        self.assertTrue(service.is_warm())
+        self.assertIn('model_seconds', timings)
+        self.assertEqual(service.client.get_collection('job_post').name, 'job_post')
+
+    def test_reprocessed_resume_replaces_vector(self):
+        """Test adding a resume again replaces its text, fingerprint and vector"""
+        self.service.add_resume('resume-1', 'python developer')
+        self.service.add_resume('resume-2', 'java developer')
+        self.service.add_resume('resume-1', 'golang engineer')
+
+        stored = self.service.get_collection('resume').get(ids=['resume-1'])
+        self.assertEqual(stored['documents'], ['golang engineer'])
+        self.assertEqual(stored['metadatas'][0]['fingerprint'], self.service.fingerprint('golang engineer'))
+        self.assertEqual(self.service.search_resumes_for_job('golang engineer', k=1)[0]['id'], 'resume-1')
+        self.assertEqual(self.service.search_resumes_for_job('developer', k=1, mode='hybrid')[0]['id'], 'resume-2')
+
+    def test_add_many_batches_encoding(self):
+        """Test bulk add encodes per batch and writes every document"""
+        texts = [f'python developer number {i}' for i in range(25)]
+        result = self.service.add_many(
+            'job_post', [f'job-{i}' for i in range(25)], texts,
+            metadatas=[{'n': i} for i in range(25)], write_batch_size=10
+        )
+
+        self.assertEqual(result['count'], 25)
+        self.assertEqual(self.encoder.calls, 3)
+        self.assertEqual(self.service.get_collection('job_post').count(), 25)
+
+        self.service.upsert_many('job_post', ['job-0', 'job-99'], ['kubernetes', 'golang'])
+        self.assertEqual(self.service.get_collection('job_post').count(), 26)
+
+    def test_writes_are_split_at_store_max_batch_size(self):
+        """Test bulk writes never exceed the store's max batch size and upserts replace in place"""
+        collection = self.service.get_collection('job_post')
+        self.service.client.get_max_batch_size = lambda: 4
+        sizes = []
+        upsert = collection.upsert
+        collection.upsert = lambda ids, **kwargs: sizes.append(len(ids)) or upsert(ids=ids, **kwargs)
+        self.service.get_collection = lambda name: collection
+
+        ids = [f'job-{i}' for i in range(10)]
+        result = self.service.upsert_many('job_post', ids, [f'role {i}' for i in range(10)], write_batch_size=100)
+        self.assertEqual(sizes, [4, 4, 2])
+        self.assertEqual(result['count'], 10)
+
+        self.service.upsert_many('job_post', ids[:3], ['changed role'] * 3)
+        self.assertEqual(collection.count(), 10)
+        self.assertEqual(collection.get(ids=['job-0'])['documents'], ['changed role'])
+
+    def test_add_many_length_mismatch(self):
+        """Test bulk add rejects misaligned inputs"""
+        with self.assertRaises(ValueError):
+            self.service.add_many('job_post', ['a', 'b'], ['only one'])
+
+    def test_embedding_cache_reuses_vectors(self):
+        """Test identical text is encoded once and survives a restart"""
+        first = self.service.get_embedding('senior data engineer')
+        second = self.service.get_embeddings(['senior data engineer', 'senior data engineer'])
+        self.assertEqual(self.encoder.encoded, 1)
+        self.assertEqual(second, [first, first])
+
+        stats = self.service.cache_stats()
+        self.assertEqual(stats['memory_hits'], 2)
+        self.assertGreater(stats['disk_bytes'], 0)
+
+        restarted = self._make_service()
+        self.assertEqual(restarted.get_embedding('senior data engineer'), first)
+        self.assertEqual(self.encoder.encoded, 1)
+        self.assertEqual(restarted.cache_stats()['disk_hits'], 1)
+
+    def test_embedding_cache_path_follows_persist_dir(self):
+        """Test the cache file is placed under the configured directory only on first use"""
+        persist_dir = os.path.join(self.persist_dir, 'nested')
+        service = ChromaVectorDBService(persist_dir=persist_dir, backend=self.backend)
+        service._model = self.encoder
+        self.assertFalse(os.path.exists(persist_dir))
+
+        service.persist_dir = os.path.join(self.persist_dir, 'moved')
+        service.get_embedding('platform engineer')
+        self.assertTrue(os.path.exists(os.path.join(self.persist_dir, 'moved', 'embedding_cache.sqlite3')))
+        self.assertFalse(os.path.exists(persist_dir))
+
+        uncached = ChromaVectorDBService(persist_dir=persist_dir, backend=self.backend, use_cache=False)
+        uncached._model = self.encoder
+        uncached.get_embeddings(['platform engineer', 'platform engineer'])
+        self.assertEqual(self.encoder.encoded, 3)
+        self.assertEqual(uncached.cache_stats(), {'enabled': False})
+
+    def test_update_docs_skips_unchanged_text(self):
+        """Test update_docs re-embeds only when the text changes"""
+        self.service.update_docs('job_post', 'job-1', 'python developer', {'status': 'active'})
+        self.assertEqual(self.encoder.encoded, 1)
+
+        result = self.service.update_docs('job_post', 'job-1', 'python developer', {'status': 'active'})
+        self.assertEqual(result['status'], 'unchanged')
+        self.assertFalse(result['reembedded'])
+
+        result = self.service.update_docs('job_post', 'job-1', 'python developer', {'status': 'closed'})
+        self.assertFalse(result['reembedded'])
+        stored = self.service.get_collection('job_post').get(ids=['job-1'])
+        self.assertEqual(stored['metadatas'][0]['status'], 'closed')
+
+        result = self.service.update_docs('job_post', 'job-1', 'rust developer', {'status': 'closed'})
+        self.assertTrue(result['reembedded'])
+        self.assertEqual(self.encoder.encoded, 2)
+
+    def test_sync_collection(self):
+        """Test sync embeds new and changed rows and drops missing ones"""
+        self.service.add_many('job_post', ['a', 'b', 'c'], ['alpha job', 'beta job', 'gamma job'],
+                              [{'status': 'active'}] * 3)
+        encoded = self.encoder.encoded
+
+        result = self.service.sync_collection('job_post', {
+            'a': ('alpha job', {'status': 'active'}),
+            'b': ('beta job rewritten', {'status': 'active'}),
+            'c': ('gamma job', {'status': 'closed'}),
+            'd': ('delta job', {'status': 'active'})
+        })
+        self.assertEqual(result['embedded'], 2)
+        self.assertEqual(result['metadata_updated'], 1)
+        self.assertEqual(result['unchanged'], 1)
+        self.assertEqual(self.encoder.encoded - encoded, 2)
+
+        result = self.service.sync_collection('job_post', {'a': ('alpha job', {'status': 'active'})})
+        self.assertEqual(result['deleted'], 3)
+        self.assertEqual(result['embedded'], 0)
+        self.assertEqual(self.service.get_collection('job_post').get()['ids'], ['a'])
+
+
+    def test_query_many_returns_flat_hits_per_query(self):
+        """Test batched search encodes once and returns k hits per query"""
+        self.service.add_many('job_post', ['py', 'go', 'rs'],
+                              ['python developer', 'golang developer', 'rust developer'],
+                              [{'status': 'active'}] * 3)
+        calls = self.encoder.calls
+
+        results = self.service.search_jobs_for_resumes(['python python', 'rust rust', 'golang golang'], k=2)
+        self.assertEqual(self.encoder.calls - calls, 1)
+        self.assertEqual(len(results), 3)
+        self.assertEqual([hits[0]['id'] for hits in results], ['py', 'rs', 'go'])
+        self.assertTrue(all(len(hits) == 2 for hits in results))
+        self.assertEqual(results[0][0]['meta_data']['status'], 'active')
+
+        single = self.service.search_jobs_for_resume('rust rust', k=2)
+        self.assertEqual(single, results[1])
+        self.assertEqual(self.service.query_many('job_post', []), [])
+
+
+    def test_filtered_search_is_applied_in_chroma(self):
+        """Test metadata filters narrow the candidates inside the query"""
+        self.service.add_resume('r1', 'python developer', {'user_id': 'u1'}, location='Pune')
+        self.service.add_resume('r2', 'python developer django', {'user_id': 'u2'}, location='Delhi')
+        self.service.add_resume('r3', 'python engineer', {'user_id': 'u3'}, location='Pune', status='inactive')
+
+        stored = self.service.get_collection('resume').get(ids=['r1'])['metadatas'][0]
+        self.assertEqual(stored['status'], 'active')
+        self.assertEqual(stored['resume_id'], 'r1')
+
+        hits = self.service.search_resumes_for_job('python developer', k=5,
+                                                   filters={'location': 'Pune', 'status': 'active'})
+        self.assertEqual([hit['id'] for hit in hits], ['r1'])
+
+        hits = self.service.search_resumes_for_job('python developer', k=5, filters={'location': ['Pune', 'Delhi']})
+        self.assertEqual(len(hits), 3)
+
+        hits = self.service.search_resumes_for_job('python', k=5, where_document={'$contains': 'django'})
+        self.assertEqual([hit['id'] for hit in hits], ['r2'])
+
+    def test_build_where(self):
+        """Test filter dicts translate to chroma where clauses"""
+        self.assertIsNone(ChromaVectorDBService.build_where({'status': None}))
+        self.assertEqual(ChromaVectorDBService.build_where({'status': 'active'}), {'status': 'active'})
+        self.assertEqual(
+            ChromaVectorDBService.build_where({'status': 'active', 'location': ['Pune'], 'years': {'$gte': 3}}),
+            {'$and': [{'status': 'active'}, {'location': {'$in': ['Pune']}}, {'years': {'$gte': 3}}]}
+        )
+
+
+    def test_chunked_search_scores_parents(self):
+        """Test long documents are indexed as chunks and ranked by their best chunk"""
+        service = self._make_service(chunk_size=40, chunk_overlap=0)
+        filler = ' '.join(['managed payroll and audits'] * 6)
+        long_resume = f'{filler} built kubernetes clusters'
+
+        result = service.index_chunks('resume', ['long', 'short'], [long_resume, 'java developer'],
+                                      [{'status': 'active'}, {'status': 'active'}])
+        self.assertGreater(result['chunks'], 2)
+        self.assertEqual(self.encoder.calls, 1)
+
+        stored = service.get_collection('resume_chunks').get(ids=['long#0'])['metadatas'][0]
+        self.assertEqual(stored['parent_id'], 'long')
+
+        hits = service.search_resumes_for_job('kubernetes clusters', k=2, chunked=True)
+        self.assertEqual([hit['id'] for hit in hits], ['long', 'short'])
+        self.assertIn('clusters', hits[0]['matched_chunks'][0]['text'])
+
+        hits = service.search_chunked('resume', ['kubernetes clusters'], k=2, aggregate='mean_top_n')[0]
+        self.assertEqual(len(hits), 2)
+
+        # a shorter rewrite drops the chunks that no longer exist
+        result = service.index_chunks('resume', ['long'], ['built kubernetes clusters'])
+        self.assertEqual(result['chunks'], 1)
+        self.assertGreater(result['deleted'], 0)
+        self.assertEqual(service.get_collection('resume_chunks').count(), 2)
+
+
+    def test_hybrid_search_fuses_lexical_and_vector(self):
+        """Test hybrid mode merges BM25 and vector candidates and reports stage timings"""
+        texts = ['kubernetes platform engineer', 'python developer', 'sox compliance auditor',
+                 'java developer', 'kubernetes and python devops', 'payroll specialist']
+        ids = [f'job-{i}' for i in range(len(texts))]
+        self.service.add_many('job_post', ids, texts, [{'status': 'active'}] * len(texts))
+
+        response = self.service.hybrid_search('job_post', ['kubernetes python'], k=3, vector_k=1, lexical_k=5)
+        hits = response['results'][0]
+        self.assertEqual(len(hits), 3)
+        self.assertEqual({hit['id'] for hit in hits}, {'job-0', 'job-1', 'job-4'})
+        self.assertTrue(any(hit['vector_rank'] is None for hit in hits))
+        self.assertTrue(all(hit['text'] for hit in hits))
+        for stage in ('encode_seconds', 'vector_seconds', 'lexical_seconds', 'fusion_seconds', 'total_seconds'):
+            self.assertIn(stage, response['timings'])
+
+        # writes through the service keep the BM25 index current
+        self.service.update_docs('job_post', 'job-2', 'sox compliance auditor', {'status': 'closed'})
+        self.service.upsert_many('job_post', ['job-6'], ['sox reporting analyst'], [{'status': 'active'}])
+        hits = self.service.search_jobs_for_resume('sox', k=2, filters={'status': 'active'}, mode='hybrid')
+        self.assertEqual(hits[0]['id'], 'job-6')
+        self.assertNotIn('job-2', [hit['id'] for hit in hits])
+
+        with self.assertRaises(ValueError):
+            self.service.search_jobs_for_resume('sox', mode='fuzzy')
+
+
+    def test_migrate_resume_collections(self):
+        """Test per-resume collections are folded into the shared resume collection"""
+        resume_ids = [str(uuid.uuid4()) for _ in range(3)]
+        # the legacy doc ids are not the resume ids, the collection name carries the resume id
+        for resume_id, text in zip(resume_ids, ['python developer', 'golang developer', 'rust developer']):
+            self.service.load_data(f'doc-{resume_id}', {'user_id': 'u1'}, 'resume' + resume_id, text)
+        split_id = str(uuid.uuid4())
+        for i, text in enumerate(['kubernetes operator', 'terraform modules']):
+            self.service.load_data(f'part-{i}', {'user_id': 'u3'}, 'resume' + split_id, text)
+        self.service.add_resume('existing', 'java developer', {'user_id': 'u2'})
+        encoded = self.encoder.encoded
+
+        result = self.service.migrate_resume_collections(dry_run=True)
+        self.assertEqual((result['collections'], result['documents'], result['dropped']), (4, 5, 0))
+
+        result = self.service.migrate_resume_collections()
+        self.assertEqual((result['collections'], result['documents'], result['dropped']), (4, 5, 4))
+        self.assertEqual(self.encoder.encoded, encoded)
+        self.assertEqual(sorted(self.service.client.list_collections()), ['resume', 'resume_chunks'])
+        self.assertEqual(sorted(self.service.get_collection('resume').get()['ids']), sorted(resume_ids + ['existing']))
+
+        # a legacy collection holding several documents becomes chunks of that resume
+        chunks = self.service.get_collection('resume_chunks').get()
+        self.assertEqual(sorted(chunks['ids']), [f'{split_id}#0', f'{split_id}#1'])
+        self.assertTrue(all(metadata['parent_id'] == split_id for metadata in chunks['metadatas']))
+
+        stored = self.service.get_collection('resume').get(ids=[resume_ids[2]])['metadatas'][0]
+        self.assertEqual(stored['status'], 'active')
+        self.assertEqual(self.service.search_resumes_for_job('rust developer', k=1)[0]['id'], resume_ids[2])
+
+
+    def test_clear_collection_and_delete_where(self):
+        """Test reset drops the collection and bulk deletes follow metadata filters"""
+        statuses = ['active', 'closed', 'closed', 'active']
+        self.service.add_many('job_post', [f'job-{i}' for i in range(4)],
+                              ['python', 'golang', 'rust', 'java'], [{'status': status} for status in statuses])
+        self.service.index_chunks('job_post', ['job-1'], ['golang'], [{'status': 'closed'}])
+        self.service.hybrid_search('job_post', ['python'], k=1)
+
+        deleted = self.service.delete_where('job_post', {'status': 'closed'})
+        self.assertEqual(deleted, {'job_post': 2, 'job_post_chunks': 1})
+        self.assertEqual(sorted(self.service.get_collection('job_post').get()['ids']), ['job-0', 'job-3'])
+        hits = self.service.hybrid_search('job_post', ['golang'], k=4)['results'][0]
+        self.assertNotIn('job-1', [hit['id'] for hit in hits])
+
+        with self.assertRaises(ValueError):
+            self.service.delete_where('job_post')
+
+        self.service.clear_collection('job_post')
+        self.assertEqual(self.service.get_collection('job_post').count(), 0)
+        self.assertEqual(self.service.get_collection('job_post_chunks').count(), 0)
+        self.service.add_many('job_post', ['job-9'], ['kotlin'])
+        self.assertEqual(self.service.get_collection('job_post').count(), 1)
+
+
+    def test_inference_backend_settings(self):
+        """Test quantized inference swaps Linear layers and gets its own embedding space"""
+        import torch
+
+        service = self._make_service(inference_backend='quantized', num_threads=2, encode_batch_size=8)
+        self.assertEqual(service.encode_batch_size, 8)
+        self.assertEqual(service.embedding_space, 'all-MiniLM-L6-v2:int8')
+        self.assertNotEqual(service.fingerprint('python'), self.service.fingerprint('python'))
+
+        model = service.quantize_model(torch.nn.Sequential(torch.nn.Linear(4, 4)))
+        self.assertNotIsInstance(model[0], torch.nn.Linear)
+        self.assertEqual(tuple(model(torch.ones(1, 4)).shape), (1, 4))
+
+        with self.assertRaises(ValueError):
+            self._make_service(inference_backend='tensorrt')
+
+
+    def test_dispatcher_merges_concurrent_requests(self):
+        """Test concurrent single-text encodes share model calls"""
+        service = self._make_service(use_cache=False, use_dispatcher=True, dispatch_max_batch=16,
+                                     dispatch_max_wait_ms=50)
+        texts = [f'candidate skill {i}' for i in range(8)]
+        results = {}
+        start = threading.Barrier(len(texts))
+
+        def worker(text):
+            start.wait()
+            results[text] = service.get_embedding(text)
+
+        threads = [threading.Thread(target=worker, args=(text,)) for text in texts]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertLess(self.encoder.calls, len(texts))
+        for text in texts:
+            self.assertEqual(results[text], self.encoder.encode(text).tolist())
+        self.assertEqual(service.dispatcher.stats()['requests'], len(texts))
+
+
+
+class NumpyVectorDBServiceTestCase(ChromaVectorDBServiceTestCase):
+    """Run the vector DB service tests against the in-process NumPy backend"""
+
+    backend = 'numpy'
+
+    def test_read_only_worker_sees_writes(self):
+        """Test a read-only instance on the same directory picks up new writes"""
+        self.service.add_many('job_post', ['py'], ['python developer'])
+        reader = self._make_service(read_only=True)
+        self.assertEqual(reader.search_jobs_for_resume('python', k=1)[0]['id'], 'py')
+
+        self.service.add_many('job_post', ['go'], ['golang developer'])
+        self.assertEqual(reader.search_jobs_for_resume('golang', k=1)[0]['id'], 'go')
+
+        with self.assertRaises(PermissionError):
+            reader.add_many('job_post', ['rs'], ['rust developer'])
+
+    def test_processes_write_to_one_directory(self):
+        """Test concurrent writer processes serialize on the file lock and lose no records"""
+        path = os.path.join(self.persist_dir, 'shared_store')
+        context = multiprocessing.get_context('fork')
+        writers = [context.Process(target=add_one_at_a_time, args=(path, prefix, 15)) for prefix in ('a', 'bb', 'ccc')]
+        for writer in writers:
+            writer.start()
+        for writer in writers:
+            writer.join(60)
+            self.assertEqual(writer.exitcode, 0)
+
+        collection = NumpyVectorStore(path).get_or_create_collection('shared')
+        self.assertEqual(collection.count(), 45)
+        self.assertEqual(collection.get(ids=['bb-7'])['documents'], ['bb 7'])
+
+    def test_writes_append_segments_and_compact(self):
+        """Test a write leaves earlier segments untouched and compaction drops dead rows"""
+        rng = np.random.default_rng(2)
+        vectors = rng.normal(size=(40, 8)).astype(np.float32)
+        collection = self.service.client.get_or_create_collection('segments')
+        collection.add(ids=[str(i) for i in range(40)], embeddings=vectors)
+
+        segment_files = {name: os.stat(os.path.join(collection.path, name)).st_mtime_ns
+                         for name in os.listdir(collection.path) if name.startswith('segment-')}
+        collection.upsert(ids=['3'], embeddings=vectors[:1], metadatas=[{'moved': True}])
+        for name, mtime in segment_files.items():
+            self.assertEqual(os.stat(os.path.join(collection.path, name)).st_mtime_ns, mtime)
+        self.assertEqual((collection.memory_stats()['segments'], collection.memory_stats()['dead_rows']), (2, 1))
+
+        # another process on the same directory sees the write
+        other = NumpyVectorStore(self.service.client.path).get_or_create_collection('segments')
+        self.assertEqual(other.query(query_embeddings=vectors[:1], n_results=2)['ids'], [['0', '3']])
+
+        collection.delete(ids=[str(i) for i in range(10, 40)])
+        stats = collection.memory_stats()
+        # more dead rows than live ones triggers a compaction
+        self.assertEqual((stats['count'], stats['segments'], stats['dead_rows']), (10, 1, 0))
+        self.assertEqual(other.get(ids=['3'])['metadatas'], [{'moved': True}])
+        np.testing.assert_array_equal(other.get(ids=['9'], include=['embeddings'])['embeddings'], vectors[9:10])
+        self.assertEqual(other.count(), 10)
+
+        # past MAX_SEGMENTS the small segments are merged, the large one stays
+        collection.MAX_SEGMENTS = 3
+        for i in range(10, 15):
+            collection.add(ids=[str(i)], embeddings=vectors[i:i + 1])
+        self.assertLessEqual(collection.memory_stats()['segments'], 3)
+        self.assertEqual(other.query(query_embeddings=vectors[12:13], n_results=1)['ids'], [['12']])
+        self.assertEqual(sorted(other.get()['ids'], key=int), [str(i) for i in range(15)])
+
+    def test_exact_search_matches_brute_force(self):
+        """Test query returns the exact nearest neighbours in order"""
+        rng = np.random.default_rng(0)
+        vectors = rng.normal(size=(200, 16)).astype(np.float32)
+        queries = rng.normal(size=(5, 16)).astype(np.float32)
+
+        collection = self.service.client.get_or_create_collection('exact')
+        collection.add(ids=[str(i) for i in range(200)], embeddings=vectors,
+                       metadatas=[{'even': i % 2 == 0} for i in range(200)])
+        result = collection.query(query_embeddings=queries, n_results=10)
+
+        expected = ((queries[:, None, :] - vectors[None, :, :]) ** 2).sum(axis=2).argsort(axis=1)[:, :10]
+        self.assertEqual(result['ids'], [[str(i) for i in row] for row in expected])
+
+        result = collection.query(query_embeddings=queries[:1], n_results=3, where={'even': True})
+        self.assertTrue(all(int(doc_id) % 2 == 0 for doc_id in result['ids'][0]))
+
+        collection.delete(where={'even': False})
+        self.assertEqual(collection.count(), 100)
+
+
+    def test_quantized_storage_reranks_in_float32(self):
+        """Test float16 / int8 search copies return the exact float32 top-k"""
+        rng = np.random.default_rng(1)
+        vectors = rng.normal(size=(500, 32)).astype(np.float32)
+        queries = rng.normal(size=(10, 32)).astype(np.float32)
+        expected = ((queries[:, None, :] - vectors[None, :, :]) ** 2).sum(axis=2).argsort(axis=1)[:, :5]
+
+        for storage_dtype, ratio in (('float16', 2), ('int8', 4)):
+            service = self._make_service(storage_dtype=storage_dtype)
+            collection = service.client.get_or_create_collection(f'quantized_{storage_dtype}')
+            collection.add(ids=[str(i) for i in range(500)], embeddings=vectors)
+
+            result = collection.query(query_embeddings=queries, n_results=5)
+            found = sum(len({int(i) for i in row} & set(truth)) for row, truth in zip(result['ids'], expected.tolist()))
+            self.assertGreaterEqual(found / expected.size, 0.95)
+
+            stats = collection.memory_stats()
+            self.assertEqual(stats['storage_dtype'], storage_dtype)
+            self.assertEqual(stats['float32_bytes'] // stats['search_bytes'], ratio)
+
+    def test_int8_codes_follow_upserts(self):
+        """Test int8 codes and per-row scales match the stored vectors after an upsert and a reload"""
+        rng = np.random.default_rng(3)
+        vectors = rng.normal(size=(50, 16)).astype(np.float32)
+        service = self._make_service(storage_dtype='int8')
+        collection = service.client.get_or_create_collection('codes')
+        collection.add(ids=[str(i) for i in range(50)], embeddings=vectors)
+
+        # rows on a much larger scale must not change the codes of the others
+        vectors[:5] = 10.0 * rng.normal(size=(5, 16))
+        collection.upsert(ids=[str(i) for i in range(5)], embeddings=vectors[:5])
+        reopened = NumpyVectorStore(service.client.path, storage_dtype='int8').get_or_create_collection('codes')
+
+        for current in (collection, reopened):
+            expected = vectors[[int(doc_id) for doc_id in current.get()['ids']]]
+            codes, scales = quantize(expected, 'int8')
+            for segment, positions, rows in current._by_segment(current._slots):
+                np.testing.assert_array_equal(segment.codes[rows], codes[positions])
+                np.testing.assert_array_equal(segment.scales[rows], scales[positions])
+            result = current.query(query_embeddings=vectors[:8], n_results=1)
+            self.assertEqual(result['ids'], [[str(i)] for i in range(8)])
+
+        reopened.compact()
+        self.assertEqual(collection.query(query_embeddings=vectors[:8], n_results=1)['ids'],
+                         [[str(i)] for i in range(8)])
+        self.assertEqual(collection.memory_stats()['scale_bytes'], 50 * 2 * 4)
+
+    def test_write_apis_do_not_echo_vectors(self):
+        """Test load_data only returns the embedding when asked"""
+        result = self.service.load_data('job-1', {'status': 'active'}, 'job_post', 'python developer')
+        self.assertNotIn('embeddings', result)
+
+        result = self.service.load_data('job-2', {'status': 'active'}, 'job_post', 'golang developer',
+                                        return_embeddings=True)
+        self.assertEqual(len(result['embeddings']), HashingEncoder.dim)
+
+
+
+class VectorSyncServiceTestCase(unittest.TestCase):
+    """Test cases for reconciling the resume table with the vector collections"""
+
+    def setUp(self):
+        """Set up a temporary vector store and a candidate with resumes"""
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.persist_dir = tempfile.mkdtemp()
+        self.vector_db = ChromaVectorDBService(persist_dir=self.persist_dir, backend='numpy')
+        self.vector_db._model = HashingEncoder()
+        self.sync = VectorSyncService(vector_db=self.vector_db)
+
+        with self.app.app_context():
+            db.create_all()
+            role = Role(name=f'Candidate-{uuid.uuid4()}')
+            db.session.add(role)
+            db.session.flush()
+            user = User(name='Candidate', email=f'{uuid.uuid4()}@test.com', role_id=role.id)
+            db.session.add(user)
+            db.session.flush()
+            # uploaded before parsed_data was stored, only the vector index has its text
+            legacy = Resume(owner_id=user.id)
+            parsed = Resume(owner_id=user.id)
+            parsed.set_parsed_data({'location': 'Berlin', 'skills': ['python', 'sql'], 'total_experience': '3 years',
+                                    'work_experience': [], 'education': []})
+            db.session.add_all([legacy, parsed])
+            db.session.commit()
+            self.role_id, self.user_id = role.id, user.id
+            self.legacy_id, self.parsed_id = legacy.id, parsed.id
+
+    def tearDown(self):
+        """Clean up after tests"""
+        with self.app.app_context():
+            Resume.query.filter(Resume.owner_id == self.user_id).delete()
+            User.query.filter(User.id == self.user_id).delete()
+            Role.query.filter(Role.id == self.role_id).delete()
+            db.session.commit()
+            db.session.remove()
+        shutil.rmtree(self.persist_dir, ignore_errors=True)
+
+    def test_sync_keeps_resumes_without_parsed_data(self):
+        """Test a sync only deletes vectors of resumes that no longer exist"""
+        self.vector_db.add_resume(self.legacy_id, 'golang developer', {'user_id': self.user_id})
+        self.vector_db.add_resume('deleted-resume', 'rust developer', {'user_id': self.user_id})
+        self.vector_db.index_chunks('resume', ['deleted-resume'], ['rust developer'])
+
+        with self.app.app_context():
+            result = self.sync.sync_all()
+
+        self.assertEqual(sorted(self.vector_db.get_collection('resume').get()['ids']),
+                         sorted([self.legacy_id, self.parsed_id]))
+        self.assertEqual(self.vector_db.get_collection('resume_chunks').get()['ids'], [f'{self.parsed_id}#0'])
+        self.assertEqual(result['resume']['deleted'], 1)
+
+    def test_sync_after_migration_keeps_migrated_resumes(self):
+        """Test resumes migrated from per-resume collections survive the next sync"""
+        self.vector_db.load_data('legacy-doc', {'user_id': self.user_id}, 'resume' + self.legacy_id, 'golang developer')
+        self.vector_db.migrate_resume_collections()
+
+        with self.app.app_context():
+            self.sync.sync_all()
+
+        stored = self.vector_db.get_collection('resume').get(ids=[self.legacy_id])
+        self.assertEqual(stored['documents'], ['golang developer'])
+        self.assertEqual(sorted(self.vector_db.get_collection('resume').get()['ids']),
+                         sorted([self.legacy_id, self.parsed_id]))
+
+
+class BM25IndexTestCase(unittest.TestCase):
+    """Test cases for the BM25 lexical index"""
+
+    def test_search_ranks_and_deletes(self):
+        """Test term rarity drives ranking and deleted documents disappear"""
+        index = BM25Index()
+        index.upsert(['a', 'b', 'c'], ['c++ developer developer', 'python developer', 'python c++ kubernetes'],
+                     [{'status': 'active'}, {'status': 'active'}, {'status': 'closed'}])
+
+        self.assertEqual(index.search('kubernetes')[0][0], 'c')
+        self.assertEqual(index.search('c++ developer')[0][0], 'a')
+        self.assertEqual([doc_id for doc_id, _ in index.search('python', where={'status': 'active'})], ['b'])
+
+        index.delete(['c'])
+        self.assertEqual(index.search('kubernetes'), [])
+        self.assertEqual(len(index), 2)
+
+    def test_reciprocal_rank_fusion(self):
+        """Test documents ranked well by both lists come first"""
+        fused = reciprocal_rank_fusion([['a', 'b', 'c'], ['b', 'd']])
+        self.assertEqual([doc_id for doc_id, _ in fused], ['b', 'a', 'd', 'c'])
+
+
+
+class EmbeddingDispatcherTestCase(unittest.TestCase):
+    """Test cases for the micro-batching embedding dispatcher"""
+
+    def test_batches_are_split_back_per_caller(self):
+        """Test queued requests run as one batch and duplicates are encoded once"""
+        batches = []
+        gate = threading.Event()
+
+        def encode(texts):
+            gate.wait(5)
+            batches.append(list(texts))
+            return np.array([[len(text), i] for i, text in enumerate(texts)], dtype=np.float32)
+
+        dispatcher = EmbeddingDispatcher(encode, max_batch_size=10, max_wait_ms=20)
+        first = dispatcher.submit(['a'])
+        futures = [dispatcher.submit(texts) for texts in (['bb', 'a'], ['ccc'], ['bb'])]
+        gate.set()
+
+        self.assertEqual(first.result(5)[0][0], 1)
+        results = [future.result(5) for future in futures]
+        self.assertEqual(results[0][:, 0].tolist(), [2, 1])
+        self.assertEqual(results[1][:, 0].tolist(), [3])
+        self.assertEqual(results[2][:, 0].tolist(), [2])
+        self.assertLessEqual(len(batches), 2)
+
+    def test_large_request_is_split_at_max_batch_size(self):
+        """Test a request bigger than max_batch_size is encoded over several batches"""
+        batches = []
+        gate = threading.Event()
+
+        def encode(texts):
+            gate.wait(5)
+            batches.append(list(texts))
+            return np.array([[int(text)] for text in texts], dtype=np.float32)
+
+        dispatcher = EmbeddingDispatcher(encode, max_batch_size=4, max_wait_ms=20)
+        small = dispatcher.submit(['100'])
+        large = dispatcher.submit([str(i) for i in range(10)])
+        after = dispatcher.submit(['200', '201'])
+        gate.set()
+
+        self.assertEqual(small.result(5)[:, 0].tolist(), [100])
+        self.assertEqual(large.result(5)[:, 0].tolist(), list(range(10)))
+        self.assertEqual(after.result(5)[:, 0].tolist(), [200, 201])
+        self.assertTrue(all(len(batch) <= 4 for batch in batches))
+        self.assertEqual(sum(len(batch) for batch in batches), 13)
+        self.assertEqual(dispatcher.stats()['requests'], 3)
+
+    def test_errors_reach_every_caller(self):
+        """Test a failing batch fails each waiting request"""
+        def encode(texts):
+            raise RuntimeError('model unavailable')
+
+        dispatcher = EmbeddingDispatcher(encode, max_wait_ms=1)
+        with self.assertRaises(RuntimeError):
+            dispatcher.encode(['a'], timeout=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
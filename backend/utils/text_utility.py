@@ -37,6 +37,11 @@ class TextUtility:
         cleaned_json=text.strip('`json \n')
         return json.loads(cleaned_json)
 
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        # about four characters per token for English text, close enough to size prompts
+        return max(1, len(text or '') // 4)
+
     @staticmethod
     def format_resume_text(resume: Dict[str, Any]) -> str:
         lines = []
@@ -61,4 +66,21 @@ class TextUtility:
         for proj in resume.get("projects", []):
             lines.append(f"- {proj['title']}: {proj['description']}")
 
-        return "\n".join(lines)
\ No newline at end of file
+        return "\n".join(lines)
+
+    @staticmethod
+    def format_job_post_text(title: str, description: str = None, requirements: str = None) -> str:
+        lines = [f"Title: {title or ''}"]
+
+        if description:
+            lines.append(f"\nDescription:\n{description}")
+
+        if requirements:
+            lines.append(f"\nRequirements:\n{requirements}")
+
+        return "\n".join(lines)
+
+    @staticmethod
+    def split_text(text: str, chunk_size: int = 800, chunk_overlap: int = 100):
+        splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        return splitter.split_text(text)